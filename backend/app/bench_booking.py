@@ -0,0 +1,155 @@
+# bench_booking.py
+"""
+Concurrency benchmark for POST /api/reservations (reservation_service.create_reservation).
+Seeds a scratch database with one restaurant and fires hundreds of create_reservation calls at
+the same slot and seating area at once, then checks the outcome against the capacity ledger:
+no table is given to two reservations, the area is never seated past its tables, and the
+ledger's guest counts and table lists match the confirmed reservations exactly. Reports
+throughput and how many bookings were turned away while tables were still free (false
+"slot full" answers, which should be zero).
+
+Run from backend/app against a MongoDB you can write to (the scratch database is dropped):
+
+    python bench_booking.py --bookings 500 --tables 120
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from collections import Counter
+
+import database
+from services import reservation_service
+from shared import ledger, schedule, tables
+
+BENCH_DATABASE = os.getenv("BENCH_DATABASE", "restaurant_db_booking_bench")
+
+DATE = "2030-06-14"
+TIME_SLOT = "19:00"
+AREA_ID = "main"
+SEATS_PER_TABLE = 2
+
+def _restaurant(number_of_tables: int) -> dict:
+    return {
+        "restaurant_name": "Booking Bench",
+        "hours": {
+            day: {"open": "11:00", "close": "22:00", "closed": False}
+            for day in ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+        },
+        "seating_config": {
+            "total_capacity": number_of_tables * SEATS_PER_TABLE,
+            "seating_areas": [{
+                "id": AREA_ID,
+                "area_name": "Main",
+                "area_capacity": number_of_tables * SEATS_PER_TABLE,
+                "seats_per_table": SEATS_PER_TABLE,
+                "number_of_tables": number_of_tables
+            }]
+        },
+        "is_onboarded": True
+    }
+
+def _booking(restaurant_id: str, number: int) -> dict:
+    return {
+        "restaurant_id": restaurant_id,
+        "customer_name": f"Guest {number}",
+        "customer_phone": f"555{number:07d}",
+        "date": DATE,
+        "time_slot": TIME_SLOT,
+        "number_of_guests": random.randint(1, 6),
+        "seating_area_id": AREA_ID
+    }
+
+def _check(restaurant: dict, day_ledger: dict, confirmed: list) -> list:
+    """Ways the stored ledger and reservations disagree or overbook; empty if consistent"""
+    problems = []
+    area = restaurant["seating_config"]["seating_areas"][0]
+    number_of_tables, _ = tables.area_tables(area)
+
+    taken = Counter(table for reservation in confirmed for table in reservation["tables"])
+    shared_tables = sorted(table for table, count in taken.items() if count > 1)
+    if shared_tables:
+        problems.append(f"tables given to more than one reservation: {shared_tables}")
+    if len(taken) > number_of_tables:
+        problems.append(f"{len(taken)} tables seated in an area of {number_of_tables}")
+
+    guests = sum(reservation["number_of_guests"] for reservation in confirmed)
+    duration = schedule.dining_duration(restaurant["seating_config"])
+    for step in schedule.occupied_steps(TIME_SLOT, duration):
+        booked = day_ledger.get("booked", {}).get(step, {}).get(AREA_ID, 0)
+        recorded = sorted(day_ledger.get("tables", {}).get(step, {}).get(AREA_ID, []))
+        if booked != guests:
+            problems.append(f"ledger has {booked} guests at {step}, reservations have {guests}")
+        if recorded != sorted(taken.elements()):
+            problems.append(f"ledger tables at {step} don't match the reservations'")
+
+    return problems
+
+async def main(bookings: int, number_of_tables: int, keep: bool) -> int:
+    db = database.client[BENCH_DATABASE]
+    await database.client.drop_database(BENCH_DATABASE)
+
+    # Point the service at the scratch database
+    database.Restaurant_db = db
+    reservation_service.Restaurant_db = db
+
+    try:
+        restaurant = _restaurant(number_of_tables)
+        restaurant["_id"] = (await db.restaurants.insert_one(restaurant)).inserted_id
+        restaurant_id = str(restaurant["_id"])
+
+        requests = [_booking(restaurant_id, number) for number in range(bookings)]
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*[
+            reservation_service.create_reservation(booking, f"guest{number}@example.com")
+            for number, booking in enumerate(requests)
+        ])
+        elapsed = time.perf_counter() - started
+
+        confirmed = await db.reservations.find(
+            {"restaurant_id": restaurant_id, "date": DATE, "status": "confirmed"}
+        ).to_list(length=None)
+        day_ledger = await ledger.get_ledger(db, restaurant_id, DATE)
+
+        # A turned-away party that would still fit in the tables left is a false "slot full"
+        area = restaurant["seating_config"]["seating_areas"][0]
+        duration = schedule.dining_duration(restaurant["seating_config"])
+        turned_away = [booking for booking, result in zip(requests, results) if not result]
+        false_full = sum(
+            1 for booking in turned_away
+            if ledger.allocate(day_ledger, TIME_SLOT, duration, area, booking["number_of_guests"]) is not None
+        )
+
+        seated_tables = sum(len(reservation["tables"]) for reservation in confirmed)
+        print(
+            f"{bookings} concurrent bookings in {elapsed:.2f}s ({bookings / elapsed:.0f}/s) | "
+            f"{len(confirmed)} confirmed on {seated_tables}/{number_of_tables} tables | "
+            f"{len(turned_away)} turned away, {false_full} while tables were free"
+        )
+
+        problems = _check(restaurant, day_ledger or {}, confirmed)
+        if len(confirmed) != bookings - len(turned_away):
+            problems.append(f"{bookings - len(turned_away)} bookings succeeded but {len(confirmed)} are stored")
+        if false_full:
+            problems.append(f"{false_full} bookings turned away while tables were free")
+
+        for problem in problems:
+            print(f"FAIL: {problem}")
+        if not problems:
+            print("OK: no overbooking, ledger matches the reservations")
+        return 1 if problems else 0
+    finally:
+        if not keep:
+            await database.client.drop_database(BENCH_DATABASE)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Book one slot concurrently and check for overbooking")
+    parser.add_argument("--bookings", type=int, default=500, help="Concurrent booking requests")
+    parser.add_argument("--tables", type=int, default=120, help="Tables in the seating area")
+    parser.add_argument("--keep", action="store_true", help=f"Keep the {BENCH_DATABASE} database afterwards")
+    args = parser.parse_args()
+
+    raise SystemExit(asyncio.run(main(args.bookings, args.tables, args.keep)))
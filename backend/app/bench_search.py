@@ -0,0 +1,118 @@
+# bench_search.py
+"""
+Benchmark for /customers/restaurants/search.
+Seeds a scratch database with a growing synthetic catalog, builds the same indexes the API
+creates at startup, and times search_restaurants at each size. Lookups of specific restaurants
+(a fixed number of matches) should stay flat as the catalog grows, since the text index only
+visits matching documents; broad cuisine searches grow with the number of matches, and are
+reported separately.
+
+Run from backend/app against a MongoDB you can write to (the scratch database is dropped):
+
+    python bench_search.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from datetime import datetime
+
+import database
+from services import customer_restaurant_service
+
+BENCH_DATABASE = os.getenv("BENCH_DATABASE", "restaurant_db_search_bench")
+INSERT_BATCH = 1000
+
+CUISINES = ["Italian", "Mexican", "Japanese", "Indian", "Thai", "French", "Greek", "Korean", "Vietnamese", "American"]
+CITIES = ["New Brunswick", "Princeton", "Hoboken", "Newark", "Jersey City", "Trenton", "Edison", "Camden"]
+WORDS = ["golden", "spoon", "garden", "house", "corner", "bistro", "kitchen", "table", "harbor", "olive",
+         "lotus", "ember", "maple", "copper", "river", "stone", "saffron", "basil", "fig", "juniper"]
+
+# Restaurants present at every catalog size; their names contain words no generated restaurant uses
+NEEDLES = ["Zanzibar Quill Eatery", "Xylo Ferment Bar", "Quokka Noodle Works", "Vexley Smokehouse", "Wrenfold Bakery"]
+NEEDLE_QUERIES = ["zanzibar", "xylo ferment", "quokka noodle", "vexley", "wrenfold bakery"]
+BROAD_QUERIES = ["italian", "thai kitchen", "korean"]
+
+def _restaurant(name: str) -> dict:
+    cuisine = random.sample(CUISINES, 2)
+    return {
+        "restaurant_name": name,
+        "cuisines": cuisine,
+        "city": random.choice(CITIES),
+        "address": f"{random.randint(1, 999)} Main St",
+        "description": f"{cuisine[0]} plates from the {' '.join(random.sample(WORDS, 2))}",
+        "is_onboarded": True,
+        "rating_avg": round(random.uniform(2, 5), 1),
+        "rating_count": random.randint(0, 500),
+        "created_at": datetime.utcnow()
+    }
+
+async def _grow(db, current: int, target: int) -> None:
+    """Insert generated restaurants until the catalog holds target documents"""
+    while current < target:
+        count = min(INSERT_BATCH, target - current)
+        await db.restaurants.insert_many([
+            _restaurant(f"{random.choice(WORDS).title()} {random.choice(WORDS).title()} {current + i}")
+            for i in range(count)
+        ])
+        current += count
+
+async def _time(queries, rounds: int) -> list:
+    """Milliseconds per search_restaurants call"""
+    timings = []
+    for _ in range(rounds):
+        for query in queries:
+            started = time.perf_counter()
+            await customer_restaurant_service.search_restaurants(query, limit=20)
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+def _summary(timings: list) -> str:
+    ordered = sorted(timings)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    return f"p50 {statistics.median(ordered):7.2f} ms  p95 {p95:7.2f} ms"
+
+async def main(sizes, rounds: int, keep: bool) -> None:
+    db = database.client[BENCH_DATABASE]
+    await database.client.drop_database(BENCH_DATABASE)
+
+    # Point the service and the index setup at the scratch database
+    database.Restaurant_db = database.Customer_db = db
+    customer_restaurant_service.Restaurant_db = db
+    await database.ensure_indexes()
+    await db.restaurants.insert_many([_restaurant(name) for name in NEEDLES])
+
+    baseline = None
+    current = len(NEEDLES)
+
+    try:
+        for size in sorted(sizes):
+            await _grow(db, current, size)
+            current = max(current, size)
+
+            # Warm up the index and connection pool before timing
+            await _time(NEEDLE_QUERIES + BROAD_QUERIES, 1)
+            needles = await _time(NEEDLE_QUERIES, rounds)
+            broad = await _time(BROAD_QUERIES, rounds)
+
+            median = statistics.median(needles)
+            baseline = baseline or median
+            print(
+                f"{current:>8} restaurants | lookups {_summary(needles)} ({median / baseline:4.2f}x) "
+                f"| broad {_summary(broad)}"
+            )
+    finally:
+        if not keep:
+            await database.client.drop_database(BENCH_DATABASE)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time restaurant search as the catalog grows")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--rounds", type=int, default=20, help="Times each query is run per size")
+    parser.add_argument("--keep", action="store_true", help=f"Keep the {BENCH_DATABASE} database afterwards")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.sizes, args.rounds, args.keep))
@@ -1,6 +1,12 @@
 import os
+import sys
 from dotenv import load_dotenv
 
+# Make the repo-level shared package (schedule engine used by both backends) importable
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+
 load_dotenv()  # take environment variables from .env
 
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
@@ -10,4 +10,73 @@ from config import MONGO_URI, Customer_MONGO_DB, Restaurant_MONGO_DB
 client = AsyncIOMotorClient(MONGO_URI)
 Customer_db = client[Customer_MONGO_DB]
 Restaurant_db = client[Restaurant_MONGO_DB]
-fs = AsyncIOMotorGridFSBucket(Restaurant_db)
\ No newline at end of file
+fs = AsyncIOMotorGridFSBucket(Restaurant_db)
+
+async def ensure_indexes():
+    """Create the indexes backing the customer discovery feeds, reservations and reviews (idempotent, run at startup)"""
+    restaurants = Restaurant_db.restaurants
+    
+    # Keyset pagination: each feed filters on is_onboarded and walks a stable sort ending in _id
+    await restaurants.create_index([("is_onboarded", 1), ("_id", 1)])
+    await restaurants.create_index([("is_onboarded", 1), ("cuisines", 1), ("_id", 1)])
+    await restaurants.create_index([("is_onboarded", 1), ("features", 1), ("_id", 1)])
+    await restaurants.create_index([("is_onboarded", 1), ("created_at", -1), ("_id", -1)])
+    
+    # By-location groups: restaurants sorted by city, then _id within each city
+    await restaurants.create_index([("is_onboarded", 1), ("city", 1), ("_id", 1)])
+    
+    # Top rated: rating aggregate maintained by review_service
+    await restaurants.create_index([("is_onboarded", 1), ("rating_avg", -1), ("rating_count", -1), ("_id", -1)])
+    
+    # Nearby search ($geoNear); location is a GeoJSON point set by the restaurant backend
+    await restaurants.create_index([("location", "2dsphere")])
+    
+    # "Open now": local minute-of-week intervals compiled from hours, queried per time zone
+    await restaurants.create_index(
+        [("is_onboarded", 1), ("timezone", 1), ("open_intervals.start", 1), ("open_intervals.end", 1)]
+    )
+    
+    # Today's deals: per-promo date windows compiled by the restaurant backend on every promo write
+    await restaurants.create_index(
+        [("is_onboarded", 1), ("deal_windows.end", 1), ("deal_windows.start", 1)]
+    )
+    
+    # Full-text search over the fields customers type into the search box, weighted for ranking
+    await restaurants.create_index(
+        [
+            ("restaurant_name", "text"),
+            ("cuisines", "text"),
+            ("city", "text"),
+            ("description", "text")
+        ],
+        name="restaurant_text_search",
+        weights={"restaurant_name": 10, "cuisines": 5, "city": 3, "description": 1}
+    )
+    
+    # Capacity ledgers are read by _id (restaurant and date); seating changes update a restaurant's upcoming dates,
+    # and reconciliation (shared/reconcile.py) walks every restaurant's ledgers and reservations for a date range
+    await Restaurant_db.capacity_ledger.create_index([("restaurant_id", 1), ("date", 1)])
+    await Restaurant_db.capacity_ledger.create_index("date")
+    await Restaurant_db.reservations.create_index([("date", 1), ("status", 1)])
+    
+    # Promotion looks up waiting entries by restaurant, date and slot window, largest parties first;
+    # entries expire once their slot has started (claiming one for promotion first pushes its expiry out)
+    await Restaurant_db.waitlist.create_index(
+        [("restaurant_id", 1), ("date", 1), ("time_slot", 1), ("number_of_guests", -1)]
+    )
+    await Restaurant_db.waitlist.create_index([("customer_email", 1), ("created_at", -1)])
+    await Restaurant_db.waitlist.create_index("expires_at", expireAfterSeconds=0)
+    
+    # The hold expiry scheduler walks active holds by expiry and customers' active holds are counted;
+    # released holds are purged a day after they expire
+    await Restaurant_db.holds.create_index([("status", 1), ("expires_at", 1)])
+    await Restaurant_db.holds.create_index([("customer_email", 1), ("status", 1), ("expires_at", 1)])
+    await Restaurant_db.holds.create_index([("date", 1), ("status", 1)])
+    await Restaurant_db.holds.create_index("purge_at", expireAfterSeconds=0)
+    
+    # Idempotency keys are looked up by _id and expire once they can no longer be retried
+    await Customer_db.idempotency_keys.create_index("expires_at", expireAfterSeconds=0)
+    
+    # One review per reservation; restaurant pages list reviews newest first
+    await Restaurant_db.reviews.create_index("reservation_id", unique=True)
+    await Restaurant_db.reviews.create_index([("restaurant_id", 1), ("created_at", -1)])
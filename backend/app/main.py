@@ -7,6 +7,9 @@ Configures CORS, registers API routers, and defines root/health endpoints.
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from routers import auth_customer, customer_restaurant_router, reservation_router, deals
+from database import ensure_indexes
+from services import change_feed, suggest_service, review_service, facet_service, reservation_service, idempotency_service, hold_expiry
+from utils import response_cache
 
 app = FastAPI(
     title="Restaurant Reservation API",
@@ -21,14 +24,41 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[customer_restaurant_router.NEXT_CURSOR_HEADER, "ETag", idempotency_service.REPLAYED_HEADER],
 )
 
+# Serve public discovery reads from memory; entries are dropped on restaurant writes
+app.middleware("http")(response_cache.cache_responses)
+
 # Include Routers
 app.include_router(auth_customer.router, prefix="/auth", tags=["Auth"])
 app.include_router(customer_restaurant_router.router, tags=["Customer-Restaurants"])
 app.include_router(reservation_router.router, prefix="/api", tags=["Reservations & Bills"])
 app.include_router(deals.router, prefix="/api", tags=["Deals"])
 
+@app.on_event("startup")
+async def startup():
+    """Ensure MongoDB indexes exist and warm in-memory indexes before serving traffic"""
+    await ensure_indexes()
+    await review_service.backfill_rating_fields()
+    await reservation_service.migrate_timeslots()
+    # Also releases holds that expired while no backend was running
+    hold_expiry.start()
+    
+    # Follow restaurant writes first so nothing changed during the build is missed
+    change_feed.subscribe(suggest_service.on_restaurant_change)
+    change_feed.subscribe(response_cache.on_restaurant_change)
+    change_feed.subscribe(facet_service.on_restaurant_change)
+    change_feed.start()
+    await suggest_service.build_index()
+    await facet_service.build_facets()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop background tasks"""
+    await change_feed.stop()
+    await hold_expiry.stop()
+
 @app.get("/")
 async def root():
     """Root endpoint - API status"""
@@ -3,151 +3,267 @@ Customer-facing restaurant browsing router.
 Provides endpoints for discovering restaurants by various criteria and retrieving restaurant images.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import Response
-from services import customer_restaurant_service
-from typing import Optional
+from services import customer_restaurant_service, suggest_service, review_service, facet_service
+from typing import Optional, List, Dict, Awaitable, Tuple
 from bson import ObjectId
 from database import fs
+from shared.versioning import etag_matches
 
 router = APIRouter()
 
+# Header carrying the opaque keyset cursor for the next page (pass it back as ?after=)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+async def _paginated(
+    response: Response,
+    page: Awaitable[Tuple[List[Dict], Optional[str]]]
+) -> List[Dict]:
+    """Await a service page, expose its next cursor as a header, and return the list body"""
+    try:
+        restaurants, next_cursor = await page
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    
+    return restaurants
+
+@router.get("/customers/discovery-feed")
+async def get_discovery_feed(cuisine: Optional[str] = None, limit: int = 10):
+    """Get every landing-page section (premium, deals, top rated, open now, ...) in one response"""
+    return await customer_restaurant_service.get_discovery_feed(cuisine=cuisine, limit=limit)
+
 @router.get("/customers/restaurants")
 async def get_all_restaurants(
+    response: Response,
     city: Optional[str] = None,
     cuisine: Optional[str] = None,
     skip: int = 0,
-    limit: int = 20
+    limit: int = 20,
+    after: Optional[str] = None,
+    date: Optional[str] = None,
+    time_slot: Optional[str] = None,
+    party_size: Optional[int] = None
 ):
-    """Get list of all restaurants (with optional filters)"""
-    restaurants = await customer_restaurant_service.get_restaurants(
+    """Get list of all restaurants (with optional filters; date + time_slot + party_size searches availability)"""
+    page = customer_restaurant_service.get_restaurants(
         city=city,
         cuisine=cuisine,
         skip=skip,
-        limit=limit
+        limit=limit,
+        after=after,
+        date=date,
+        time_slot=time_slot,
+        party_size=party_size
     )
-    return restaurants
+    return await _paginated(response, page)
 
 @router.get("/customers/restaurants/premium")
 async def get_premium_restaurants(
+    response: Response,
     cuisine: Optional[str] = None,
     skip: int = 0,
-    limit: int = 20
+    limit: int = 20,
+    after: Optional[str] = None
 ):
     """Get premium/featured restaurants"""
-    restaurants = await customer_restaurant_service.get_premium_restaurants(
+    page = customer_restaurant_service.get_premium_restaurants(
         cuisine=cuisine,
         skip=skip,
-        limit=limit
+        limit=limit,
+        after=after
     )
-    return restaurants
+    return await _paginated(response, page)
 
 @router.get("/customers/restaurants/todays-deals")
 async def get_todays_deals(
+    response: Response,
     cuisine: Optional[str] = None,
     skip: int = 0,
-    limit: int = 50
+    limit: int = 50,
+    after: Optional[str] = None
 ):
     """Get restaurants with active deals today"""
-    restaurants = await customer_restaurant_service.get_todays_deals(
+    page = customer_restaurant_service.get_todays_deals(
         cuisine=cuisine,
         skip=skip,
-        limit=limit
+        limit=limit,
+        after=after
     )
-    return restaurants
+    return await _paginated(response, page)
 
 @router.get("/customers/restaurants/top-rated")
 async def get_top_rated(
+    response: Response,
     cuisine: Optional[str] = None,
     skip: int = 0,
-    limit: int = 20
+    limit: int = 20,
+    after: Optional[str] = None
 ):
     """Get top rated restaurants"""
-    restaurants = await customer_restaurant_service.get_top_rated(
+    page = customer_restaurant_service.get_top_rated(
         cuisine=cuisine,
         skip=skip,
-        limit=limit
+        limit=limit,
+        after=after
     )
-    return restaurants
+    return await _paginated(response, page)
 
 @router.get("/customers/restaurants/open-now")
 async def get_open_now(
+    response: Response,
     cuisine: Optional[str] = None,
     skip: int = 0,
-    limit: int = 20
+    limit: int = 20,
+    after: Optional[str] = None
 ):
     """Get restaurants that are currently open"""
-    restaurants = await customer_restaurant_service.get_open_now(
+    page = customer_restaurant_service.get_open_now(
         cuisine=cuisine,
         skip=skip,
-        limit=limit
+        limit=limit,
+        after=after
     )
-    return restaurants
+    return await _paginated(response, page)
 
 @router.get("/customers/restaurants/new-arrivals")
 async def get_new_arrivals(
+    response: Response,
     cuisine: Optional[str] = None,
     skip: int = 0,
-    limit: int = 20
+    limit: int = 20,
+    after: Optional[str] = None
 ):
     """Get newly onboarded restaurants"""
-    restaurants = await customer_restaurant_service.get_new_arrivals(
+    page = customer_restaurant_service.get_new_arrivals(
         cuisine=cuisine,
         skip=skip,
-        limit=limit
+        limit=limit,
+        after=after
     )
-    return restaurants
+    return await _paginated(response, page)
 
 @router.get("/customers/restaurants/by-location")
 async def get_restaurants_by_location(
+    cuisine: Optional[str] = None,
+    city: Optional[str] = None,
+    limit: int = customer_restaurant_service.DEFAULT_GROUP_SIZE,
+    groups: int = customer_restaurant_service.DEFAULT_GROUP_COUNT,
+    after: Optional[str] = None
+):
+    """Get restaurants grouped by city (continue one group with ?city=&after=)"""
+    try:
+        return await customer_restaurant_service.get_restaurants_by_location(
+            cuisine=cuisine,
+            city=city,
+            limit=limit,
+            groups=groups,
+            after=after
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/customers/restaurants/nearby")
+async def get_nearby_restaurants(
+    response: Response,
+    lat: float,
+    lng: float,
+    radius: float = customer_restaurant_service.DEFAULT_NEARBY_RADIUS,
     cuisine: Optional[str] = None,
     skip: int = 0,
-    limit: int = 50
+    limit: int = 20,
+    after: Optional[str] = None
 ):
-    """Get restaurants for grouping by location"""
-    restaurants = await customer_restaurant_service.get_restaurants_by_location(
+    """Get restaurants within radius meters of a point, nearest first"""
+    page = customer_restaurant_service.get_nearby_restaurants(
+        lat=lat,
+        lng=lng,
+        radius=radius,
         cuisine=cuisine,
         skip=skip,
-        limit=limit
+        limit=limit,
+        after=after
     )
-    return restaurants
+    return await _paginated(response, page)
 
 @router.get("/customers/restaurants/by-promo")
 async def get_restaurants_by_promo(
     cuisine: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 50
+    deal_type: Optional[str] = None,
+    limit: int = customer_restaurant_service.DEFAULT_GROUP_SIZE,
+    groups: int = customer_restaurant_service.DEFAULT_GROUP_COUNT,
+    after: Optional[str] = None
 ):
-    """Get restaurants with active promos for grouping"""
-    restaurants = await customer_restaurant_service.get_restaurants_by_promo(
-        cuisine=cuisine,
-        skip=skip,
-        limit=limit
-    )
-    return restaurants
+    """Get restaurants with active deals grouped by deal type (continue one group with ?deal_type=&after=)"""
+    try:
+        return await customer_restaurant_service.get_restaurants_by_promo(
+            cuisine=cuisine,
+            deal_type=deal_type,
+            limit=limit,
+            groups=groups,
+            after=after
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/customers/restaurants/search")
 async def search_restaurants(
+    response: Response,
     query: str,
     skip: int = 0,
-    limit: int = 20
+    limit: int = 20,
+    after: Optional[str] = None
 ):
-    """Search restaurants by name or cuisine"""
-    restaurants = await customer_restaurant_service.search_restaurants(
+    """Search restaurants by name, cuisine, city, or description (ranked by relevance)"""
+    page = customer_restaurant_service.search_restaurants(
         query=query,
         skip=skip,
-        limit=limit
+        limit=limit,
+        after=after
     )
-    return restaurants
+    return await _paginated(response, page)
+
+@router.get("/customers/restaurants/suggest")
+async def suggest_restaurants(q: str, limit: int = 8):
+    """Autocomplete restaurant names, cuisines, and cities (typo tolerant, served from memory)"""
+    return suggest_service.suggest(q, limit)
+
+@router.get("/customers/restaurants/facets")
+async def get_restaurant_facets(
+    cuisine: Optional[str] = None,
+    city: Optional[str] = None,
+    feature: Optional[str] = None
+):
+    """Get restaurant counts per cuisine, city, and feature (optionally narrowed by current filters)"""
+    return await facet_service.get_facets(cuisine=cuisine, city=city, feature=feature)
 
 @router.get("/customers/restaurants/{restaurant_id}")
-async def get_restaurant_details(restaurant_id: str):
-    """Get detailed information about a specific restaurant"""
-    restaurant = await customer_restaurant_service.get_restaurant_by_id(restaurant_id)
-    if not restaurant:
+async def get_restaurant_details(restaurant_id: str, request: Request, response: Response):
+    """Get detailed information about a specific restaurant (supports If-None-Match)"""
+    # Conditional GET: a version-only read decides whether the client's copy is current
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etag = await customer_restaurant_service.get_restaurant_etag(restaurant_id)
+        if etag and etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    
+    result = await customer_restaurant_service.get_restaurant_by_id(restaurant_id)
+    if not result:
         raise HTTPException(status_code=404, detail="Restaurant not found")
+    
+    restaurant, etag = result
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
     return restaurant
 
+@router.get("/customers/restaurants/{restaurant_id}/reviews")
+async def get_restaurant_reviews(restaurant_id: str, skip: int = 0, limit: int = 20):
+    """Get reviews for a restaurant, newest first"""
+    return await review_service.get_restaurant_reviews(restaurant_id, skip=skip, limit=limit)
+
 @router.get("/restaurant/image/{file_id}")
 async def get_restaurant_image(file_id: str):
     """
@@ -6,18 +6,23 @@ Handles reservation creation, availability checking, bill retrieval, and payment
 """
 
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Header
 from schemas.reservation_schema import (
     ReservationCreate,
     ReservationOut,
     AvailabilityCheck,
     AvailabilityResponse,
-    TimeSlotAvailability
+    TimeSlotAvailability,
+    AvailabilityCalendar,
+    HoldCreate,
+    HoldOut,
+    WaitlistOut
 )
 from schemas.bill_schema import BillOut
-from services import reservation_service, bill_service
+from schemas.review_schema import ReviewCreate, ReviewOut
+from services import reservation_service, bill_service, review_service, idempotency_service
 from utils.auth import get_current_customer
-from typing import List
+from typing import List, Optional
 
 router = APIRouter()
 
@@ -42,7 +47,8 @@ async def get_restaurant_hours(restaurant_id: str, date: str):
     # Generate available time slots
     time_slots = reservation_service.generate_time_slots(
         hours["open"],
-        hours["close"]
+        hours["close"],
+        hours["slot_interval"]
     )
     
     return {
@@ -84,25 +90,122 @@ async def get_daily_availability(restaurant_id: str, date: str):
     
     return availability
 
+@router.get("/reservations/calendar/{restaurant_id}", response_model=AvailabilityCalendar)
+async def get_availability_calendar(
+    restaurant_id: str,
+    start_date: Optional[str] = Query(None, description="First date (YYYY-MM-DD), defaults to today at the restaurant"),
+    days: Optional[int] = Query(None, ge=1, description="Number of days, capped at the restaurant's advance booking days")
+):
+    """Get per-day and per-slot availability for a window of dates"""
+    try:
+        calendar = await reservation_service.get_availability_calendar(restaurant_id, start_date, days)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start_date must be in YYYY-MM-DD format")
+    
+    if not calendar:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+    
+    return calendar
+
 @router.post("/reservations", response_model=ReservationOut)
 async def create_reservation(
     reservation: ReservationCreate,
+    current_user: dict = Depends(get_current_customer),
+    idempotency_key: Optional[str] = Header(None, alias=idempotency_service.IDEMPOTENCY_HEADER)
+):
+    """
+    Create a new reservation with seating area (Protected - Customer only).
+    Retries sent with the same Idempotency-Key get the first response instead of booking again.
+    """
+    
+    async def create():
+        new_reservation = await reservation_service.create_reservation(
+            reservation.dict(),
+            current_user["email"]
+        )
+        
+        if not new_reservation:
+            raise HTTPException(
+                status_code=400,
+                detail="Unable to create reservation. Restaurant may be closed, slot may be full (join the waitlist instead), seating area unavailable, time is outside operating hours, or the hold has expired."
+            )
+        
+        return new_reservation
+    
+    return await idempotency_service.run_once(
+        idempotency_key,
+        current_user["email"],
+        "POST /reservations",
+        reservation.dict(),
+        create
+    )
+
+# ==================== HOLD ROUTES ====================
+
+@router.post("/reservations/holds", response_model=HoldOut)
+async def place_hold(
+    hold: HoldCreate,
+    current_user: dict = Depends(get_current_customer)
+):
+    """
+    Hold tables for a few minutes while the booking form is filled in; book them by passing
+    hold_id to POST /reservations before expires_at
+    """
+    result = await reservation_service.place_hold(hold.dict(), current_user["email"])
+    
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    
+    return result["hold"]
+
+@router.delete("/reservations/holds/{hold_id}")
+async def release_hold(
+    hold_id: str,
     current_user: dict = Depends(get_current_customer)
 ):
-    """Create a new reservation with seating area (Protected - Customer only)"""
+    """Release a hold early"""
+    result = await reservation_service.release_hold(hold_id, current_user["email"])
     
-    new_reservation = await reservation_service.create_reservation(
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["error"])
+    
+    return {"message": "Hold released"}
+
+# ==================== WAITLIST ROUTES ====================
+
+@router.post("/reservations/waitlist", response_model=WaitlistOut)
+async def join_waitlist(
+    reservation: ReservationCreate,
+    current_user: dict = Depends(get_current_customer)
+):
+    """Join the waitlist for a full slot; the reservation is made automatically when tables free up"""
+    result = await reservation_service.join_waitlist(
         reservation.dict(),
         current_user["email"]
     )
     
-    if not new_reservation:
-        raise HTTPException(
-            status_code=400,
-            detail="Unable to create reservation. Restaurant may be closed, slot may be full, seating area unavailable, or time is outside operating hours."
-        )
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    
+    return result["entry"]
+
+@router.get("/reservations/waitlist/my", response_model=List[WaitlistOut])
+async def get_my_waitlist(current_user: dict = Depends(get_current_customer)):
+    """Get the logged-in customer's waitlist entries"""
+    return await reservation_service.get_customer_waitlist(current_user["email"])
+
+@router.delete("/reservations/waitlist/{entry_id}")
+async def leave_waitlist(
+    entry_id: str,
+    current_user: dict = Depends(get_current_customer)
+):
+    """Leave a waitlist"""
+    result = await reservation_service.leave_waitlist(entry_id, current_user["email"])
     
-    return new_reservation
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["error"])
+    
+    return {"message": "Removed from waitlist"}
 
 @router.get("/reservations/my-reservations", response_model=List[ReservationOut])
 async def get_my_reservations(current_user: dict = Depends(get_current_customer)):
@@ -166,12 +269,46 @@ async def get_reservation_bill(
 @router.post("/reservations/{reservation_id}/pay")
 async def pay_bill(
     reservation_id: str,
+    current_user: dict = Depends(get_current_customer),
+    idempotency_key: Optional[str] = Header(None, alias=idempotency_service.IDEMPOTENCY_HEADER)
+):
+    """Mark bill as paid (retries sent with the same Idempotency-Key get the first response)"""
+    
+    async def pay():
+        result = await bill_service.mark_bill_as_paid(
+            reservation_id,
+            current_user["email"]
+        )
+        
+        if not result["success"]:
+            raise HTTPException(
+                status_code=400,
+                detail=result["error"]
+            )
+        
+        return {"message": "Payment successful", "transaction_id": result["transaction_id"]}
+    
+    return await idempotency_service.run_once(
+        idempotency_key,
+        current_user["email"],
+        f"POST /reservations/{reservation_id}/pay",
+        None,
+        pay
+    )
+
+# ==================== END BILL ROUTES ====================
+
+@router.post("/reservations/{reservation_id}/review", response_model=ReviewOut)
+async def review_reservation(
+    reservation_id: str,
+    review: ReviewCreate,
     current_user: dict = Depends(get_current_customer)
 ):
-    """Mark bill as paid"""
-    result = await bill_service.mark_bill_as_paid(
+    """Rate a completed reservation (one review per reservation)"""
+    result = await review_service.create_review(
         reservation_id,
-        current_user["email"]
+        current_user["email"],
+        review.dict()
     )
     
     if not result["success"]:
@@ -180,9 +317,7 @@ async def pay_bill(
             detail=result["error"]
         )
     
-    return {"message": "Payment successful", "transaction_id": result["transaction_id"]}
-
-# ==================== END BILL ROUTES ====================
+    return result["review"]
 
 @router.delete("/reservations/{reservation_id}")
 async def cancel_reservation(
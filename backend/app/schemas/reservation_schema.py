@@ -21,6 +21,7 @@ class ReservationCreate(BaseModel):
     number_of_guests: int
     seating_area_id: str  # Selected seating area
     special_requests: Optional[str] = None
+    hold_id: Optional[str] = None  # Slot hold to book (from POST /reservations/holds)
 
 class ReservationOut(BaseModel):
     id: str
@@ -41,6 +42,38 @@ class ReservationOut(BaseModel):
     bill: Optional[Dict[str, Any]] = None
     created_at: datetime
 
+class HoldCreate(BaseModel):
+    restaurant_id: str
+    date: str  # Format: "2025-01-15"
+    time_slot: str  # Format: "18:00"
+    number_of_guests: int
+    seating_area_id: str
+
+class HoldOut(BaseModel):
+    id: str
+    restaurant_id: str
+    date: str
+    time_slot: str
+    number_of_guests: int
+    seating_area_id: str
+    seating_area_name: str
+    status: str  # active, converted, released, expired
+    expires_at: datetime  # UTC
+
+class WaitlistOut(BaseModel):
+    id: str
+    restaurant_id: str
+    restaurant_name: str
+    customer_name: str
+    customer_email: EmailStr
+    date: str
+    time_slot: str
+    number_of_guests: int
+    seating_area_id: str
+    status: str  # waiting, promoting, promoted, cancelled
+    reservation_id: Optional[str] = None  # Set once promoted
+    created_at: datetime
+
 class AvailabilityCheck(BaseModel):
     restaurant_id: str
     date: str
@@ -61,6 +94,19 @@ class TimeSlotAvailability(BaseModel):
     total_capacity: int
     booked: int
 
+class DayAvailability(BaseModel):
+    date: str
+    day: str
+    closed: bool
+    available: bool
+    available_slots: int
+    slots: List[TimeSlotAvailability]
+
+class AvailabilityCalendar(BaseModel):
+    restaurant_id: str
+    start_date: str
+    days: List[DayAvailability]
+
 class DealOut(BaseModel):
     id: str
     title: str
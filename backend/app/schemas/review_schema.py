@@ -0,0 +1,17 @@
+# schemas/review_schema.py
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+class ReviewCreate(BaseModel):
+    rating: int = Field(..., ge=1, le=5)
+    comment: Optional[str] = Field(None, max_length=1000)
+
+class ReviewOut(BaseModel):
+    id: str
+    reservation_id: str
+    restaurant_id: str
+    customer_name: str
+    rating: int
+    comment: Optional[str] = None
+    created_at: datetime
@@ -10,6 +10,7 @@ from database import Restaurant_db
 from bson import ObjectId
 from typing import Optional, Dict
 from datetime import datetime
+from shared import reservations
 
 async def get_bill_by_reservation_id(reservation_id: str, customer_email: str) -> Optional[Dict]:
     """Get bill for a specific reservation"""
@@ -69,18 +70,21 @@ async def mark_bill_as_paid(reservation_id: str, customer_email: str) -> Dict:
         if reservation["bill"].get("paid"):
             return {"success": False, "error": "Bill already paid"}
         
-        # Update bill as paid
-        await Restaurant_db.reservations.update_one(
-            {"_id": ObjectId(reservation_id)},
-            {
-                "$set": {
-                    "bill.paid": True,
-                    "bill.paid_at": datetime.utcnow(),
-                    "status": "completed"
-                }
-            }
+        if reservation.get("status") != reservations.CONFIRMED:
+            return {"success": False, "error": f"Cannot pay for a {reservation.get('status')} reservation"}
+        
+        # Pay and complete in one conditional update, so two concurrent payments can't both succeed
+        # and a reservation cancelled in the meantime stays cancelled
+        paid = await reservations.complete_reservation(
+            Restaurant_db,
+            reservation["_id"],
+            {"bill.paid": True, "bill.paid_at": datetime.utcnow()},
+            {"bill.paid": {"$ne": True}}
         )
         
+        if not paid:
+            return {"success": False, "error": "Bill already paid or reservation no longer confirmed"}
+        
         return {
             "success": True,
             "transaction_id": reservation["bill"].get("bill_id")
@@ -0,0 +1,96 @@
+# services/change_feed.py
+"""
+Restaurant change feed.
+Follows writes to Restaurant_db.restaurants (made by the restaurant backend) and fans them out
+to in-process subscribers such as the suggest index. Uses a MongoDB change stream when the
+deployment supports one (replica sets / Atlas) and falls back to polling updated_at otherwise.
+"""
+
+import asyncio
+from database import Restaurant_db
+from typing import Callable, Dict, List, Optional
+from datetime import datetime
+from pymongo.errors import OperationFailure, PyMongoError
+
+# Called with (restaurant_id, full document); the document is None when the restaurant was deleted
+Subscriber = Callable[[str, Optional[Dict]], None]
+
+# Error code returned by standalone servers that don't support change streams
+CHANGE_STREAMS_UNSUPPORTED = 40573
+POLL_INTERVAL_SECONDS = 5
+RETRY_DELAY_SECONDS = 5
+
+_subscribers: List[Subscriber] = []
+_task: Optional[asyncio.Task] = None
+
+def subscribe(callback: Subscriber) -> None:
+    """Register a callback for restaurant changes"""
+    _subscribers.append(callback)
+
+def publish(restaurant_id: str, document: Optional[Dict]) -> None:
+    """Deliver a restaurant change to every subscriber (a failing subscriber doesn't block the rest)"""
+    for callback in _subscribers:
+        try:
+            callback(restaurant_id, document)
+        except Exception as e:
+            print(f"Error in restaurant change subscriber: {e}")
+
+def start() -> None:
+    """Start following restaurant changes in the background"""
+    global _task
+    if _task is None:
+        _task = asyncio.create_task(_run())
+
+async def stop() -> None:
+    """Stop following restaurant changes"""
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+
+async def _run() -> None:
+    resume_token = None
+
+    while True:
+        try:
+            async with Restaurant_db.restaurants.watch(
+                full_document="updateLookup",
+                resume_after=resume_token
+            ) as stream:
+                async for change in stream:
+                    resume_token = stream.resume_token
+                    restaurant_id = str(change["documentKey"]["_id"])
+                    # fullDocument is absent for deletes (and for updates to since-deleted documents)
+                    publish(restaurant_id, change.get("fullDocument"))
+        except OperationFailure as e:
+            if e.code == CHANGE_STREAMS_UNSUPPORTED:
+                print("Change streams unavailable, polling restaurants for updates instead")
+                await _poll_updates()
+                return
+            print(f"Restaurant change stream failed: {e}")
+            resume_token = None
+        except PyMongoError as e:
+            print(f"Restaurant change stream interrupted: {e}")
+
+        await asyncio.sleep(RETRY_DELAY_SECONDS)
+
+async def _poll_updates() -> None:
+    """Fallback for deployments without change streams (deletes are not observed)"""
+    last_seen = datetime.utcnow()
+
+    while True:
+        await asyncio.sleep(POLL_INTERVAL_SECONDS)
+        try:
+            cursor = Restaurant_db.restaurants.find(
+                {"updated_at": {"$gt": last_seen}}
+            ).sort("updated_at", 1)
+
+            async for restaurant in cursor:
+                last_seen = max(last_seen, restaurant["updated_at"])
+                publish(str(restaurant["_id"]), restaurant)
+        except PyMongoError as e:
+            print(f"Error polling restaurant updates: {e}")
@@ -1,28 +1,84 @@
 # services/customer_restaurant_service.py
 
+import re
+import time
+import asyncio
 from database import Restaurant_db
 from bson import ObjectId
-from typing import Optional, List, Dict
-from datetime import datetime, time as dt_time, timedelta
-from services import deal_service
+from typing import Optional, List, Dict, Tuple
+from datetime import datetime, date, time as dt_time, timedelta
+from services import deal_service, reservation_service
+from utils.pagination import Sort, apply_cursor, encode_cursor, decode_cursor, keyset_filter
+from shared import schedule, deals, ledger
+from shared.versioning import restaurant_etag
+
+# Fields needed to build a restaurant summary (skips photos, seating config, password hash, etc.)
+SUMMARY_PROJECTION = {
+    "restaurant_name": 1,
+    "city": 1,
+    "address": 1,
+    "cuisines": 1,
+    "thumbnail_id": 1,
+    "description": 1,
+    "promos": 1,
+    "deal_windows": 1,
+    "rating_avg": 1,
+    "rating_count": 1
+}
+
+# Stable sort orders for keyset pagination; _id is always the final tie-breaker
+DEFAULT_SORT: Sort = [("_id", 1)]
+NEW_ARRIVALS_SORT: Sort = [("created_at", -1), ("_id", -1)]
+TOP_RATED_SORT: Sort = [("rating_avg", -1), ("rating_count", -1), ("_id", -1)]
+NEARBY_SORT: Sort = [("distance", 1), ("_id", 1)]
+SEARCH_SORT: Sort = [("search_score", -1), ("_id", 1)]
+
+# How long the list of restaurant time zones used by "open now" is reused before re-reading it
+TIMEZONES_TTL_SECONDS = 300
+_timezones_cache: Tuple[float, List[str]] = (0.0, [])
+
+# Grouped feeds (by-location, by-promo): restaurants per group and number of groups
+DEFAULT_GROUP_SIZE = 10
+DEFAULT_GROUP_COUNT = 10
+
+# Nearby search radius in meters (default and cap)
+DEFAULT_NEARBY_RADIUS = 5000
+MAX_NEARBY_RADIUS = 50000
+
+# Upper bound on words passed to $text, so a pasted paragraph can't fan out into a huge OR
+MAX_SEARCH_TERMS = 10
 
 async def get_restaurants(
     city: Optional[str] = None,
     cuisine: Optional[str] = None,
     skip: int = 0,
-    limit: int = 20
-) -> List[Dict]:
+    limit: int = 20,
+    after: Optional[str] = None,
+    date: Optional[str] = None,
+    time_slot: Optional[str] = None,
+    party_size: Optional[int] = None
+) -> Tuple[List[Dict], Optional[str]]:
     """
     Get list of onboarded restaurants with optional filters for city and cuisine.
+    With date, time_slot, and party_size it becomes an availability search that only returns
+    restaurants with a seating area that can still seat the party in that slot.
     
     Args:
         city: Optional city filter (case-insensitive regex search)
         cuisine: Optional cuisine filter (checks if cuisine exists in restaurant's cuisine list)
-        skip: Number of records to skip for pagination
+        skip: Number of records to skip for pagination (ignored when after is given)
         limit: Maximum number of records to return
+        after: Opaque cursor from a previous page (keyset pagination)
+        date: Reservation date ("YYYY-MM-DD", restaurant-local) for availability search
+        time_slot: Reservation slot ("HH:MM") for availability search
+        party_size: Number of guests for availability search
     
     Returns:
-        List of formatted restaurant summary dictionaries
+        Tuple of (list of formatted restaurant summary dictionaries, next page cursor or None).
+        Availability results also carry availableSeatingAreas.
+    
+    Raises:
+        ValueError: If the availability parameters are incomplete or malformed, or the cursor is malformed
     """
     
     # Base query: only show onboarded restaurants
@@ -36,294 +92,489 @@ async def get_restaurants(
     if cuisine:
         query["cuisines"] = {"$in": [cuisine]}
     
-    # Execute query with pagination
-    cursor = Restaurant_db.restaurants.find(query).skip(skip).limit(limit)
-    restaurants = await cursor.to_list(length=limit)
+    if date or time_slot or party_size:
+        return await _search_available(query, date, time_slot, party_size, skip, limit, after)
     
-    # Format each restaurant for API response
-    result = []
-    for restaurant in restaurants:
-        result.append(await _format_restaurant_summary(restaurant))
+    # Execute query with keyset pagination (stable sort on _id)
+    restaurants, next_cursor = await _fetch_page(query, DEFAULT_SORT, skip, limit, after)
     
-    return result
+    # Format each restaurant for API response
+    return _format_restaurant_summaries(restaurants), next_cursor
 
 async def get_premium_restaurants(
     cuisine: Optional[str] = None,
     skip: int = 0,
-    limit: int = 20
-) -> List[Dict]:
+    limit: int = 20,
+    after: Optional[str] = None
+) -> Tuple[List[Dict], Optional[str]]:
     """
     Get premium/featured restaurants (Fine Dining, Premium, or Luxury).
     
     Args:
         cuisine: Optional cuisine filter
-        skip: Number of records to skip for pagination
+        skip: Number of records to skip for pagination (ignored when after is given)
         limit: Maximum number of records to return
+        after: Opaque cursor from a previous page (keyset pagination)
     
     Returns:
-        List of formatted premium restaurant summaries
+        Tuple of (list of formatted premium restaurant summaries, next page cursor or None)
     """
     
-    # Query for onboarded restaurants with premium features
-    query = {
-        "is_onboarded": True,
-        "features": {"$in": ["Fine Dining", "Premium", "Luxury"]}
-    }
-    
-    # Add cuisine filter if provided
-    if cuisine:
-        query["cuisines"] = {"$in": [cuisine]}
+    query = _premium_query(cuisine)
     
-    # Execute query with pagination
-    cursor = Restaurant_db.restaurants.find(query).skip(skip).limit(limit)
-    restaurants = await cursor.to_list(length=limit)
+    # Execute query with keyset pagination (stable sort on _id)
+    restaurants, next_cursor = await _fetch_page(query, DEFAULT_SORT, skip, limit, after)
     
     # Format each restaurant for API response
-    result = []
-    for restaurant in restaurants:
-        result.append(await _format_restaurant_summary(restaurant))
-    
-    return result
+    return _format_restaurant_summaries(restaurants), next_cursor
 
 async def get_todays_deals(
     cuisine: Optional[str] = None,
     skip: int = 0,
-    limit: int = 50
-) -> List[Dict]:
+    limit: int = 50,
+    after: Optional[str] = None
+) -> Tuple[List[Dict], Optional[str]]:
     """
     Get restaurants that have active promotional deals today.
     
     Args:
         cuisine: Optional cuisine filter
-        skip: Number of records to skip for pagination
+        skip: Number of records to skip for pagination (ignored when after is given)
         limit: Maximum number of records to return
+        after: Opaque cursor from a previous page (keyset pagination)
     
     Returns:
-        List of formatted restaurants that have active deals (filtered to only include those with actual active deals)
+        Tuple of (list of formatted restaurants that have active deals, next page cursor or None)
     """
     
-    # Query for onboarded restaurants that have promos defined
-    query = {
-        "is_onboarded": True,
-        "promos": {"$exists": True, "$ne": []}
-    }
-    
-    # Add cuisine filter if provided
-    if cuisine:
-        query["cuisines"] = {"$in": [cuisine]}
-    
-    # Execute query with pagination
-    cursor = Restaurant_db.restaurants.find(query).skip(skip).limit(limit)
-    restaurants = await cursor.to_list(length=limit)
+    query = _todays_deals_query(cuisine)
     
-    # Format restaurants and filter to only those with currently active deals
-    result = []
-    for restaurant in restaurants:
-        restaurant_data = await _format_restaurant_summary(restaurant)
-        # Only include restaurants that have active deals right now
-        if restaurant_data.get("activeDeals"):
-            result.append(restaurant_data)
+    # Execute query with keyset pagination (stable sort on _id); the deal window match is exact, so pages are full
+    restaurants, next_cursor = await _fetch_page(query, DEFAULT_SORT, skip, limit, after)
     
-    return result
+    return _format_restaurant_summaries(restaurants), next_cursor
 
 async def get_top_rated(
     cuisine: Optional[str] = None,
     skip: int = 0,
-    limit: int = 20
-) -> List[Dict]:
+    limit: int = 20,
+    after: Optional[str] = None
+) -> Tuple[List[Dict], Optional[str]]:
     """
-    Get top rated restaurants sorted by rating.
-    Note: Currently returns restaurants without actual rating-based sorting.
-    In production, this would query a reviews collection and sort by aggregate ratings.
+    Get top rated restaurants sorted by average rating (more reviews break ties).
+    Reads the rating aggregate maintained on each restaurant by review_service,
+    so this is a single indexed, sorted query.
     
     Args:
         cuisine: Optional cuisine filter
-        skip: Number of records to skip for pagination
+        skip: Number of records to skip for pagination (ignored when after is given)
         limit: Maximum number of records to return
+        after: Opaque cursor from a previous page (keyset pagination)
     
     Returns:
-        List of formatted restaurant summaries
+        Tuple of (list of formatted restaurant summaries, next page cursor or None)
     """
     
-    # Base query: only onboarded restaurants
-    query = {"is_onboarded": True}
+    query = _top_rated_query(cuisine)
     
-    # Add cuisine filter if provided
-    if cuisine:
-        query["cuisines"] = {"$in": [cuisine]}
-    
-    # TODO: In production, sort by actual ratings from reviews collection
-    cursor = Restaurant_db.restaurants.find(query).skip(skip).limit(limit)
-    restaurants = await cursor.to_list(length=limit)
+    # Execute query sorted by rating (highest first) with keyset pagination
+    restaurants, next_cursor = await _fetch_page(query, TOP_RATED_SORT, skip, limit, after)
     
     # Format each restaurant for API response
-    result = []
-    for restaurant in restaurants:
-        result.append(await _format_restaurant_summary(restaurant))
-    
-    return result
+    return _format_restaurant_summaries(restaurants), next_cursor
 
 async def get_open_now(
     cuisine: Optional[str] = None,
     skip: int = 0,
-    limit: int = 20
-) -> List[Dict]:
+    limit: int = 20,
+    after: Optional[str] = None
+) -> Tuple[List[Dict], Optional[str]]:
     """
     Get restaurants that are currently open based on their operating hours.
-    Compares current UTC time against restaurant's hours for today.
+    Matches the current local minute of the week in each restaurant time zone against the open
+    intervals the restaurant backend compiles from each restaurant's hours, so filtering happens
+    in the (indexed) query and every page is full.
     
     Args:
         cuisine: Optional cuisine filter
-        skip: Number of records to skip for pagination
+        skip: Number of records to skip for pagination (ignored when after is given)
         limit: Maximum number of records to return
+        after: Opaque cursor from a previous page (keyset pagination)
     
     Returns:
-        List of formatted restaurants that are open right now
+        Tuple of (list of formatted restaurants that are open right now, next page cursor or None)
     """
     
-    # Base query: only onboarded restaurants
-    query = {"is_onboarded": True}
+    query = await _open_now_query(cuisine)
     
-    # Add cuisine filter if provided
-    if cuisine:
-        query["cuisines"] = {"$in": [cuisine]}
+    # Execute query with keyset pagination (stable sort on _id)
+    restaurants, next_cursor = await _fetch_page(query, DEFAULT_SORT, skip, limit, after)
     
-    # Execute query with pagination
-    cursor = Restaurant_db.restaurants.find(query).skip(skip).limit(limit)
-    restaurants = await cursor.to_list(length=limit)
+    # Format each restaurant for API response
+    return _format_restaurant_summaries(restaurants), next_cursor
+
+async def _restaurant_timezones() -> List[str]:
+    """Distinct restaurant time zones, cached briefly (zones change only when an owner edits them)"""
+    global _timezones_cache
     
-    # Get current day and time for comparison
-    current_day = datetime.utcnow().strftime("%A").lower()
-    current_time = datetime.utcnow().time()
+    expires_at, timezones = _timezones_cache
+    if time.monotonic() < expires_at:
+        return timezones
     
-    result = []
-    for restaurant in restaurants:
-        # Get operating hours for the restaurant
-        hours = restaurant.get("hours", {})
-        day_hours = hours.get(current_day, {})
-        
-        # Skip if restaurant is closed today
-        if day_hours.get("is_closed"):
-            continue
-        
-        try:
-            # Extract opening and closing times
-            open_time_str = day_hours.get("open")
-            close_time_str = day_hours.get("close")
-            
-            if open_time_str and close_time_str:
-                # Parse time strings to time objects
-                open_time = datetime.strptime(open_time_str, "%H:%M").time()
-                close_time = datetime.strptime(close_time_str, "%H:%M").time()
-                
-                # Check if current time is within operating hours
-                if open_time <= current_time <= close_time:
-                    result.append(await _format_restaurant_summary(restaurant))
-        except Exception as e:
-            # Log error and skip this restaurant if hours parsing fails
-            print(f"Error checking hours: {e}")
-            continue
+    try:
+        timezones = await Restaurant_db.restaurants.distinct("timezone", {"is_onboarded": True})
+    except Exception as e:
+        print(f"Error fetching restaurant time zones: {e}")
     
-    return result
+    timezones = [tz for tz in timezones if schedule.is_valid_timezone(tz)] or [schedule.DEFAULT_TIMEZONE]
+    _timezones_cache = (time.monotonic() + TIMEZONES_TTL_SECONDS, timezones)
+    return timezones
 
 async def get_new_arrivals(
     cuisine: Optional[str] = None,
     skip: int = 0,
-    limit: int = 20
-) -> List[Dict]:
+    limit: int = 20,
+    after: Optional[str] = None
+) -> Tuple[List[Dict], Optional[str]]:
     """
     Get newly onboarded restaurants from the last 30 days.
     
     Args:
         cuisine: Optional cuisine filter
-        skip: Number of records to skip for pagination
+        skip: Number of records to skip for pagination (ignored when after is given)
         limit: Maximum number of records to return
+        after: Opaque cursor from a previous page (keyset pagination)
     
     Returns:
-        List of formatted restaurant summaries sorted by creation date (newest first)
+        Tuple of (list of formatted restaurant summaries sorted by creation date (newest first), next page cursor or None)
     """
     
-    # Calculate date 30 days ago
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+    query = _new_arrivals_query(cuisine)
     
-    # Query for recently onboarded restaurants
-    query = {
-        "is_onboarded": True,
-        "created_at": {"$gte": thirty_days_ago}
-    }
+    # Execute query sorted by creation date (newest first, _id breaks ties) with keyset pagination
+    restaurants, next_cursor = await _fetch_page(query, NEW_ARRIVALS_SORT, skip, limit, after)
     
-    # Add cuisine filter if provided
-    if cuisine:
-        query["cuisines"] = {"$in": [cuisine]}
+    # Format each restaurant for API response
+    return _format_restaurant_summaries(restaurants), next_cursor
+
+async def get_restaurants_by_location(
+    cuisine: Optional[str] = None,
+    city: Optional[str] = None,
+    limit: int = DEFAULT_GROUP_SIZE,
+    groups: int = DEFAULT_GROUP_COUNT,
+    after: Optional[str] = None
+) -> List[Dict]:
+    """
+    Get restaurants grouped by city, largest cities first.
+    Grouping happens in one aggregation ($sort + $group with $firstN), so only the
+    restaurants shown in each group are sent.
     
-    # Execute query with sorting by creation date (descending) and pagination
-    cursor = Restaurant_db.restaurants.find(query).sort("created_at", -1).skip(skip).limit(limit)
-    restaurants = await cursor.to_list(length=limit)
+    Args:
+        cuisine: Optional cuisine filter
+        city: Only return this city's group (required with after)
+        limit: Maximum number of restaurants per group
+        groups: Maximum number of groups
+        after: A group's nextCursor, continuing that group (keyset pagination on _id)
     
-    # Format each restaurant for API response
-    result = []
-    for restaurant in restaurants:
-        result.append(await _format_restaurant_summary(restaurant))
+    Returns:
+        List of {"city", "count", "restaurants", "nextCursor"} groups; count is the number of
+        matching restaurants in the group from the cursor on
     
-    return result
+    Raises:
+        ValueError: If after is given without city, or the cursor is malformed
+    """
+    
+    query = _by_location_query(cuisine)
+    
+    if city is not None:
+        query["city"] = city
+    elif after:
+        raise ValueError("A group cursor must be used with its city")
+    
+    pipeline = [
+        {"$match": apply_cursor(query, DEFAULT_SORT, after)},
+        {"$sort": {"city": 1, "_id": 1}},
+        {"$project": SUMMARY_PROJECTION},
+        *_group_stages("$city", limit, groups)
+    ]
+    
+    grouped = await Restaurant_db.restaurants.aggregate(pipeline).to_list(length=groups)
+    
+    return _format_groups(grouped, "city", limit)
 
-async def get_restaurants_by_location(
+async def get_nearby_restaurants(
+    lat: float,
+    lng: float,
+    radius: float = DEFAULT_NEARBY_RADIUS,
     cuisine: Optional[str] = None,
     skip: int = 0,
-    limit: int = 50
-) -> List[Dict]:
+    limit: int = 20,
+    after: Optional[str] = None
+) -> Tuple[List[Dict], Optional[str]]:
     """
-    Get restaurants grouped by location.
-    Note: Currently returns all restaurants; location grouping should be done client-side.
+    Get restaurants near a point, nearest first.
+    Uses $geoNear on the 2dsphere location index the restaurant backend fills in when a
+    profile is saved (restaurants that couldn't be geocoded are not included).
     
     Args:
+        lat: Latitude of the search center
+        lng: Longitude of the search center
+        radius: Search radius in meters (capped at MAX_NEARBY_RADIUS)
         cuisine: Optional cuisine filter
-        skip: Number of records to skip for pagination
+        skip: Number of records to skip for pagination (ignored when after is given)
         limit: Maximum number of records to return
+        after: Opaque cursor from a previous page (keyset pagination on distance and _id)
     
     Returns:
-        List of formatted restaurant summaries
+        Tuple of (list of formatted restaurant summaries with distanceMeters, next page cursor or None)
+    
+    Raises:
+        ValueError: If the coordinates or radius are out of range, or the cursor is malformed
     """
     
-    # Base query: only onboarded restaurants
-    query = {"is_onboarded": True}
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError("Invalid latitude/longitude")
+    if radius <= 0:
+        raise ValueError("Radius must be positive")
+    
+    geo_near = {
+        "near": {"type": "Point", "coordinates": [lng, lat]},
+        "distanceField": "distance",
+        "maxDistance": min(radius, MAX_NEARBY_RADIUS),
+        "query": _with_cuisine({"is_onboarded": True}, cuisine),
+        "key": "location",
+        "spherical": True
+    }
     
-    # Add cuisine filter if provided
-    if cuisine:
-        query["cuisines"] = {"$in": [cuisine]}
+    keyset = None
+    if after:
+        cursor_values = decode_cursor(after, NEARBY_SORT)
+        # Start the index walk at the cursor's distance, then skip ties already returned
+        geo_near["minDistance"] = cursor_values[0]
+        keyset = keyset_filter(NEARBY_SORT, cursor_values)
     
-    # Execute query with pagination
-    cursor = Restaurant_db.restaurants.find(query).skip(skip).limit(limit)
-    restaurants = await cursor.to_list(length=limit)
+    # $geoNear must be the first stage
+    pipeline = [{"$geoNear": geo_near}]
+    if keyset:
+        pipeline.append({"$match": keyset})
     
-    # Format each restaurant for API response
-    result = []
-    for restaurant in restaurants:
-        result.append(await _format_restaurant_summary(restaurant))
+    pipeline.append({"$sort": dict(NEARBY_SORT)})
     
-    return result
+    if not after and skip:
+        pipeline.append({"$skip": skip})
+    
+    pipeline.append({"$limit": limit})
+    pipeline.append({"$project": {**SUMMARY_PROJECTION, "distance": 1}})
+    
+    restaurants = await Restaurant_db.restaurants.aggregate(pipeline).to_list(length=limit)
+    
+    next_cursor = None
+    if restaurants and len(restaurants) == limit:
+        next_cursor = encode_cursor(restaurants[-1], NEARBY_SORT)
+    
+    summaries = _format_restaurant_summaries(restaurants)
+    for summary, restaurant in zip(summaries, restaurants):
+        summary["distanceMeters"] = round(restaurant["distance"])
+    
+    return summaries, next_cursor
 
 async def get_restaurants_by_promo(
     cuisine: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 50
+    deal_type: Optional[str] = None,
+    limit: int = DEFAULT_GROUP_SIZE,
+    groups: int = DEFAULT_GROUP_COUNT,
+    after: Optional[str] = None
 ) -> List[Dict]:
     """
-    Get restaurants with active promotional deals.
-    This is an alias for get_todays_deals().
+    Get restaurants with deals active today, grouped by deal type (percentage, bogo, flat_amount).
+    Active deal types are read from each restaurant's precomputed deal windows inside the aggregation,
+    so grouping and the per-group cap happen in one pipeline; a restaurant with several deal types
+    appears in each.
     
     Args:
         cuisine: Optional cuisine filter
-        skip: Number of records to skip for pagination
-        limit: Maximum number of records to return
+        deal_type: Only return this deal type's group (required with after)
+        limit: Maximum number of restaurants per group
+        groups: Maximum number of groups
+        after: A group's nextCursor, continuing that group (keyset pagination on _id)
     
     Returns:
-        List of formatted restaurants with active deals
+        List of {"dealType", "count", "restaurants", "nextCursor"} groups; count is the number of
+        matching restaurants in the group from the cursor on
+    
+    Raises:
+        ValueError: If after is given without deal_type, or the cursor is malformed
     """
     
-    return await get_todays_deals(cuisine, skip, limit)
+    if after and deal_type is None:
+        raise ValueError("A group cursor must be used with its deal type")
+    
+    # Windows only exist for active promos with both dates, and their dates compare as strings
+    today = _today()
+    active_window = {
+        "$and": [
+            {"$lte": ["$$window.start", today]},
+            {"$gte": ["$$window.end", today]}
+        ]
+    }
+    
+    pipeline = [
+        {"$match": apply_cursor(_todays_deals_query(cuisine, today), DEFAULT_SORT, after)},
+        {"$project": SUMMARY_PROJECTION},
+        {"$addFields": {
+            "deal_type": {"$setUnion": [{
+                "$map": {
+                    "input": {"$filter": {"input": "$deal_windows", "as": "window", "cond": active_window}},
+                    "as": "window",
+                    "in": "$$window.type"
+                }
+            }]}
+        }},
+        {"$unwind": "$deal_type"}
+    ]
+    
+    if deal_type is not None:
+        pipeline.append({"$match": {"deal_type": deal_type}})
+    
+    pipeline.append({"$sort": {"deal_type": 1, "_id": 1}})
+    pipeline.extend(_group_stages("$deal_type", limit, groups))
+    
+    grouped = await Restaurant_db.restaurants.aggregate(pipeline).to_list(length=groups)
+    
+    return _format_groups(grouped, "dealType", limit)
 
-async def get_restaurant_by_id(restaurant_id: str) -> Optional[Dict]:
+def _group_stages(key: str, limit: int, groups: int) -> List[Dict]:
+    """
+    Pipeline stages grouping pre-sorted documents by key, largest groups first.
+    Each group keeps limit + 1 documents; the extra one only signals that the group continues.
+    """
+    return [
+        {"$group": {
+            "_id": key,
+            "count": {"$sum": 1},
+            "restaurants": {"$firstN": {"n": limit + 1, "input": "$$ROOT"}}
+        }},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$limit": groups}
+    ]
+
+def _format_groups(grouped: List[Dict], key_name: str, limit: int) -> List[Dict]:
+    """Format aggregated groups, giving each group that has more restaurants its own cursor"""
+    sections = []
+    
+    for group in grouped:
+        restaurants = group["restaurants"]
+        
+        next_cursor = None
+        if len(restaurants) > limit:
+            restaurants = restaurants[:limit]
+            next_cursor = encode_cursor(restaurants[-1], DEFAULT_SORT)
+        
+        sections.append({
+            key_name: group["_id"],
+            "count": group["count"],
+            "restaurants": _format_restaurant_summaries(restaurants),
+            "nextCursor": next_cursor
+        })
+    
+    return sections
+
+async def get_discovery_feed(cuisine: Optional[str] = None, limit: int = 10) -> Dict[str, Dict]:
+    """
+    Assemble every landing-page section in one call.
+    The section queries run concurrently and fetch only _id and sort keys; the distinct
+    restaurants across all sections are then read in a single query and formatted once.
+    
+    Args:
+        cuisine: Optional cuisine filter applied to every section
+        limit: Maximum number of restaurants per section
+    
+    Returns:
+        Dictionary of section name to {"restaurants": [...], "nextCursor": cursor or None};
+        a section's cursor continues it on its own endpoint (?after=)
+    """
+    
+    plans = {
+        "premium": (_premium_query(cuisine), DEFAULT_SORT),
+        "todaysDeals": (_todays_deals_query(cuisine), DEFAULT_SORT),
+        "topRated": (_top_rated_query(cuisine), TOP_RATED_SORT),
+        "openNow": (await _open_now_query(cuisine), DEFAULT_SORT),
+        "newArrivals": (_new_arrivals_query(cuisine), NEW_ARRIVALS_SORT),
+        "byLocation": (_by_location_query(cuisine), DEFAULT_SORT)
+    }
+    
+    # Key-only pages for every section, concurrently
+    pages = await asyncio.gather(*(
+        _fetch_page(query, sort, 0, limit, projection={}) for query, sort in plans.values()
+    ))
+    
+    # One read for the union of restaurants across sections
+    restaurant_ids = list({key["_id"] for keys, _ in pages for key in keys})
+    restaurants = await Restaurant_db.restaurants.find(
+        {"_id": {"$in": restaurant_ids}},
+        SUMMARY_PROJECTION
+    ).to_list(length=len(restaurant_ids))
+    
+    summaries = {summary["id"]: summary for summary in _format_restaurant_summaries(restaurants)}
+    
+    feed = {}
+    for name, (keys, next_cursor) in zip(plans, pages):
+        section = [summaries[str(key["_id"])] for key in keys if str(key["_id"]) in summaries]
+        feed[name] = {"restaurants": section, "nextCursor": next_cursor}
+    
+    # The landing page fills its promo strip from today's deals (grouped views live on /by-promo)
+    feed["byPromo"] = feed["todaysDeals"]
+    
+    return feed
+
+def _with_cuisine(query: Dict, cuisine: Optional[str]) -> Dict:
+    """Add the optional cuisine filter (exact match in cuisines array) to a feed query"""
+    if cuisine:
+        query["cuisines"] = {"$in": [cuisine]}
+    return query
+
+def _premium_query(cuisine: Optional[str]) -> Dict:
+    """Onboarded restaurants with premium features"""
+    return _with_cuisine({
+        "is_onboarded": True,
+        "features": {"$in": ["Fine Dining", "Premium", "Luxury"]}
+    }, cuisine)
+
+def _todays_deals_query(cuisine: Optional[str], today: Optional[str] = None) -> Dict:
+    """Onboarded restaurants with a deal window covering today"""
+    return _with_cuisine({
+        "is_onboarded": True,
+        "deal_windows": {"$elemMatch": deals.active_on(today or _today())}
+    }, cuisine)
+
+def _today() -> str:
+    """Today's date (UTC, as deal validity is evaluated) in the "YYYY-MM-DD" form deal windows store"""
+    return datetime.utcnow().strftime(deals.DATE_FORMAT)
+
+def _top_rated_query(cuisine: Optional[str]) -> Dict:
+    """Onboarded restaurants"""
+    return _with_cuisine({"is_onboarded": True}, cuisine)
+
+async def _open_now_query(cuisine: Optional[str]) -> Dict:
+    """Onboarded restaurants open at this minute of the week in their own zone"""
+    return _with_cuisine({
+        "is_onboarded": True,
+        **schedule.open_now_query(await _restaurant_timezones())
+    }, cuisine)
+
+def _new_arrivals_query(cuisine: Optional[str]) -> Dict:
+    """Restaurants onboarded in the last 30 days"""
+    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+    return _with_cuisine({
+        "is_onboarded": True,
+        "created_at": {"$gte": thirty_days_ago}
+    }, cuisine)
+
+def _by_location_query(cuisine: Optional[str]) -> Dict:
+    """Onboarded restaurants"""
+    return _with_cuisine({"is_onboarded": True}, cuisine)
+
+async def get_restaurant_by_id(restaurant_id: str) -> Optional[Tuple[Dict, str]]:
     """
     Get detailed information for a specific restaurant by its ID.
     
@@ -331,7 +582,8 @@ async def get_restaurant_by_id(restaurant_id: str) -> Optional[Dict]:
         restaurant_id: MongoDB ObjectId as string
     
     Returns:
-        Detailed restaurant information dictionary, or None if not found/invalid ID
+        Tuple of (detailed restaurant information dictionary, ETag of the document it was built from),
+        or None if not found/invalid ID
     """
     try:
         # Find restaurant by ID (must be onboarded)
@@ -344,58 +596,246 @@ async def get_restaurant_by_id(restaurant_id: str) -> Optional[Dict]:
             return None
         
         # Return detailed format (includes more fields than summary)
-        return _format_restaurant_details(restaurant)
+        return _format_restaurant_details(restaurant), restaurant_etag(restaurant_id, restaurant.get("version"))
     
     except Exception:
         # Return None if ObjectId is invalid or other error occurs
         return None
 
+async def get_restaurant_etag(restaurant_id: str) -> Optional[str]:
+    """
+    Get the current ETag of a restaurant from a projection of its version only,
+    so conditional requests can be answered without loading the document.
+    
+    Args:
+        restaurant_id: MongoDB ObjectId as string
+    
+    Returns:
+        ETag string, or None if not found/invalid ID
+    """
+    try:
+        restaurant = await Restaurant_db.restaurants.find_one(
+            {"_id": ObjectId(restaurant_id), "is_onboarded": True},
+            {"version": 1}
+        )
+    except Exception:
+        return None
+    
+    if not restaurant:
+        return None
+    
+    return restaurant_etag(restaurant_id, restaurant.get("version"))
+
 async def search_restaurants(
     query: str,
     skip: int = 0,
-    limit: int = 20
-) -> List[Dict]:
+    limit: int = 20,
+    after: Optional[str] = None
+) -> Tuple[List[Dict], Optional[str]]:
     """
-    Search restaurants by name, cuisine, or description.
-    Uses case-insensitive regex matching.
+    Search restaurants by name, cuisine, description, or city.
+    Uses the restaurants text index and ranks results by relevance
+    (name matches weigh most, then cuisine, city, and description).
     
     Args:
-        query: Search term to match against name, cuisine, and description
-        skip: Number of records to skip for pagination
+        query: Free-text search terms (user input is escaped before it reaches MongoDB)
+        skip: Number of records to skip for pagination (ignored when after is given)
         limit: Maximum number of records to return
+        after: Opaque cursor from a previous page (keyset pagination on relevance score and _id)
     
     Returns:
-        List of formatted restaurant summaries matching the search query
+        Tuple of (list of formatted restaurant summaries ordered by relevance, next page cursor or None)
     """
     
-    # Build search filter with OR condition for multiple fields
-    search_filter = {
-        "is_onboarded": True,
-        "$or": [
-            {"restaurant_name": {"$regex": query, "$options": "i"}},
-            {"cuisines": {"$regex": query, "$options": "i"}},
-            {"description": {"$regex": query, "$options": "i"}}
-        ]
-    }
+    search_terms = _escape_text_search(query)
+    if not search_terms:
+        return [], None
+    
+    # $text must be the first stage; the score is materialized so it can be sorted and paged on
+    pipeline = [
+        {"$match": {"$text": {"$search": search_terms}, "is_onboarded": True}},
+        {"$addFields": {"search_score": {"$meta": "textScore"}}}
+    ]
+    
+    if after:
+        pipeline.append({"$match": keyset_filter(SEARCH_SORT, decode_cursor(after, SEARCH_SORT))})
+    
+    pipeline.append({"$sort": dict(SEARCH_SORT)})
+    
+    if not after and skip:
+        pipeline.append({"$skip": skip})
+    
+    pipeline.append({"$limit": limit})
+    pipeline.append({"$project": {**SUMMARY_PROJECTION, "search_score": 1}})
     
-    # Execute search query with pagination
-    cursor = Restaurant_db.restaurants.find(search_filter).skip(skip).limit(limit)
-    restaurants = await cursor.to_list(length=limit)
+    restaurants = await Restaurant_db.restaurants.aggregate(pipeline).to_list(length=limit)
+    
+    next_cursor = None
+    if restaurants and len(restaurants) == limit:
+        next_cursor = encode_cursor(restaurants[-1], SEARCH_SORT)
     
     # Format each restaurant for API response
-    result = []
-    for restaurant in restaurants:
-        result.append(await _format_restaurant_summary(restaurant))
+    return _format_restaurant_summaries(restaurants), next_cursor
+
+async def _search_available(
+    query: Dict,
+    date: Optional[str],
+    time_slot: Optional[str],
+    party_size: Optional[int],
+    skip: int,
+    limit: int,
+    after: Optional[str]
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Availability search over restaurants in one aggregation.
+    Restaurants open at the slot (their indexed open_intervals) with an area big enough for the
+    party are matched on the restaurant document and joined with that date's capacity ledger;
+    each is then kept only if the party can be given tables there, checked with the same slot
+    and table rules as reservation_service.check_availability. Results stream until the page
+    is full, so pages stay full however many restaurants are booked out.
+    """
+    if not (date and time_slot and party_size):
+        raise ValueError("Availability search needs date, time_slot and party_size")
+    if party_size < 1:
+        raise ValueError("party_size must be at least 1")
     
-    return result
+    slot_minutes = schedule.parse_minutes(time_slot)
+    if slot_minutes is None:
+        raise ValueError("time_slot must be HH:MM")
+    # Ledger steps and generated slots are zero-padded
+    time_slot = schedule.format_minutes(slot_minutes)
+    
+    try:
+        day = schedule.day_name(date)
+    except ValueError:
+        raise ValueError("date must be YYYY-MM-DD")
+    
+    # Open at the slot's minute of the week, compared on the numeric intervals compiled from hours
+    available_query = {
+        **query,
+        "open_intervals": schedule.open_at_filter(schedule.DAYS.index(day) * schedule.MINUTES_PER_DAY + slot_minutes),
+        "seating_config.seating_areas": {"$elemMatch": {"area_capacity": {"$gte": party_size}}}
+    }
+    
+    projection = {**SUMMARY_PROJECTION, **reservation_service.AVAILABILITY_PROJECTION, "day_ledger": 1}
+    
+    pipeline = [
+        {"$match": apply_cursor(available_query, DEFAULT_SORT, after)},
+        {"$sort": dict(DEFAULT_SORT)},
+        {"$set": {"ledger_id": {"$concat": [{"$toString": "$_id"}, f":{date}"]}}},
+        {"$lookup": {
+            "from": ledger.LEDGER_COLLECTION,
+            "localField": "ledger_id",
+            "foreignField": "_id",
+            "as": "day_ledger"
+        }},
+        {"$set": {"day_ledger": {"$first": "$day_ledger"}}},
+        {"$project": projection}
+    ]
+    
+    restaurants = []
+    skipped = 0
+    
+    async for restaurant in Restaurant_db.restaurants.aggregate(pipeline):
+        context = reservation_service.slot_context(restaurant, restaurant.get("day_ledger"), date, time_slot)
+        if reservation_service.slot_error(context, time_slot):
+            continue
+        
+        available_areas = reservation_service.available_seating_areas(context, party_size)
+        if not available_areas:
+            continue
+        
+        if not after and skipped < skip:
+            skipped += 1
+            continue
+        
+        restaurant["available_areas"] = available_areas
+        restaurants.append(restaurant)
+        if len(restaurants) == limit:
+            break
+    
+    next_cursor = None
+    if restaurants and len(restaurants) == limit:
+        next_cursor = encode_cursor(restaurants[-1], DEFAULT_SORT)
+    
+    summaries = _format_restaurant_summaries(restaurants)
+    for summary, restaurant in zip(summaries, restaurants):
+        summary["availableSeatingAreas"] = restaurant["available_areas"]
+    
+    return summaries, next_cursor
 
-async def _format_restaurant_summary(restaurant: Dict) -> Dict:
+def _escape_text_search(query: str) -> str:
+    """
+    Reduce user input to plain search words.
+    Drops quotes, leading minus signs, and other punctuation that $text would
+    otherwise interpret as phrase or negation operators.
+    """
+    words = re.findall(r"\w+", query or "")
+    return " ".join(words[:MAX_SEARCH_TERMS])
+
+async def _fetch_page(
+    query: Dict,
+    sort: Sort,
+    skip: int,
+    limit: int,
+    after: Optional[str] = None,
+    projection: Optional[Dict] = None
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Fetch one page of restaurant documents in a stable sort order.
+    With a cursor the page starts right after the cursor's key (an index range scan);
+    without one it falls back to skip/limit for older clients.
+    
+    Args:
+        query: MongoDB filter for the feed
+        sort: Sort order, ending with _id
+        skip: Number of records to skip (only used when no cursor is given)
+        limit: Maximum number of records to return
+        after: Opaque cursor from a previous page
+        projection: Fields to return besides the sort keys (defaults to the summary fields)
+    
+    Returns:
+        Tuple of (raw restaurant documents, cursor for the next page or None when exhausted)
+    """
+    if projection is None:
+        projection = SUMMARY_PROJECTION
+    projection = {**projection, **{field: 1 for field, _ in sort}}
+    cursor = Restaurant_db.restaurants.find(apply_cursor(query, sort, after), projection).sort(sort)
+    
+    if not after and skip:
+        cursor = cursor.skip(skip)
+    
+    restaurants = await cursor.limit(limit).to_list(length=limit)
+    
+    next_cursor = None
+    if restaurants and len(restaurants) == limit:
+        next_cursor = encode_cursor(restaurants[-1], sort)
+    
+    return restaurants, next_cursor
+
+def _format_restaurant_summaries(restaurants: List[Dict]) -> List[Dict]:
+    """
+    Format a page of restaurant documents for list/summary view.
+    Active deals are resolved from the deal windows already on each document,
+    so a listing page costs only the query that fetched it.
+    
+    Args:
+        restaurants: Raw restaurant documents from MongoDB
+    
+    Returns:
+        List of formatted restaurant summary dictionaries, in the order given
+    """
+    today = _today()
+    return [_format_restaurant_summary(restaurant, today) for restaurant in restaurants]
+
+def _format_restaurant_summary(restaurant: Dict, today: Optional[str] = None) -> Dict:
     """
     Format restaurant data for list/summary view.
     Includes basic info, thumbnail, and active deals.
     
     Args:
         restaurant: Raw restaurant document from MongoDB
+        today: "YYYY-MM-DD" date deals are active on (defaults to today, UTC)
     
     Returns:
         Formatted dictionary with essential restaurant information
@@ -405,9 +845,9 @@ async def _format_restaurant_summary(restaurant: Dict) -> Dict:
     if restaurant.get("thumbnail_id"):
         thumbnail_url = f"https://tabletreats.onrender.com/restaurant/image/{restaurant['thumbnail_id']}"
     
-    # Fetch active deals for this restaurant using deal service
+    # Resolve active deals from the deal windows already on the document
     restaurant_id = str(restaurant["_id"])
-    active_deals = await deal_service.get_restaurant_deals(restaurant_id)
+    active_deals = deal_service.get_todays_deals(restaurant, today or _today())
     
     # Build summary response with core fields
     result = {
@@ -417,8 +857,8 @@ async def _format_restaurant_summary(restaurant: Dict) -> Dict:
         "address": restaurant.get("address", ""),
         "cuisine": restaurant.get("cuisines", []),
         "thumbnail": thumbnail_url,
-        "rating": 4.8, 
-        "totalReviews": 324, 
+        "rating": _display_rating(restaurant),
+        "totalReviews": restaurant.get("rating_count", 0),
         # Truncate description to 150 characters with ellipsis
         "description": restaurant.get("description", "")[:150] + "..." if len(restaurant.get("description", "")) > 150 else restaurant.get("description", "")
     }
@@ -471,6 +911,10 @@ def _format_restaurant_details(restaurant: Dict) -> Dict:
         "cuisine": restaurant.get("cuisines", []),
         "features": restaurant.get("features", []),
         "hours": restaurant.get("hours", {}),
-        "rating": 4.8,  # Placeholder: should come from reviews aggregation
-        "totalReviews": 324  # Placeholder: should come from reviews count
-    }
\ No newline at end of file
+        "rating": _display_rating(restaurant),
+        "totalReviews": restaurant.get("rating_count", 0)
+    }
+
+def _display_rating(restaurant: Dict) -> float:
+    """Average rating rounded for display (0 until the first review)"""
+    return round(restaurant.get("rating_avg") or 0, 1)
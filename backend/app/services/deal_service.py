@@ -5,24 +5,34 @@ Handles fetching active deals and checking deal applicability based on date, tim
 
 from database import Restaurant_db
 from bson import ObjectId
-from typing import List, Dict
-from datetime import datetime, time
+from typing import List, Dict, Optional
+from datetime import datetime, time, date as dt_date
 
 async def get_restaurant_deals(restaurant_id: str) -> List[Dict]:
     """Get all active deals for a restaurant"""
     
-    restaurant = await Restaurant_db.restaurants.find_one({
-        "_id": ObjectId(restaurant_id)
-    })
+    restaurant = await Restaurant_db.restaurants.find_one(
+        {"_id": ObjectId(restaurant_id)},
+        {"promos": 1}
+    )
     
     if not restaurant:
         return []
     
-    deals = restaurant.get("promos", [])
+    return get_active_deals(restaurant)
+
+def get_active_deals(restaurant: Dict, current_date: Optional[dt_date] = None) -> List[Dict]:
+    """
+    Compute active deals from an already-loaded restaurant document.
+    Listing endpoints use this so they don't re-fetch each restaurant just to read its promos.
+    """
+    
+    deals = restaurant.get("promos") or []
     
     # Filter only active deals that are currently valid
     active_deals = []
-    current_date = datetime.utcnow().date()
+    if current_date is None:
+        current_date = datetime.utcnow().date()
     
     for deal in deals:
         if not deal.get("is_active"):
@@ -41,6 +51,20 @@ async def get_restaurant_deals(restaurant_id: str) -> List[Dict]:
     
     return active_deals
 
+def get_todays_deals(restaurant: Dict, today: str) -> List[Dict]:
+    """
+    Active deals from a restaurant's precomputed deal_windows for a "YYYY-MM-DD" date.
+    Window dates compare as strings, so listing pages don't parse any promo dates.
+    """
+    
+    promos = {promo.get("id"): promo for promo in restaurant.get("promos") or []}
+    
+    return [
+        _format_deal(promos[window["promo_id"]])
+        for window in restaurant.get("deal_windows") or []
+        if window["start"] <= today <= window["end"] and window.get("promo_id") in promos
+    ]
+
 async def get_applicable_deals(
     restaurant_id: str,
     date: str,
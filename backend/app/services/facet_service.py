@@ -0,0 +1,150 @@
+# services/facet_service.py
+"""
+Filter facet counts (restaurants per cuisine, city, and feature) for the customer filter UI.
+Unfiltered counts are kept in memory and updated per restaurant from the change feed, so the
+common request costs no database work; narrowed counts run one $facet aggregation.
+"""
+
+from collections import Counter
+from database import Restaurant_db
+from typing import Dict, List, Optional, Tuple
+
+FACET_PROJECTION = {"cuisines": 1, "city": 1, "features": 1, "is_onboarded": 1}
+
+# What one restaurant adds to the counts: (cuisines, city, features)
+Contribution = Tuple[Tuple[str, ...], Optional[str], Tuple[str, ...]]
+
+class FacetCounts:
+    """Facet counts over onboarded restaurants, maintained one restaurant at a time"""
+
+    def __init__(self):
+        self._contributions: Dict[str, Contribution] = {}
+        self.cuisines: Counter = Counter()
+        self.cities: Counter = Counter()
+        self.features: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self._contributions)
+
+    def clear(self) -> None:
+        self._contributions.clear()
+        self.cuisines.clear()
+        self.cities.clear()
+        self.features.clear()
+
+    def upsert_restaurant(self, restaurant_id: str, restaurant: Dict) -> None:
+        """Replace a restaurant's contribution with the one from its current document"""
+        self.remove_restaurant(restaurant_id)
+
+        if not restaurant.get("is_onboarded"):
+            return
+
+        contribution = (
+            tuple(set(restaurant.get("cuisines") or [])),
+            restaurant.get("city") or None,
+            tuple(set(restaurant.get("features") or []))
+        )
+        self._contributions[restaurant_id] = contribution
+        self._apply(contribution, 1)
+
+    def remove_restaurant(self, restaurant_id: str) -> None:
+        contribution = self._contributions.pop(restaurant_id, None)
+        if contribution:
+            self._apply(contribution, -1)
+
+    def snapshot(self) -> Dict:
+        return {
+            "total": len(self),
+            "cuisines": _format_counts(self.cuisines.items()),
+            "cities": _format_counts(self.cities.items()),
+            "features": _format_counts(self.features.items())
+        }
+
+    def _apply(self, contribution: Contribution, delta: int) -> None:
+        cuisines, city, features = contribution
+        for cuisine in cuisines:
+            _bump(self.cuisines, cuisine, delta)
+        if city:
+            _bump(self.cities, city, delta)
+        for feature in features:
+            _bump(self.features, feature, delta)
+
+def _bump(counter: Counter, value: str, delta: int) -> None:
+    counter[value] += delta
+    if counter[value] <= 0:
+        del counter[value]
+
+def _format_counts(counts) -> List[Dict]:
+    """Largest first, alphabetical within equal counts"""
+    ordered = sorted(counts, key=lambda item: (-item[1], item[0]))
+    return [{"value": value, "count": count} for value, count in ordered]
+
+_counts = FacetCounts()
+
+async def build_facets() -> int:
+    """Load facet counts from all onboarded restaurants; returns the number counted"""
+    _counts.clear()
+
+    cursor = Restaurant_db.restaurants.find({"is_onboarded": True}, FACET_PROJECTION)
+    async for restaurant in cursor:
+        _counts.upsert_restaurant(str(restaurant["_id"]), restaurant)
+
+    return len(_counts)
+
+def on_restaurant_change(restaurant_id: str, restaurant: Optional[Dict]) -> None:
+    """Change feed subscriber: keep the in-memory counts in step with restaurant writes"""
+    if restaurant is None:
+        _counts.remove_restaurant(restaurant_id)
+    else:
+        _counts.upsert_restaurant(restaurant_id, restaurant)
+
+async def get_facets(
+    cuisine: Optional[str] = None,
+    city: Optional[str] = None,
+    feature: Optional[str] = None
+) -> Dict:
+    """
+    Get restaurant counts per cuisine, city, and feature.
+
+    Args:
+        cuisine: Optional cuisine the counts are narrowed to
+        city: Optional city (exact value, as returned in the city facet)
+        feature: Optional feature
+
+    Returns:
+        {"total", "cuisines", "cities", "features"}, each facet a list of {"value", "count"}
+    """
+    if not (cuisine or city or feature):
+        return _counts.snapshot()
+
+    query = {"is_onboarded": True}
+    if cuisine:
+        query["cuisines"] = cuisine
+    if city:
+        query["city"] = city
+    if feature:
+        query["features"] = feature
+
+    pipeline = [
+        {"$match": query},
+        {"$facet": {
+            "total": [{"$count": "count"}],
+            "cuisines": [{"$unwind": "$cuisines"}, {"$group": {"_id": "$cuisines", "count": {"$sum": 1}}}],
+            "cities": [
+                {"$match": {"city": {"$nin": [None, ""]}}},
+                {"$group": {"_id": "$city", "count": {"$sum": 1}}}
+            ],
+            "features": [{"$unwind": "$features"}, {"$group": {"_id": "$features", "count": {"$sum": 1}}}]
+        }}
+    ]
+
+    result = await Restaurant_db.restaurants.aggregate(pipeline).to_list(length=1)
+    facets = result[0] if result else {}
+
+    total = facets.get("total") or [{"count": 0}]
+    return {
+        "total": total[0]["count"],
+        "cuisines": _format_counts((item["_id"], item["count"]) for item in facets.get("cuisines", [])),
+        "cities": _format_counts((item["_id"], item["count"]) for item in facets.get("cities", [])),
+        "features": _format_counts((item["_id"], item["count"]) for item in facets.get("features", []))
+    }
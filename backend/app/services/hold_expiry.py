@@ -0,0 +1,81 @@
+# services/hold_expiry.py
+"""
+In-process expiry of slot holds.
+Sleeps until the next active hold runs out, then releases every hold that is due, so tables held
+for an abandoned checkout come back within moments of expiring. A hold placed here that expires
+sooner than the current wait wakes the scheduler early; it also re-checks at least every
+MAX_SLEEP_SECONDS to pick up holds placed by other backend processes. Releasing is a conditional
+update, so several processes running this never release a hold twice.
+"""
+
+import asyncio
+from database import Restaurant_db
+from datetime import datetime, timedelta
+from typing import Optional
+from shared import holds, reservations
+
+MAX_SLEEP_SECONDS = 30
+RETRY_DELAY_SECONDS = 5
+
+_task: Optional[asyncio.Task] = None
+_wake: Optional[asyncio.Event] = None
+_next_due: Optional[datetime] = None
+
+def start() -> None:
+    """Start releasing expired holds in the background"""
+    global _task, _wake
+    if _task is None:
+        _wake = asyncio.Event()
+        _task = asyncio.create_task(_run())
+
+async def stop() -> None:
+    """Stop the expiry scheduler"""
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+
+def schedule(expires_at: datetime) -> None:
+    """Tell the scheduler about a new hold, waking it if the hold is due before its next check"""
+    if _wake is not None and (_next_due is None or expires_at < _next_due):
+        _wake.set()
+
+async def _next_delay() -> float:
+    """Seconds until the earliest active hold expires, capped at MAX_SLEEP_SECONDS"""
+    next_hold = await Restaurant_db[holds.HOLDS_COLLECTION].find_one(
+        {"status": holds.ACTIVE},
+        {"expires_at": 1},
+        sort=[("expires_at", 1)]
+    )
+    if not next_hold:
+        return MAX_SLEEP_SECONDS
+
+    remaining = (next_hold["expires_at"] - datetime.utcnow()).total_seconds()
+    return min(max(remaining, 0), MAX_SLEEP_SECONDS)
+
+async def _run() -> None:
+    global _next_due
+
+    while True:
+        try:
+            released = await reservations.expire_holds(Restaurant_db)
+            if released:
+                print(f"Released {released} expired slot holds")
+            delay = await _next_delay()
+        except Exception as e:
+            # Anything escaping here would end the scheduler for the life of the process
+            print(f"Error releasing expired holds: {e}")
+            delay = RETRY_DELAY_SECONDS
+
+        _next_due = datetime.utcnow() + timedelta(seconds=delay)
+        _wake.clear()
+        # asyncio.wait rather than wait_for: wait_for can swallow stop()'s cancellation if a wake lands at the same time
+        waiter = asyncio.ensure_future(_wake.wait())
+        try:
+            await asyncio.wait({waiter}, timeout=delay)
+        finally:
+            waiter.cancel()
@@ -0,0 +1,140 @@
+# services/idempotency_service.py
+"""
+Idempotency keys for customer writes that must not run twice (booking, paying a bill).
+A client sends the same Idempotency-Key header on every retry of one request. The first
+request with a key claims it and runs; its response is stored, and retries are answered from
+the store without running the operation again. Keys are scoped to the customer, expire after
+KEY_TTL (TTL index on expires_at), and can't be reused for a different request.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pymongo.errors import DuplicateKeyError
+
+from database import Customer_db
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+# Set on responses served from the store
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+MAX_KEY_LENGTH = 255
+KEY_TTL = timedelta(hours=24)
+# A request still "in progress" after this long is assumed to have died, and a retry may take over
+LOCK_TIMEOUT = timedelta(seconds=60)
+
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+
+def _fingerprint(endpoint: str, payload: Any) -> str:
+    """Hash identifying the request a key was first used for"""
+    body = json.dumps({"endpoint": endpoint, "payload": jsonable_encoder(payload)}, sort_keys=True)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+def _replay(record: Dict) -> JSONResponse:
+    response = record["response"]
+    return JSONResponse(
+        status_code=response["status_code"],
+        content=response["body"],
+        headers={REPLAYED_HEADER: "true"}
+    )
+
+async def _claim(key_id: str, fingerprint: str) -> Optional[Dict]:
+    """
+    Claim a key for this request; returns None if it is ours to run, otherwise the stored record
+    (a completed response, or a request still in progress)
+    """
+    now = datetime.utcnow()
+
+    try:
+        await Customer_db.idempotency_keys.insert_one({
+            "_id": key_id,
+            "fingerprint": fingerprint,
+            "status": IN_PROGRESS,
+            "locked_at": now,
+            "created_at": now,
+            "expires_at": now + KEY_TTL
+        })
+        return None
+    except DuplicateKeyError:
+        pass
+
+    record = await Customer_db.idempotency_keys.find_one({"_id": key_id})
+
+    if not record:
+        # Expired between the insert and the read
+        return await _claim(key_id, fingerprint)
+
+    if record["fingerprint"] != fingerprint:
+        raise HTTPException(
+            status_code=422,
+            detail=f"{IDEMPOTENCY_HEADER} was already used for a different request"
+        )
+
+    if record["status"] == IN_PROGRESS and record["locked_at"] <= now - LOCK_TIMEOUT:
+        # Take over from a request that never finished; only one retry can win the lock
+        taken = await Customer_db.idempotency_keys.update_one(
+            {"_id": key_id, "status": IN_PROGRESS, "locked_at": record["locked_at"]},
+            {"$set": {"locked_at": now}}
+        )
+        if taken.modified_count:
+            return None
+
+    return record
+
+async def run_once(
+    idempotency_key: Optional[str],
+    customer_email: str,
+    endpoint: str,
+    payload: Any,
+    operation: Callable[[], Awaitable[Any]]
+) -> Any:
+    """
+    Run operation once per idempotency key. Without a key it just runs. With one, the first
+    request runs it and stores the response (including HTTPException errors, which are outcomes
+    too); retries get the stored response, or 409 while the first request is still running.
+    Unexpected errors release the key so the request can be retried.
+    """
+    if idempotency_key is None:
+        return await operation()
+
+    if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} characters"
+        )
+
+    key_id = f"{customer_email}:{idempotency_key}"
+    record = await _claim(key_id, _fingerprint(endpoint, payload))
+
+    if record:
+        if record["status"] == COMPLETED:
+            return _replay(record)
+        raise HTTPException(
+            status_code=409,
+            detail="A request with this Idempotency-Key is still being processed"
+        )
+
+    try:
+        result = await operation()
+        response = {"status_code": 200, "body": jsonable_encoder(result)}
+    except HTTPException as e:
+        response = {"status_code": e.status_code, "body": {"detail": e.detail}}
+    except Exception:
+        await Customer_db.idempotency_keys.delete_one({"_id": key_id, "status": IN_PROGRESS})
+        raise
+
+    await Customer_db.idempotency_keys.update_one(
+        {"_id": key_id},
+        {"$set": {"status": COMPLETED, "response": response, "completed_at": datetime.utcnow()}}
+    )
+
+    if response["status_code"] != 200:
+        raise HTTPException(status_code=response["status_code"], detail=response["body"]["detail"])
+
+    return result
@@ -8,117 +8,129 @@ from database import Restaurant_db
 from bson import ObjectId
 from typing import Optional, List, Dict
 from datetime import datetime, time
+from shared import schedule, ledger, tables, reservations, waitlist, holds
+from services import hold_expiry
 
-def get_day_name(date_str: str) -> str:
-    """Convert date string to day name (monday, tuesday, etc.)"""
-    date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-    return date_obj.strftime("%A").lower()
+# Slot and weekday rules are shared with the restaurant backend
+get_day_name = schedule.day_name
+generate_time_slots = schedule.generate_time_slots
 
-def generate_time_slots(open_time: str, close_time: str, interval_minutes: int = 30) -> List[str]:
-    """Generate time slots between open and close time with given interval"""
-    
-    open_hour, open_min = map(int, open_time.split(":"))
-    close_hour, close_min = map(int, close_time.split(":"))
+# Booking window used when the restaurant hasn't configured one (matches the restaurant backend default)
+DEFAULT_ADVANCE_BOOKING_DAYS = 7
+
+# Restaurant fields availability checks and bookings read
+AVAILABILITY_PROJECTION = {"restaurant_name": 1, "hours": 1, "seating_config": 1, "timezone": 1}
+
+async def get_restaurant_hours_for_date(restaurant_id: str, date: str) -> Optional[Dict]:
+    """Get restaurant operating hours for a specific (restaurant-local) date"""
     
-    slots = []
-    current_hour = open_hour
-    current_min = open_min
+    restaurant = await Restaurant_db.restaurants.find_one(
+        {"_id": ObjectId(restaurant_id)},
+        {"hours": 1, "seating_config.slot_interval": 1}
+    )
     
-    while True:
-        current_total_mins = current_hour * 60 + current_min
-        close_total_mins = close_hour * 60 + close_min
-        
-        if current_total_mins >= close_total_mins:
-            break
-        
-        slots.append(f"{current_hour:02d}:{current_min:02d}")
-        
-        current_min += interval_minutes
-        if current_min >= 60:
-            current_hour += 1
-            current_min = 0
+    if not restaurant:
+        return None
     
-    return slots
+    return {
+        **schedule.hours_for_date(restaurant.get("hours"), date),
+        "slot_interval": schedule.slot_interval(restaurant.get("seating_config"))
+    }
 
-async def get_restaurant_hours_for_date(restaurant_id: str, date: str) -> Optional[Dict]:
-    """Get restaurant operating hours for a specific date"""
+async def load_slot_context(restaurant_id: str, date: str, time_slot: str) -> Optional[Dict]:
+    """
+    Everything needed to check or book one slot, in two round trips: the restaurant
+    (projected to the fields availability needs) and that date's capacity ledger.
+    Returns None if the restaurant doesn't exist.
+    """
     
     restaurant = await Restaurant_db.restaurants.find_one(
-        {"_id": ObjectId(restaurant_id)}
+        {"_id": ObjectId(restaurant_id)},
+        AVAILABILITY_PROJECTION
     )
     
     if not restaurant:
         return None
     
-    day_name = get_day_name(date)
-    hours = restaurant.get("hours", {})
-    day_hours = hours.get(day_name, {})
+    day_ledger = await ledger.get_ledger(Restaurant_db, restaurant_id, date)
     
-    if day_hours.get("closed", True):
-        return {
-            "closed": True,
-            "day": day_name
-        }
+    return slot_context(restaurant, day_ledger, date, time_slot)
+
+def slot_context(restaurant: Dict, day_ledger: Optional[Dict], date: str, time_slot: str) -> Dict:
+    """Slot context from an already-read restaurant (AVAILABILITY_PROJECTION fields) and its ledger for the date"""
+    
+    seating_config = restaurant.get("seating_config")
+    duration = schedule.dining_duration(seating_config)
     
     return {
-        "closed": False,
-        "day": day_name,
-        "open": day_hours.get("open", "09:00"),
-        "close": day_hours.get("close", "23:00")
+        "restaurant": restaurant,
+        "hours": schedule.hours_for_date(restaurant.get("hours"), date),
+        "ledger": day_ledger,
+        "time_slot": time_slot,
+        "interval": schedule.slot_interval(seating_config),
+        "duration": duration,
+        # A booking at this slot overlaps every step of its dining duration
+        "total_booked": ledger.slot_total(day_ledger, time_slot, duration)
     }
 
-async def get_available_seating_areas(
-    restaurant_id: str,
-    date: str,
-    time_slot: str,
-    number_of_guests: int
-) -> List[Dict]:
-    """Get seating areas that can accommodate the number of guests"""
+def slot_error(context: Dict, time_slot: str) -> Optional[str]:
+    """Why a slot can't be booked at all (closed day, outside hours), None if it is bookable"""
+    hours_info = context["hours"]
     
-    restaurant = await Restaurant_db.restaurants.find_one(
-        {"_id": ObjectId(restaurant_id)}
-    )
+    if hours_info.get("closed"):
+        return f"Restaurant is closed on {hours_info['day']}s"
     
-    if not restaurant:
-        return []
+    if time_slot not in generate_time_slots(hours_info["open"], hours_info["close"], context["interval"]):
+        return f"Time slot {time_slot} is outside operating hours"
     
-    seating_config = restaurant.get("seating_config", {})
+    return None
+
+def available_seating_areas(context: Dict, number_of_guests: int) -> List[Dict]:
+    """
+    Seating areas in a loaded slot context where the party can be given adjacent tables for its
+    whole dining duration; available tables count tables free for that entire window
+    """
+    
+    seating_config = context["restaurant"].get("seating_config", {})
     seating_areas = seating_config.get("seating_areas", [])
     
     available_areas = []
     
     for area in seating_areas:
-        area_capacity = area.get("area_capacity", 0)
-        seats_per_table = area.get("seats_per_table", 2)
-        
-        if area_capacity < number_of_guests:
+        if ledger.allocate(context["ledger"], context["time_slot"], context["duration"], area, number_of_guests) is None:
             continue
         
-        timeslot_doc = await Restaurant_db.timeslots.find_one({
-            "restaurantId": restaurant_id,
-            "date": date,
-            "timeSlot": time_slot,
-            "seatingAreaId": area.get("id")
-        })
-        
-        booked = timeslot_doc.get("booked", 0) if timeslot_doc else 0
-        remaining = area_capacity - booked
+        number_of_tables, seats_per_table = tables.area_tables(ledger.ledger_area(context["ledger"], area))
+        occupied = ledger.occupied_tables(context["ledger"], context["time_slot"], context["duration"], area)
+        available_tables = tables.free_tables(occupied, number_of_tables)
         
-        if remaining >= number_of_guests:
-            available_tables = remaining // seats_per_table
-            
-            available_areas.append({
-                "area_id": area.get("id"),
-                "area_name": area.get("area_name"),
-                "area_type": area.get("area_type"),
-                "seats_per_table": seats_per_table,
-                "available_tables": available_tables,
-                "area_capacity": area_capacity,
-                "remaining_capacity": remaining
-            })
+        available_areas.append({
+            "area_id": area.get("id"),
+            "area_name": area.get("area_name"),
+            "area_type": area.get("area_type"),
+            "seats_per_table": seats_per_table,
+            "available_tables": available_tables,
+            "area_capacity": number_of_tables * seats_per_table,
+            "remaining_capacity": available_tables * seats_per_table
+        })
     
     return available_areas
 
+async def get_available_seating_areas(
+    restaurant_id: str,
+    date: str,
+    time_slot: str,
+    number_of_guests: int
+) -> List[Dict]:
+    """Get seating areas that can accommodate the number of guests"""
+    
+    context = await load_slot_context(restaurant_id, date, time_slot)
+    
+    if not context:
+        return []
+    
+    return available_seating_areas(context, number_of_guests)
+
 async def check_availability(
     restaurant_id: str,
     date: str,
@@ -127,58 +139,34 @@ async def check_availability(
 ) -> Dict:
     """Check availability with seating areas"""
     
-    restaurant = await Restaurant_db.restaurants.find_one(
-        {"_id": ObjectId(restaurant_id)}
-    )
-    
-    if not restaurant:
-        return {"error": "Restaurant not found"}
-    
-    hours_info = await get_restaurant_hours_for_date(restaurant_id, date)
+    context = await load_slot_context(restaurant_id, date, time_slot)
     
-    if not hours_info:
+    if not context:
         return {"error": "Restaurant not found"}
     
-    if hours_info.get("closed"):
-        return {
-            "available": False,
-            "error": f"Restaurant is closed on {hours_info['day']}s"
-        }
+    error = slot_error(context, time_slot)
+    if error:
+        return {"available": False, "error": error}
     
-    valid_slots = generate_time_slots(hours_info["open"], hours_info["close"])
-    if time_slot not in valid_slots:
-        return {
-            "available": False,
-            "error": f"Time slot {time_slot} is outside operating hours"
-        }
+    available_areas = available_seating_areas(context, number_of_guests)
     
-    available_areas = await get_available_seating_areas(
-        restaurant_id, date, time_slot, number_of_guests
+    # Capacities count seats at tables, free for the booking's whole dining duration
+    remaining, total_capacity = ledger.table_seats(
+        context["ledger"], time_slot, context["duration"], context["restaurant"].get("seating_config")
     )
     
-    seating_config = restaurant.get("seating_config", {})
-    total_capacity = seating_config.get("total_capacity", 0)
-    
-    cursor = Restaurant_db.timeslots.find({
-        "restaurantId": restaurant_id,
-        "date": date,
-        "timeSlot": time_slot
-    })
-    
-    total_booked = 0
-    async for slot in cursor:
-        total_booked += slot.get("booked", 0)
-    
-    remaining = total_capacity - total_booked
-    
     return {
         "available": len(available_areas) > 0,
         "remaining_capacity": remaining,
         "total_capacity": total_capacity,
-        "booked": total_booked,
+        "booked": context["total_booked"],
         "available_seating_areas": available_areas
     }
 
+async def migrate_timeslots() -> int:
+    """Move bookings from the old per-slot timeslots documents into capacity ledgers (safe to re-run)"""
+    return await ledger.migrate_timeslots(Restaurant_db)
+
 async def get_daily_availability(
     restaurant_id: str,
     date: str
@@ -186,38 +174,30 @@ async def get_daily_availability(
     """Get availability for all time slots on a given date"""
     
     restaurant = await Restaurant_db.restaurants.find_one(
-        {"_id": ObjectId(restaurant_id)}
+        {"_id": ObjectId(restaurant_id)},
+        AVAILABILITY_PROJECTION
     )
     
     if not restaurant:
         return []
     
-    hours_info = await get_restaurant_hours_for_date(restaurant_id, date)
+    hours_info = schedule.hours_for_date(restaurant.get("hours"), date)
     
-    if not hours_info or hours_info.get("closed"):
+    if hours_info.get("closed"):
         return []
     
-    time_slots = generate_time_slots(hours_info["open"], hours_info["close"])
-    
     seating_config = restaurant.get("seating_config", {})
-    total_capacity = seating_config.get("total_capacity", 0)
+    duration = schedule.dining_duration(seating_config)
     
-    cursor = Restaurant_db.timeslots.find({
-        "restaurantId": restaurant_id,
-        "date": date
-    })
+    time_slots = generate_time_slots(hours_info["open"], hours_info["close"], schedule.slot_interval(seating_config))
     
-    booked_slots = {}
-    async for slot in cursor:
-        time_slot = slot["timeSlot"]
-        if time_slot not in booked_slots:
-            booked_slots[time_slot] = 0
-        booked_slots[time_slot] += slot.get("booked", 0)
+    day_ledger = await ledger.get_ledger(Restaurant_db, restaurant_id, date)
     
     availability = []
     for slot in time_slots:
-        booked = booked_slots.get(slot, 0)
-        remaining = total_capacity - booked
+        booked = ledger.slot_total(day_ledger, slot, duration)
+        # A slot is available while some table is free for a whole booking there
+        remaining, total_capacity = ledger.table_seats(day_ledger, slot, duration, seating_config)
         
         availability.append({
             "time_slot": slot,
@@ -229,8 +209,79 @@ async def get_daily_availability(
     
     return availability
 
+async def get_availability_calendar(
+    restaurant_id: str,
+    start_date: Optional[str] = None,
+    days: Optional[int] = None
+) -> Optional[Dict]:
+    """
+    Per-day, per-slot availability over a date window, for shading a booking calendar.
+    Bookings for the whole window come from one query over its capacity ledgers; hours and slots are worked out once per weekday. The window starts today (restaurant-local)
+    by default and never extends past the restaurant's advance booking days.
+    Returns None if the restaurant doesn't exist; raises ValueError for a malformed start date.
+    """
+    
+    restaurant = await Restaurant_db.restaurants.find_one(
+        {"_id": ObjectId(restaurant_id)},
+        AVAILABILITY_PROJECTION
+    )
+    
+    if not restaurant:
+        return None
+    
+    seating_config = restaurant.get("seating_config", {})
+    advance_days = seating_config.get("advance_booking_days", DEFAULT_ADVANCE_BOOKING_DAYS)
+    interval = schedule.slot_interval(seating_config)
+    duration = schedule.dining_duration(seating_config)
+    
+    start_date = start_date or schedule.local_today(restaurant.get("timezone"))
+    dates = schedule.date_range(start_date, min(days or advance_days, advance_days))
+    
+    ledgers = await ledger.get_ledgers(Restaurant_db, restaurant_id, dates)
+    
+    # Dates on the same weekday share hours, so each weekday's slots are generated once
+    hours_by_day = {}
+    calendar = []
+    
+    for date in dates:
+        weekday = schedule.day_name(date)
+        if weekday not in hours_by_day:
+            hours_info = schedule.hours_for_date(restaurant.get("hours"), date)
+            time_slots = () if hours_info["closed"] else generate_time_slots(hours_info["open"], hours_info["close"], interval)
+            hours_by_day[weekday] = (hours_info["closed"], time_slots)
+        
+        closed, time_slots = hours_by_day[weekday]
+        
+        slots = []
+        for time_slot in time_slots:
+            booked = ledger.slot_total(ledgers.get(date), time_slot, duration)
+            remaining, total_capacity = ledger.table_seats(ledgers.get(date), time_slot, duration, seating_config)
+            
+            slots.append({
+                "time_slot": time_slot,
+                "available": remaining > 0,
+                "remaining_capacity": remaining,
+                "total_capacity": total_capacity,
+                "booked": booked
+            })
+        
+        available_slots = sum(1 for slot in slots if slot["available"])
+        calendar.append({
+            "date": date,
+            "day": weekday,
+            "closed": closed,
+            "available": available_slots > 0,
+            "available_slots": available_slots,
+            "slots": slots
+        })
+    
+    return {"restaurant_id": restaurant_id, "start_date": start_date, "days": calendar}
+
 async def create_reservation(reservation_data: dict, customer_email: str) -> Optional[Dict]:
-    """Create a new reservation with seating area"""
+    """Create a new reservation with seating area, from the customer's slot hold if one is given"""
+    
+    if reservation_data.get("hold_id"):
+        return await _create_from_hold(reservation_data, customer_email)
     
     restaurant_id = reservation_data["restaurant_id"]
     date = reservation_data["date"]
@@ -238,76 +289,46 @@ async def create_reservation(reservation_data: dict, customer_email: str) -> Opt
     guests = reservation_data["number_of_guests"]
     seating_area_id = reservation_data["seating_area_id"]
     
-    hours_info = await get_restaurant_hours_for_date(restaurant_id, date)
-    
-    if not hours_info or hours_info.get("closed"):
-        return None
+    # The availability check and the reservation are built from the same two reads
+    context = await load_slot_context(restaurant_id, date, time_slot)
     
-    valid_slots = generate_time_slots(hours_info["open"], hours_info["close"])
-    if time_slot not in valid_slots:
+    if not context or slot_error(context, time_slot):
         return None
     
-    available_areas = await get_available_seating_areas(
-        restaurant_id, date, time_slot, guests
-    )
+    available_areas = available_seating_areas(context, guests)
     
-    area_available = any(area["area_id"] == seating_area_id for area in available_areas)
+    area = next((area for area in available_areas if area["area_id"] == seating_area_id), None)
     
-    if not area_available:
+    if not area:
         return None
     
-    restaurant = await Restaurant_db.restaurants.find_one(
-        {"_id": ObjectId(restaurant_id)}
+    # The check above can race with other bookings; claiming the tables is what decides
+    reservation = await reservations.book_reservation(
+        Restaurant_db,
+        context["restaurant"],
+        reservation_data,
+        customer_email,
+        area["area_name"] or "Unknown Area",
+        context["duration"],
+        context["ledger"]
     )
     
-    if not restaurant:
+    if not reservation:
         return None
     
-    seating_config = restaurant.get("seating_config", {})
-    seating_areas = seating_config.get("seating_areas", [])
-    area_name = next(
-        (area["area_name"] for area in seating_areas if area["id"] == seating_area_id),
-        "Unknown Area"
-    )
-    
-    reservation = {
-        "restaurant_id": restaurant_id,
-        "restaurant_name": restaurant.get("restaurant_name", ""),
-        "customer_name": reservation_data["customer_name"],
-        "customer_email": customer_email,
-        "customer_phone": reservation_data["customer_phone"],
-        "date": date,
-        "time_slot": time_slot,
-        "number_of_guests": guests,
-        "seating_area_id": seating_area_id,
-        "seating_area_name": area_name,
-        "status": "confirmed",
-        "special_requests": reservation_data.get("special_requests"),
-        "checked_in": False,
-        "created_at": datetime.utcnow()
-    }
+    return _format_reservation(reservation)
+
+async def _create_from_hold(reservation_data: dict, customer_email: str) -> Optional[Dict]:
+    """Book a held slot; the hold's tables were claimed when it was placed, so nothing is re-checked"""
+    try:
+        hold_id = ObjectId(reservation_data["hold_id"])
+    except Exception:
+        return None
     
-    result = await Restaurant_db.reservations.insert_one(reservation)
-    reservation["_id"] = result.inserted_id
+    reservation = await reservations.convert_hold(Restaurant_db, hold_id, reservation_data, customer_email)
     
-    await Restaurant_db.timeslots.update_one(
-        {
-            "restaurantId": restaurant_id,
-            "date": date,
-            "timeSlot": time_slot,
-            "seatingAreaId": seating_area_id
-        },
-        {
-            "$inc": {"booked": guests},
-            "$setOnInsert": {
-                "restaurantId": restaurant_id,
-                "date": date,
-                "timeSlot": time_slot,
-                "seatingAreaId": seating_area_id
-            }
-        },
-        upsert=True
-    )
+    if not reservation:
+        return None
     
     return _format_reservation(reservation)
 
@@ -354,39 +375,188 @@ async def cancel_reservation(reservation_id: str, customer_email: str) -> Dict:
     if reservation.get("checked_in"):
         return {"success": False, "error": "Cannot cancel - already checked in"}
     
-    # Check if the reservation time has passed
-    reservation_date = reservation["date"]
-    reservation_time = reservation["time_slot"]
-    
-    reservation_datetime = datetime.strptime(
-        f"{reservation_date} {reservation_time}", 
-        "%Y-%m-%d %H:%M"
+    # Check if the reservation time has passed (date and slot are in the restaurant's local time)
+    reservation_datetime = schedule.local_datetime(
+        reservation["date"],
+        reservation["time_slot"],
+        reservation.get("timezone")
     )
     
-    current_datetime = datetime.utcnow()
-    
-    if current_datetime >= reservation_datetime:
+    if schedule.local_now(reservation.get("timezone")) >= reservation_datetime:
         return {
             "success": False, 
             "error": "Cannot cancel reservation. The reservation time has already passed."
         }
     
-    await Restaurant_db.reservations.update_one(
-        {"_id": ObjectId(reservation_id)},
-        {"$set": {"status": "cancelled"}}
+    # Releases the tables and promotes the waitlist, unless a concurrent cancel got there first
+    if not await reservations.cancel_reservation(Restaurant_db, reservation):
+        return {"success": False, "error": "Reservation already cancelled"}
+    
+    return {"success": True}
+
+# ==================== HOLDS ====================
+
+async def place_hold(hold_data: dict, customer_email: str) -> Dict:
+    """Hold tables in a seating area for a few minutes while the customer completes the booking"""
+    
+    restaurant_id = hold_data["restaurant_id"]
+    time_slot = hold_data["time_slot"]
+    
+    now = datetime.utcnow()
+    active = await Restaurant_db[holds.HOLDS_COLLECTION].find(
+        {"customer_email": customer_email, **holds.active_query(now)}
+    ).to_list(length=holds.MAX_ACTIVE_HOLDS)
+    
+    # A retried request gets the hold it already placed
+    existing = next(
+        (hold for hold in active if all(hold[field] == hold_data[field] for field in holds.SLOT_FIELDS)),
+        None
     )
+    if existing:
+        return {"hold": _format_hold(existing)}
+    
+    if len(active) >= holds.MAX_ACTIVE_HOLDS:
+        return {"error": f"You can hold at most {holds.MAX_ACTIVE_HOLDS} slots at a time"}
     
-    await Restaurant_db.timeslots.update_one(
-        {
-            "restaurantId": reservation["restaurant_id"],
-            "date": reservation["date"],
-            "timeSlot": reservation["time_slot"],
-            "seatingAreaId": reservation.get("seating_area_id")
-        },
-        {"$inc": {"booked": -reservation["number_of_guests"]}}
+    context = await load_slot_context(restaurant_id, hold_data["date"], time_slot)
+    
+    if not context:
+        return {"error": "Restaurant not found"}
+    
+    error = slot_error(context, time_slot)
+    if error:
+        return {"error": error}
+    
+    area = ledger.find_area(context["restaurant"].get("seating_config"), hold_data["seating_area_id"])
+    
+    if not area:
+        return {"error": "Seating area not found"}
+    
+    hold = await reservations.place_hold(
+        Restaurant_db,
+        context["restaurant"],
+        hold_data,
+        customer_email,
+        area.get("area_name") or "Unknown Area",
+        context["duration"],
+        context["ledger"]
     )
     
-    return {"success": True}
+    if not hold:
+        return {"error": "No tables available for this party in that seating area"}
+    
+    hold_expiry.schedule(hold["expires_at"])
+    
+    return {"hold": _format_hold(hold)}
+
+async def release_hold(hold_id: str, customer_email: str) -> Dict:
+    """Let go of a hold before it expires"""
+    try:
+        hold_object_id = ObjectId(hold_id)
+    except Exception:
+        return {"success": False, "error": "Hold not found"}
+    
+    if await reservations.release_hold(Restaurant_db, {"_id": hold_object_id, "customer_email": customer_email}):
+        return {"success": True}
+    
+    hold = await Restaurant_db[holds.HOLDS_COLLECTION].find_one(
+        {"_id": hold_object_id, "customer_email": customer_email}
+    )
+    
+    if not hold:
+        return {"success": False, "error": "Hold not found"}
+    
+    return {"success": False, "error": f"Hold is already {hold['status']}"}
+
+# ==================== WAITLIST ====================
+
+async def join_waitlist(waitlist_data: dict, customer_email: str) -> Dict:
+    """Put a customer on the waitlist for a full slot; they are booked automatically when tables free up"""
+    
+    restaurant_id = waitlist_data["restaurant_id"]
+    time_slot = waitlist_data["time_slot"]
+    guests = waitlist_data["number_of_guests"]
+    
+    context = await load_slot_context(restaurant_id, waitlist_data["date"], time_slot)
+    
+    if not context:
+        return {"error": "Restaurant not found"}
+    
+    error = slot_error(context, time_slot)
+    if error:
+        return {"error": error}
+    
+    area = ledger.find_area(context["restaurant"].get("seating_config"), waitlist_data["seating_area_id"])
+    
+    if not area:
+        return {"error": "Seating area not found"}
+    
+    number_of_tables, seats_per_table = tables.area_tables(area)
+    if tables.tables_needed(guests, seats_per_table) > number_of_tables:
+        return {"error": f"{area.get('area_name') or 'This area'} can't seat a party of {guests}"}
+    
+    if ledger.allocate(context["ledger"], time_slot, context["duration"], area, guests) is not None:
+        return {"error": "Tables are available for this slot - book it directly"}
+    
+    existing = await Restaurant_db[waitlist.WAITLIST_COLLECTION].find_one({
+        "restaurant_id": restaurant_id,
+        "date": waitlist_data["date"],
+        "time_slot": time_slot,
+        "customer_email": customer_email,
+        "status": waitlist.WAITING
+    })
+    
+    if existing:
+        return {"entry": _format_waitlist_entry(existing)}
+    
+    entry = waitlist.new_entry(waitlist_data, customer_email, context["restaurant"])
+    result = await Restaurant_db[waitlist.WAITLIST_COLLECTION].insert_one(entry)
+    entry["_id"] = result.inserted_id
+    
+    # Tables released between the check above and the insert were offered to the waitlist before
+    # this entry was on it; promote again so the entry doesn't wait for the next release
+    if await reservations.promote_waitlist(
+        Restaurant_db, restaurant_id, waitlist_data["date"], time_slot, context["duration"]
+    ):
+        entry = await Restaurant_db[waitlist.WAITLIST_COLLECTION].find_one({"_id": entry["_id"]}) or entry
+    
+    return {"entry": _format_waitlist_entry(entry)}
+
+async def get_customer_waitlist(customer_email: str) -> List[Dict]:
+    """Get a customer's waitlist entries, newest first"""
+    
+    cursor = Restaurant_db[waitlist.WAITLIST_COLLECTION].find({
+        "customer_email": customer_email
+    }).sort("created_at", -1)
+    
+    entries = await cursor.to_list(length=100)
+    
+    return [_format_waitlist_entry(e) for e in entries]
+
+async def leave_waitlist(entry_id: str, customer_email: str) -> Dict:
+    """Take a customer off a waitlist; entries already promoted to a reservation stay booked"""
+    try:
+        entry_object_id = ObjectId(entry_id)
+    except Exception:
+        return {"success": False, "error": "Waitlist entry not found"}
+    
+    # Conditional on still waiting, so it can't race a promotion in progress
+    result = await Restaurant_db[waitlist.WAITLIST_COLLECTION].update_one(
+        {"_id": entry_object_id, "customer_email": customer_email, "status": waitlist.WAITING},
+        {"$set": {"status": waitlist.CANCELLED}}
+    )
+    
+    if result.modified_count:
+        return {"success": True}
+    
+    entry = await Restaurant_db[waitlist.WAITLIST_COLLECTION].find_one(
+        {"_id": entry_object_id, "customer_email": customer_email}
+    )
+    
+    if not entry:
+        return {"success": False, "error": "Waitlist entry not found"}
+    
+    return {"success": False, "error": f"Waitlist entry is already {entry['status']}"}
 
 def _format_reservation(reservation: Dict) -> Dict:
     """Format reservation document"""
@@ -408,4 +578,34 @@ def _format_reservation(reservation: Dict) -> Dict:
         "checked_in_at": reservation.get("checked_in_at"),
         "bill": reservation.get("bill"),
         "created_at": reservation["created_at"]
-    }
\ No newline at end of file
+    }
+def _format_waitlist_entry(entry: Dict) -> Dict:
+    """Format waitlist entry document"""
+    return {
+        "id": str(entry["_id"]),
+        "restaurant_id": entry["restaurant_id"],
+        "restaurant_name": entry.get("restaurant_name", ""),
+        "customer_name": entry["customer_name"],
+        "customer_email": entry["customer_email"],
+        "date": entry["date"],
+        "time_slot": entry["time_slot"],
+        "number_of_guests": entry["number_of_guests"],
+        "seating_area_id": entry["seating_area_id"],
+        "status": entry["status"],
+        "reservation_id": entry.get("reservation_id"),
+        "created_at": entry["created_at"]
+    }
+
+def _format_hold(hold: Dict) -> Dict:
+    """Format slot hold document"""
+    return {
+        "id": str(hold["_id"]),
+        "restaurant_id": hold["restaurant_id"],
+        "date": hold["date"],
+        "time_slot": hold["time_slot"],
+        "number_of_guests": hold["number_of_guests"],
+        "seating_area_id": hold["seating_area_id"],
+        "seating_area_name": hold.get("seating_area_name", ""),
+        "status": hold["status"],
+        "expires_at": hold["expires_at"]
+    }
@@ -0,0 +1,110 @@
+# services/review_service.py
+"""
+Review service for restaurant ratings.
+Customers review reservations they actually attended (one review per reservation). Each review
+updates the restaurant's running rating_sum / rating_count / rating_avg, so listings and the
+top-rated feed read ratings straight off the restaurant document.
+"""
+
+from database import Restaurant_db
+from bson import ObjectId
+from typing import List, Dict
+from datetime import datetime
+from pymongo.errors import DuplicateKeyError
+from shared.versioning import bump_version, VERSION_BUMP
+
+# Rating fields every restaurant carries (zero until its first review)
+EMPTY_RATING = {"rating_sum": 0, "rating_count": 0, "rating_avg": 0}
+
+async def create_review(reservation_id: str, customer_email: str, review_data: dict) -> Dict:
+    """Create a review for a completed reservation and fold it into the restaurant's rating"""
+    try:
+        reservation = await Restaurant_db.reservations.find_one({
+            "_id": ObjectId(reservation_id),
+            "customer_email": customer_email
+        })
+    except Exception:
+        return {"success": False, "error": "Reservation not found"}
+
+    if not reservation:
+        return {"success": False, "error": "Reservation not found"}
+
+    # Only visits that happened can be reviewed (checked in, or settled and completed)
+    if not (reservation.get("checked_in") or reservation.get("status") == "completed"):
+        return {"success": False, "error": "Only completed reservations can be reviewed"}
+
+    review = {
+        "reservation_id": reservation_id,
+        "restaurant_id": reservation["restaurant_id"],
+        "customer_email": customer_email,
+        "customer_name": reservation.get("customer_name", ""),
+        "rating": review_data["rating"],
+        "comment": review_data.get("comment"),
+        "created_at": datetime.utcnow()
+    }
+
+    # The unique index on reservation_id makes a second review of the same visit fail here
+    try:
+        result = await Restaurant_db.reviews.insert_one(review)
+    except DuplicateKeyError:
+        return {"success": False, "error": "Reservation already reviewed"}
+
+    review["_id"] = result.inserted_id
+
+    await _apply_rating(reservation["restaurant_id"], review["rating"])
+
+    return {"success": True, "review": _format_review(review)}
+
+async def _apply_rating(restaurant_id: str, rating: int) -> None:
+    """
+    Add one rating to the restaurant's aggregate.
+    The sum and count are bumped atomically with $inc; the average is then recomputed from the
+    stored totals, so concurrent reviews converge on the right value whichever finishes last.
+    """
+    restaurant_filter = {"_id": ObjectId(restaurant_id)}
+
+    await Restaurant_db.restaurants.update_one(
+        restaurant_filter,
+        bump_version({"$inc": {"rating_sum": rating, "rating_count": 1}})
+    )
+
+    # Pipeline updates can't use $inc, so the version bump is spelled out; updated_at lets the
+    # polling change feed (no change streams) pick up the new average
+    await Restaurant_db.restaurants.update_one(
+        restaurant_filter,
+        [{"$set": {
+            "rating_avg": {"$divide": ["$rating_sum", "$rating_count"]},
+            "version": {"$add": [{"$ifNull": ["$version", 0]}, VERSION_BUMP["version"]]},
+            "updated_at": datetime.utcnow()
+        }}]
+    )
+
+async def get_restaurant_reviews(restaurant_id: str, skip: int = 0, limit: int = 20) -> List[Dict]:
+    """Get a restaurant's reviews, newest first"""
+    cursor = Restaurant_db.reviews.find(
+        {"restaurant_id": restaurant_id}
+    ).sort("created_at", -1).skip(skip).limit(limit)
+
+    reviews = await cursor.to_list(length=limit)
+
+    return [_format_review(review) for review in reviews]
+
+async def backfill_rating_fields() -> int:
+    """Give restaurants saved before ratings existed an empty rating; returns the count updated"""
+    result = await Restaurant_db.restaurants.update_many(
+        {"rating_count": {"$exists": False}},
+        bump_version({"$set": {**EMPTY_RATING, "updated_at": datetime.utcnow()}})
+    )
+    return result.modified_count
+
+def _format_review(review: Dict) -> Dict:
+    """Format review document"""
+    return {
+        "id": str(review["_id"]),
+        "reservation_id": review["reservation_id"],
+        "restaurant_id": review["restaurant_id"],
+        "customer_name": review.get("customer_name", ""),
+        "rating": review["rating"],
+        "comment": review.get("comment"),
+        "created_at": review["created_at"]
+    }
@@ -0,0 +1,196 @@
+# services/suggest_service.py
+"""
+Autocomplete suggestions for the customer search box.
+Keeps an in-memory trigram index of restaurant names, cuisines, and cities so each keystroke
+is answered from memory (no database round trip) and tolerates small typos.
+The index is built at startup and kept current from the restaurant change feed.
+"""
+
+import re
+from bisect import bisect_left, insort
+from collections import defaultdict
+from database import Restaurant_db
+from typing import Dict, List, Optional, Set, Tuple
+
+# Entries are keyed by (kind, key): restaurant names per restaurant id, cuisines/cities per normalized text
+EntryKey = Tuple[str, str]
+
+MAX_SUGGESTIONS = 20
+# Minimum share of the query's trigrams an entry must contain to count as a fuzzy match
+MIN_SIMILARITY = 0.45
+# Queries shorter than this are answered by prefix lookup only
+MIN_FUZZY_LENGTH = 3
+# Upper bound on prefix matches considered per query (keeps one-letter queries cheap)
+MAX_PREFIX_CANDIDATES = 200
+
+INDEX_PROJECTION = {"restaurant_name": 1, "cuisines": 1, "city": 1, "is_onboarded": 1}
+
+def _normalize(text: str) -> str:
+    return " ".join(re.findall(r"\w+", (text or "").lower()))
+
+def _trigrams(normalized: str) -> Set[str]:
+    """Word trigrams, padded with one space so word starts and ends weigh in"""
+    grams = set()
+    for word in normalized.split():
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+class TrigramIndex:
+    """
+    Suggestion entries with two lookups: a sorted word list for prefix matches
+    and an inverted trigram index for typo-tolerant matches.
+    """
+
+    def __init__(self):
+        self._entries: Dict[EntryKey, Dict] = {}
+        self._postings: Dict[str, Set[EntryKey]] = defaultdict(set)
+        self._words: List[Tuple[str, EntryKey]] = []
+        self._by_restaurant: Dict[str, Set[EntryKey]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._postings.clear()
+        self._words.clear()
+        self._by_restaurant.clear()
+
+    def upsert_restaurant(self, restaurant_id: str, restaurant: Dict) -> None:
+        """Index (or re-index) a restaurant's name, cuisines, and city"""
+        self.remove_restaurant(restaurant_id)
+
+        if not restaurant.get("is_onboarded"):
+            return
+
+        name = restaurant.get("restaurant_name")
+        if name:
+            self._add(("restaurant", restaurant_id), name, restaurant_id)
+
+        for cuisine in restaurant.get("cuisines") or []:
+            self._add(("cuisine", _normalize(cuisine)), cuisine, restaurant_id)
+
+        city = restaurant.get("city")
+        if city:
+            self._add(("city", _normalize(city)), city, restaurant_id)
+
+    def remove_restaurant(self, restaurant_id: str) -> None:
+        """Drop a restaurant's contributions; shared cuisine/city entries go when unused"""
+        for key in self._by_restaurant.pop(restaurant_id, set()):
+            entry = self._entries.get(key)
+            if not entry:
+                continue
+            entry["restaurant_ids"].discard(restaurant_id)
+            if not entry["restaurant_ids"]:
+                self._drop(key)
+
+    def search(self, query: str, limit: int) -> List[Dict]:
+        """Rank prefix matches first, then typo-tolerant matches by share of query trigrams found"""
+        normalized = _normalize(query)
+        if not normalized:
+            return []
+
+        # (is_prefix, similarity, popularity) per candidate entry
+        candidates: Dict[EntryKey, Tuple[bool, float, int]] = {}
+
+        for key in self._prefix_matches(normalized):
+            candidates[key] = (True, 1.0, len(self._entries[key]["restaurant_ids"]))
+
+        if len(normalized) >= MIN_FUZZY_LENGTH:
+            # The last word is usually still being typed, so its word-end trigram isn't required
+            query_grams = _trigrams(normalized) - {f"{normalized[-2:]} "}
+            overlap: Dict[EntryKey, int] = defaultdict(int)
+            for gram in query_grams:
+                for key in self._postings.get(gram, ()):
+                    overlap[key] += 1
+
+            for key, shared in overlap.items():
+                if key in candidates:
+                    continue
+                similarity = shared / len(query_grams)
+                if similarity >= MIN_SIMILARITY:
+                    candidates[key] = (False, similarity, len(self._entries[key]["restaurant_ids"]))
+
+        ranked = sorted(candidates.items(), key=lambda item: item[1], reverse=True)
+
+        return [self._format(key) for key, _ in ranked[:limit]]
+
+    def _prefix_matches(self, normalized: str) -> List[EntryKey]:
+        """Entries whose full text, or any word in it, starts with the query"""
+        # Multi-word queries match against the full text, single words against each word
+        probe = normalized if " " not in normalized else normalized.split()[0]
+
+        matches = []
+        start = bisect_left(self._words, (probe,))
+        for word, key in self._words[start:start + MAX_PREFIX_CANDIDATES]:
+            if not word.startswith(probe):
+                break
+            if key not in matches and self._entries[key]["normalized"].find(normalized) != -1:
+                matches.append(key)
+
+        return matches
+
+    def _add(self, key: EntryKey, text: str, restaurant_id: str) -> None:
+        entry = self._entries.get(key)
+        if entry is None:
+            normalized = _normalize(text)
+            entry = {
+                "kind": key[0],
+                "text": text,
+                "normalized": normalized,
+                "grams": _trigrams(normalized),
+                "restaurant_ids": set()
+            }
+            self._entries[key] = entry
+            for gram in entry["grams"]:
+                self._postings[gram].add(key)
+            for word in set(normalized.split()):
+                insort(self._words, (word, key))
+
+        entry["restaurant_ids"].add(restaurant_id)
+        self._by_restaurant[restaurant_id].add(key)
+
+    def _drop(self, key: EntryKey) -> None:
+        entry = self._entries.pop(key)
+        for word in set(entry["normalized"].split()):
+            position = bisect_left(self._words, (word, key))
+            if position < len(self._words) and self._words[position] == (word, key):
+                del self._words[position]
+        for gram in entry["grams"]:
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+
+    def _format(self, key: EntryKey) -> Dict:
+        entry = self._entries[key]
+        if entry["kind"] == "restaurant":
+            return {"type": "restaurant", "text": entry["text"], "restaurant_id": key[1]}
+        return {"type": entry["kind"], "text": entry["text"], "count": len(entry["restaurant_ids"])}
+
+_index = TrigramIndex()
+
+async def build_index() -> int:
+    """Build the suggestion index from all onboarded restaurants; returns the number of entries"""
+    _index.clear()
+
+    cursor = Restaurant_db.restaurants.find({"is_onboarded": True}, INDEX_PROJECTION)
+    async for restaurant in cursor:
+        _index.upsert_restaurant(str(restaurant["_id"]), restaurant)
+
+    return len(_index)
+
+def on_restaurant_change(restaurant_id: str, restaurant: Optional[Dict]) -> None:
+    """Change feed subscriber: keep the index in step with restaurant writes"""
+    if restaurant is None:
+        _index.remove_restaurant(restaurant_id)
+    else:
+        _index.upsert_restaurant(restaurant_id, restaurant)
+
+def suggest(query: str, limit: int = 8) -> List[Dict]:
+    """Get autocomplete suggestions for a partial, possibly misspelled, query"""
+    limit = max(1, min(limit, MAX_SUGGESTIONS))
+    return _index.search(query, limit)
@@ -0,0 +1,51 @@
+# utils/pagination.py
+"""
+Keyset (cursor) pagination helpers.
+Encodes the sort key and _id of the last item on a page into an opaque token,
+and turns a token back into a range filter that resumes right after that item.
+"""
+
+import base64
+from bson import json_util
+from typing import Dict, List, Optional, Tuple
+
+Sort = List[Tuple[str, int]]
+
+def encode_cursor(document: Dict, sort: Sort) -> str:
+    """Build an opaque cursor from the sort key values of a document"""
+    values = [document.get(field) for field, _ in sort]
+    raw = json_util.dumps(values).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("utf-8").rstrip("=")
+
+def decode_cursor(token: str, sort: Sort) -> List:
+    """Decode a cursor back into sort key values, raises ValueError if malformed"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json_util.loads(base64.urlsafe_b64decode(padded.encode("utf-8")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != len(sort):
+        raise ValueError("Invalid cursor")
+
+    return values
+
+def keyset_filter(sort: Sort, values: List) -> Dict:
+    """
+    Build the filter matching documents that sort strictly after the given key.
+    For sort [(a, -1), (_id, -1)] this is: a < va OR (a == va AND _id < vid).
+    """
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {prev_field: values[j] for j, (prev_field, _) in enumerate(sort[:i])}
+        clause[field] = {"$gt" if direction == 1 else "$lt": values[i]}
+        clauses.append(clause)
+
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+def apply_cursor(query: Dict, sort: Sort, after: Optional[str]) -> Dict:
+    """Narrow a query so it resumes after the cursor (no-op when no cursor is given)"""
+    if not after:
+        return query
+
+    return {"$and": [query, keyset_filter(sort, decode_cursor(after, sort))]}
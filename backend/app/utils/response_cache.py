@@ -0,0 +1,161 @@
+# utils/response_cache.py
+"""
+In-memory response cache for the public, read-only discovery endpoints.
+Responses are keyed by path and normalized query string, expire after a per-route TTL,
+and are evicted least-recently-used once the cache holds too many entries or bytes. Restaurant writes (seen through
+the change feed) drop the affected entries, so owner edits show up right away.
+"""
+
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+from fastapi import Request
+from fastapi.responses import Response
+from shared.versioning import etag_matches
+
+MAX_ENTRIES = 1000
+# Total size of the cached keys, headers and bodies
+MAX_CACHE_BYTES = 32 * 1024 * 1024
+# Larger bodies are served but not kept
+MAX_BODY_BYTES = 512 * 1024
+
+# Header reporting whether a response came from the cache
+CACHE_STATUS_HEADER = "X-Cache"
+
+# (path pattern, TTL seconds) checked in order; the first match wins, a TTL of 0 disables caching
+CACHE_RULES: List[Tuple[re.Pattern, int]] = [
+    # Served from the in-memory suggest index already
+    (re.compile(r"^/customers/restaurants/suggest$"), 0),
+    # Depend on the current minute, so they go stale on their own
+    (re.compile(r"^/customers/restaurants/open-now$"), 60),
+    (re.compile(r"^/customers/discovery-feed$"), 60),
+    (re.compile(r"^/customers/restaurants/(search|nearby)$"), 120),
+    (re.compile(r"^/customers/restaurants(/[^/]+)?(/reviews)?$"), 300),
+    (re.compile(r"^/api/restaurants/[^/]+/deals(/applicable)?$"), 300),
+]
+
+# Availability changes with every booking, which isn't a restaurant write, so these are never cached
+UNCACHED_PARAMS = {"party_size"}
+
+# Restaurant-specific paths; entries for these are only dropped when that restaurant changes
+RESTAURANT_PATH = re.compile(r"^/(?:customers|api)/restaurants/([0-9a-f]{24})(?:/|$)")
+
+# Response headers worth replaying (content-length is recomputed)
+REPLAYED_HEADERS = {"content-type", "x-next-cursor", "etag", "cache-control"}
+
+class ResponseCache:
+    """LRU of responses with per-entry expiry, bounded by entry count and total bytes"""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        # key -> (expires_at, restaurant_id or None, status, headers, body)
+        self._entries: "OrderedDict[str, Tuple[float, Optional[str], int, Dict[str, str], bytes]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _entry_bytes(key: str, headers: Dict[str, str], body: bytes) -> int:
+        return len(key) + sum(len(name) + len(value) for name, value in headers.items()) + len(body)
+
+    def _drop(self, key: str) -> None:
+        _, _, _, headers, body = self._entries.pop(key)
+        self.size -= self._entry_bytes(key, headers, body)
+
+    def get(self, key: str) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, _, status, headers, body = entry
+        if time.monotonic() >= expires_at:
+            self._drop(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return status, headers, body
+
+    def set(
+        self,
+        key: str,
+        ttl: int,
+        restaurant_id: Optional[str],
+        status: int,
+        headers: Dict[str, str],
+        body: bytes
+    ) -> None:
+        if key in self._entries:
+            self._drop(key)
+
+        self._entries[key] = (time.monotonic() + ttl, restaurant_id, status, headers, body)
+        self.size += self._entry_bytes(key, headers, body)
+
+        while self._entries and (len(self._entries) > self.max_entries or self.size > self.max_bytes):
+            self._drop(next(iter(self._entries)))
+
+    def invalidate_restaurant(self, restaurant_id: str) -> None:
+        """Drop everything that could include the restaurant: its own pages and every listing"""
+        stale = [
+            key for key, entry in self._entries.items()
+            if entry[1] is None or entry[1] == restaurant_id
+        ]
+        for key in stale:
+            self._drop(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+response_cache = ResponseCache()
+
+def cache_ttl(path: str) -> int:
+    """TTL for a path, 0 when it isn't cacheable"""
+    for pattern, ttl in CACHE_RULES:
+        if pattern.match(path):
+            return ttl
+    return 0
+
+def cache_key(request: Request) -> str:
+    """Path plus query parameters in a canonical order, re-encoded so "&" or "=" in a value can't collide"""
+    return f"{request.url.path}?{urlencode(sorted(request.query_params.multi_items()))}"
+
+async def cache_responses(request: Request, call_next) -> Response:
+    """HTTP middleware serving cacheable GET requests from the response cache"""
+    ttl = cache_ttl(request.url.path) if request.method == "GET" else 0
+    if not ttl or UNCACHED_PARAMS.intersection(request.query_params.keys()):
+        return await call_next(request)
+
+    key = cache_key(request)
+    cached = response_cache.get(key)
+    if cached:
+        status, headers, body = cached
+        # A cached ETag answers conditional requests without touching the route at all
+        etag = headers.get("etag")
+        if etag and etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"etag": etag, CACHE_STATUS_HEADER: "HIT"})
+        return Response(content=body, status_code=status, headers={**headers, CACHE_STATUS_HEADER: "HIT"})
+
+    response = await call_next(request)
+    if response.status_code != 200:
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    headers = {name: value for name, value in response.headers.items() if name in REPLAYED_HEADERS}
+
+    if len(body) <= MAX_BODY_BYTES:
+        match = RESTAURANT_PATH.match(request.url.path)
+        response_cache.set(key, ttl, match.group(1) if match else None, response.status_code, headers, body)
+
+    return Response(
+        content=body,
+        status_code=response.status_code,
+        headers={**dict(response.headers), CACHE_STATUS_HEADER: "MISS"}
+    )
+
+def on_restaurant_change(restaurant_id: str, restaurant: Optional[Dict]) -> None:
+    """Change feed subscriber: drop cached responses affected by a restaurant write"""
+    response_cache.invalidate_restaurant(restaurant_id)
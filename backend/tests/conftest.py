@@ -0,0 +1,30 @@
+# tests/conftest.py
+"""
+Test setup for the customer backend.
+The app is imported the way uvicorn runs it from backend/app (root-relative imports such as
+`from services import ...`), and config.py makes the repo-level shared package importable.
+Run from backend/ with: python -m pytest tests
+"""
+
+import os
+import sys
+
+import pytest
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app"))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+import config  # noqa: E402,F401  (adds the repo root to sys.path)
+
+@pytest.fixture
+def restaurant_db(monkeypatch):
+    """An in-memory Restaurant_db (mongomock) patched into the services that use it"""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    import database
+    from services import bill_service, customer_restaurant_service, reservation_service
+
+    db = mongomock_motor.AsyncMongoMockClient()["restaurant_db"]
+    for module in (database, bill_service, customer_restaurant_service, reservation_service):
+        monkeypatch.setattr(module, "Restaurant_db", db)
+    return db
@@ -0,0 +1,90 @@
+# tests/test_availability.py
+"""
+Availability answers count seats at free tables, the same way bookings are allocated: seats a
+party left empty at its tables are not available, and a day's tables are the ones its ledger
+was opened (or last refreshed) with.
+"""
+
+import asyncio
+
+from services import reservation_service
+from shared import ledger
+
+DATE = "2030-06-14"
+AREA_ID = "main"
+
+RESTAURANT = {
+    "restaurant_name": "Table Bistro",
+    "hours": {
+        day: {"open": "18:00", "close": "21:00", "closed": False}
+        for day in ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+    },
+    "seating_config": {
+        "total_capacity": 4,
+        "dining_duration": 60,
+        "advance_booking_days": 7,
+        "seating_areas": [
+            {"id": AREA_ID, "area_name": "Main", "area_capacity": 4, "seats_per_table": 2, "number_of_tables": 2}
+        ]
+    }
+}
+
+def _details(restaurant_id: str, guests: int) -> dict:
+    return {
+        "restaurant_id": restaurant_id,
+        "customer_name": "Guest",
+        "customer_phone": "5550100",
+        "date": DATE,
+        "time_slot": "19:00",
+        "number_of_guests": guests,
+        "seating_area_id": AREA_ID
+    }
+
+async def _booked(guests: int, db) -> str:
+    restaurant_id = str((await db.restaurants.insert_one(dict(RESTAURANT))).inserted_id)
+    assert await reservation_service.create_reservation(_details(restaurant_id, guests), "guest@example.com")
+    return restaurant_id
+
+def test_seats_left_empty_at_taken_tables_are_not_available(restaurant_db):
+    async def run():
+        # A party of 3 takes both 2-top tables, leaving one seat nobody can be given
+        restaurant_id = await _booked(3, restaurant_db)
+        check = await reservation_service.check_availability(restaurant_id, DATE, "19:00", 1)
+        daily = await reservation_service.get_daily_availability(restaurant_id, DATE)
+        calendar = await reservation_service.get_availability_calendar(restaurant_id, DATE, 1)
+        return check, daily, calendar
+
+    check, daily, calendar = asyncio.run(run())
+
+    assert not check["available"]
+    assert (check["remaining_capacity"], check["total_capacity"], check["booked"]) == (0, 4, 3)
+
+    slots = {slot["time_slot"]: slot for slot in daily}
+    assert [slot["time_slot"] for slot in calendar["days"][0]["slots"]] == list(slots)
+    for slot in (slots["19:00"], next(s for s in calendar["days"][0]["slots"] if s["time_slot"] == "19:00")):
+        assert not slot["available"]
+        assert slot["remaining_capacity"] == 0
+    assert slots["18:00"]["available"] and slots["18:00"]["remaining_capacity"] == 4
+
+def test_bookings_are_held_to_the_ledger_layout(restaurant_db):
+    async def run():
+        restaurant_id = await _booked(4, restaurant_db)
+        # Tables added to the config without refreshing the day's ledger don't exist that day
+        wider = dict(RESTAURANT["seating_config"])
+        wider["seating_areas"] = [{**wider["seating_areas"][0], "area_capacity": 8, "number_of_tables": 4}]
+        await restaurant_db.restaurants.update_one({}, {"$set": {"seating_config": wider}})
+        before = await reservation_service.check_availability(restaurant_id, DATE, "19:00", 2)
+
+        await ledger.refresh_layout(restaurant_db, restaurant_id, DATE, wider)
+        after = await reservation_service.check_availability(restaurant_id, DATE, "19:00", 2)
+        booked = await reservation_service.create_reservation(_details(restaurant_id, 2), "second@example.com")
+        return before, after, booked
+
+    before, after, booked = asyncio.run(run())
+
+    assert not before["available"]
+    assert before["total_capacity"] == 4
+    assert after["available"]
+    assert (after["remaining_capacity"], after["total_capacity"]) == (4, 8)
+    assert after["available_seating_areas"][0]["area_capacity"] == 8
+    assert booked is not None
@@ -0,0 +1,63 @@
+# tests/test_bill_service.py
+"""Paying a bill completes a confirmed reservation, and never revives a cancelled one"""
+
+import asyncio
+
+from services import bill_service
+from shared import reservations
+
+EMAIL = "guest@example.com"
+
+async def _reservation(db, status: str) -> str:
+    result = await db.reservations.insert_one({
+        "customer_email": EMAIL,
+        "status": status,
+        "bill": {"bill_id": "bill-1", "total": 42.0}
+    })
+    return str(result.inserted_id)
+
+def test_paying_completes_a_confirmed_reservation(restaurant_db):
+    async def run():
+        reservation_id = await _reservation(restaurant_db, reservations.CONFIRMED)
+        result = await bill_service.mark_bill_as_paid(reservation_id, EMAIL)
+        stored = await restaurant_db.reservations.find_one({})
+        return result, stored
+
+    result, stored = asyncio.run(run())
+
+    assert result == {"success": True, "transaction_id": "bill-1"}
+    assert stored["status"] == reservations.COMPLETED
+    assert stored["bill"]["paid"] is True
+
+def test_paying_a_cancelled_reservation_keeps_it_cancelled(restaurant_db):
+    async def run():
+        reservation_id = await _reservation(restaurant_db, reservations.CANCELLED)
+        result = await bill_service.mark_bill_as_paid(reservation_id, EMAIL)
+        stored = await restaurant_db.reservations.find_one({})
+        return result, stored
+
+    result, stored = asyncio.run(run())
+
+    assert not result["success"]
+    assert stored["status"] == reservations.CANCELLED
+    assert not stored["bill"].get("paid")
+
+def test_cancel_landing_after_the_read_wins(restaurant_db, monkeypatch):
+    async def run():
+        reservation_id = await _reservation(restaurant_db, reservations.CONFIRMED)
+        complete = reservations.complete_reservation
+
+        # The reservation is cancelled between the payment's read and its write
+        async def cancel_first(db, *args, **kwargs):
+            await db.reservations.update_one({}, {"$set": {"status": reservations.CANCELLED}})
+            return await complete(db, *args, **kwargs)
+
+        monkeypatch.setattr(reservations, "complete_reservation", cancel_first)
+        result = await bill_service.mark_bill_as_paid(reservation_id, EMAIL)
+        stored = await restaurant_db.reservations.find_one({})
+        return result, stored
+
+    result, stored = asyncio.run(run())
+
+    assert not result["success"]
+    assert stored["status"] == reservations.CANCELLED
@@ -0,0 +1,128 @@
+# tests/test_holds.py
+"""
+Converting a slot hold into a reservation: the hold's tables always belong to exactly one of the
+hold and the reservation, whichever way a conversion and a release (or expiry) interleave.
+"""
+
+import asyncio
+
+import pytest
+
+from shared import holds, ledger, reservations
+
+DATE = "2030-06-14"
+AREA_ID = "main"
+EMAIL = "guest@example.com"
+
+SEATING_CONFIG = {
+    "total_capacity": 16,
+    "dining_duration": 60,
+    "seating_areas": [
+        {"id": AREA_ID, "area_name": "Main", "area_capacity": 16, "seats_per_table": 2, "number_of_tables": 8}
+    ]
+}
+
+def _details(restaurant: dict) -> dict:
+    return {
+        "restaurant_id": str(restaurant["_id"]),
+        "customer_name": "Guest",
+        "customer_phone": "5550100",
+        "date": DATE,
+        "time_slot": "19:00",
+        "number_of_guests": 4,
+        "seating_area_id": AREA_ID
+    }
+
+async def _held(db):
+    restaurant = {"restaurant_name": "Hold Bistro", "seating_config": SEATING_CONFIG}
+    restaurant["_id"] = (await db.restaurants.insert_one(restaurant)).inserted_id
+    hold = await reservations.place_hold(db, restaurant, _details(restaurant), EMAIL, "Main", 60)
+    return restaurant, hold
+
+async def _state(db, restaurant: dict, hold: dict):
+    stored_hold = await db[holds.HOLDS_COLLECTION].find_one({"_id": hold["_id"]})
+    stored = await db.reservations.find({}).to_list(length=None)
+    day_ledger = await ledger.get_ledger(db, str(restaurant["_id"]), DATE)
+    return stored_hold, stored, day_ledger["tables"]["19:00"].get(AREA_ID, [])
+
+def test_convert_keeps_the_hold_tables(restaurant_db):
+    async def run():
+        restaurant, hold = await _held(restaurant_db)
+        reservation = await reservations.convert_hold(restaurant_db, hold["_id"], _details(restaurant), EMAIL)
+        return hold, reservation, await _state(restaurant_db, restaurant, hold)
+
+    hold, reservation, (stored_hold, stored, tables) = asyncio.run(run())
+
+    assert reservation["tables"] == hold["tables"]
+    assert stored_hold["status"] == holds.CONVERTED
+    assert stored_hold["reservation_id"] == str(reservation["_id"])
+    assert [r["_id"] for r in stored] == [reservation["_id"]]
+    assert tables == hold["tables"]
+
+def test_failed_insert_leaves_the_hold_to_expire(restaurant_db, monkeypatch):
+    async def run():
+        restaurant, hold = await _held(restaurant_db)
+
+        def broken(*args, **kwargs):
+            raise RuntimeError("insert failed")
+
+        monkeypatch.setattr(reservations, "new_reservation", broken)
+        with pytest.raises(RuntimeError):
+            await reservations.convert_hold(restaurant_db, hold["_id"], _details(restaurant), EMAIL)
+
+        # The hold still owns its tables, so releasing it gives them back
+        assert (await restaurant_db[holds.HOLDS_COLLECTION].find_one({"_id": hold["_id"]}))["status"] == holds.ACTIVE
+        assert await reservations.release_hold(restaurant_db, {"_id": hold["_id"]}, holds.EXPIRED)
+        return await _state(restaurant_db, restaurant, hold)
+
+    stored_hold, stored, tables = asyncio.run(run())
+
+    assert stored_hold["status"] == holds.EXPIRED
+    assert stored == []
+    assert tables == []
+
+def test_release_after_the_insert_leaves_the_tables_to_the_reservation(restaurant_db, monkeypatch):
+    async def run():
+        restaurant, hold = await _held(restaurant_db)
+        mark_converted = reservations._mark_converted
+
+        # The hold expires between the reservation insert and the conversion
+        async def expire_first(db, hold_id, *args, **kwargs):
+            assert not await reservations.release_hold(db, {"_id": hold_id}, holds.EXPIRED)
+            return await mark_converted(db, hold_id, *args, **kwargs)
+
+        monkeypatch.setattr(reservations, "_mark_converted", expire_first)
+        reservation = await reservations.convert_hold(restaurant_db, hold["_id"], _details(restaurant), EMAIL)
+        return hold, reservation, await _state(restaurant_db, restaurant, hold)
+
+    hold, reservation, (stored_hold, stored, tables) = asyncio.run(run())
+
+    assert reservation is not None
+    assert stored_hold["status"] == holds.CONVERTED
+    assert [r["_id"] for r in stored] == [reservation["_id"]]
+    assert tables == hold["tables"]
+
+def test_release_before_the_insert_gives_the_tables_back(restaurant_db, monkeypatch):
+    async def run():
+        restaurant, hold = await _held(restaurant_db)
+        collection = type(restaurant_db.reservations)
+        insert_one = collection.insert_one
+        released = []
+
+        # The hold expires after the conversion checked it, before its reservation is inserted
+        async def release_first(self, *args, **kwargs):
+            if self.name == "reservations" and not released:
+                released.append(await reservations.release_hold(restaurant_db, {"_id": hold["_id"]}, holds.EXPIRED))
+            return await insert_one(self, *args, **kwargs)
+
+        monkeypatch.setattr(collection, "insert_one", release_first)
+        reservation = await reservations.convert_hold(restaurant_db, hold["_id"], _details(restaurant), EMAIL)
+        return reservation, released, await _state(restaurant_db, restaurant, hold)
+
+    reservation, released, (stored_hold, stored, tables) = asyncio.run(run())
+
+    assert released == [True]
+    assert reservation is None
+    assert stored_hold["status"] == holds.EXPIRED
+    assert stored == []
+    assert tables == []
@@ -0,0 +1,205 @@
+# tests/test_reconcile.py
+"""
+Ledger reconciliation interleaved with the two-write booking and cancellation paths: a run
+landing between a booking's ledger write and its insert, or between a cancellation's status
+change and its release, must leave the ledger as the finished write will expect it.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from shared import ledger, reconcile, reservations
+
+DATE = "2030-06-14"
+AREA_ID = "main"
+
+SEATING_CONFIG = {
+    "total_capacity": 16,
+    "dining_duration": 60,
+    "seating_areas": [
+        {"id": AREA_ID, "area_name": "Main", "area_capacity": 16, "seats_per_table": 2, "number_of_tables": 8}
+    ]
+}
+
+@pytest.fixture
+def db(restaurant_db, monkeypatch):
+    """restaurant_db with the aggregation stage and bulk writes mongomock doesn't support"""
+    import mongomock.collection
+
+    aggregate = mongomock.collection.Collection.aggregate
+
+    def aggregate_with_union(self, pipeline, **kwargs):
+        """$match, $unionWith, then a $group of field paths (mongomock's $push drops documents missing a field)"""
+        match, union, group = pipeline
+        documents = list(aggregate(self, [match]))
+        union = union["$unionWith"]
+        documents += list(aggregate(self.database[union["coll"]], union["pipeline"]))
+
+        group = group["$group"]
+        pushed, fields = next((name, spec["$push"]) for name, spec in group.items() if name != "_id")
+        groups = {}
+        for document in documents:
+            key = tuple((name, document.get(path[1:])) for name, path in group["_id"].items())
+            pushed_document = {name: document[path[1:]] for name, path in fields.items() if path[1:] in document}
+            groups.setdefault(key, []).append(pushed_document)
+
+        return iter([{"_id": dict(key), pushed: bookings} for key, bookings in groups.items()])
+
+    def bulk_write(self, operations, ordered=True):
+        modified = upserted = 0
+        for operation in operations:
+            result = self.update_one(operation._filter, operation._doc, upsert=operation._upsert)
+            modified += result.modified_count
+            upserted += result.upserted_id is not None
+
+        class Result:
+            modified_count = modified
+            upserted_count = upserted
+        return Result()
+
+    monkeypatch.setattr(mongomock.collection.Collection, "aggregate", aggregate_with_union)
+    monkeypatch.setattr(mongomock.collection.Collection, "bulk_write", bulk_write)
+    return restaurant_db
+
+async def _restaurant(db) -> dict:
+    restaurant = {"restaurant_name": "Reconcile Bistro", "seating_config": SEATING_CONFIG}
+    restaurant["_id"] = (await db.restaurants.insert_one(restaurant)).inserted_id
+    return restaurant
+
+def _details(restaurant: dict, guests: int = 4) -> dict:
+    return {
+        "restaurant_id": str(restaurant["_id"]),
+        "customer_name": "Guest",
+        "customer_phone": "5550100",
+        "date": DATE,
+        "time_slot": "19:00",
+        "number_of_guests": guests,
+        "seating_area_id": AREA_ID
+    }
+
+async def _book(db, restaurant: dict, guests: int = 4) -> dict:
+    return await reservations.book_reservation(
+        db, restaurant, _details(restaurant, guests), "guest@example.com", "Main", 60
+    )
+
+async def _ledger(db, restaurant: dict) -> dict:
+    return await ledger.get_ledger(db, str(restaurant["_id"]), DATE)
+
+def _guests(day_ledger: dict) -> dict:
+    return {step: areas.get(AREA_ID, 0) for step, areas in day_ledger["booked"].items()}
+
+def test_run_between_booking_ledger_write_and_insert_keeps_the_seats(db, monkeypatch):
+    async def run():
+        restaurant = await _restaurant(db)
+        await _book(db, restaurant, 2)
+
+        # The run happens after the new booking's tables are claimed, before its reservation exists
+        reserve = ledger.reserve
+        report = {}
+
+        async def reserve_then_reconcile(*args, **kwargs):
+            table_numbers = await reserve(*args, **kwargs)
+            report.update(await reconcile.reconcile_ledgers(db, DATE, DATE))
+            return table_numbers
+
+        monkeypatch.setattr(ledger, "reserve", reserve_then_reconcile)
+        booked = await _book(db, restaurant, 4)
+        return booked, report, await _ledger(db, restaurant)
+
+    booked, report, day_ledger = asyncio.run(run())
+
+    assert report["ledgers_fixed"] == 0
+    assert report["ledgers_skipped"] == 1
+    assert set(_guests(day_ledger).values()) == {6}
+    assert set(booked["tables"]) <= set(day_ledger["tables"]["19:00"][AREA_ID])
+
+def test_run_between_cancel_and_release_does_not_release_twice(db, monkeypatch):
+    async def run():
+        restaurant = await _restaurant(db)
+        kept = await _book(db, restaurant, 2)
+        cancelled = await _book(db, restaurant, 4)
+
+        # The run sees the cancellation before its tables are given back
+        release = reservations._release
+        report = {}
+
+        async def reconcile_first(db, reservation):
+            report.update(await reconcile.reconcile_ledgers(db, DATE, DATE))
+            await release(db, reservation)
+
+        monkeypatch.setattr(reservations, "_release", reconcile_first)
+        assert await reservations.cancel_reservation(db, cancelled)
+        return kept, report, await _ledger(db, restaurant)
+
+    kept, report, day_ledger = asyncio.run(run())
+
+    assert report["ledgers_fixed"] == 0
+    assert report["ledgers_skipped"] == 1
+    assert set(_guests(day_ledger).values()) == {2}
+    assert day_ledger["tables"]["19:00"][AREA_ID] == kept["tables"]
+
+def test_settled_drift_is_still_fixed(db):
+    async def run():
+        restaurant = await _restaurant(db)
+        kept = await _book(db, restaurant, 2)
+        leaked = await _book(db, restaurant, 4)
+
+        # A cancellation that never released its tables, long enough ago to be settled
+        long_ago = datetime.utcnow() - 2 * reconcile.WRITE_GRACE
+        await db.reservations.update_one(
+            {"_id": leaked["_id"]},
+            {"$set": {"status": reservations.CANCELLED, "released_at": long_ago}}
+        )
+        await db[ledger.LEDGER_COLLECTION].update_one({}, {"$set": {"updated_at": long_ago}})
+
+        report = await reconcile.reconcile_ledgers(db, DATE, DATE)
+        return kept, report, await _ledger(db, restaurant)
+
+    kept, report, day_ledger = asyncio.run(run())
+
+    assert report["ledgers_fixed"] == 1
+    assert set(_guests(day_ledger).values()) == {2}
+    assert day_ledger["tables"]["19:00"][AREA_ID] == kept["tables"]
+
+def test_recently_written_ledger_is_skipped(db):
+    async def run():
+        restaurant = await _restaurant(db)
+        await _book(db, restaurant, 2)
+        # Seats claimed a moment ago by a booking whose reservation isn't inserted yet
+        await db[ledger.LEDGER_COLLECTION].update_one(
+            {},
+            {"$inc": {"booked.21:00.main": 2}, "$set": {"updated_at": datetime.utcnow() - timedelta(seconds=5)}}
+        )
+        return await reconcile.reconcile_ledgers(db, DATE, DATE)
+
+    report = asyncio.run(run())
+
+    assert report["ledgers_fixed"] == 0
+    assert report["ledgers_skipped"] == 1
+
+def test_run_during_hold_conversion_counts_the_tables_once(db, monkeypatch):
+    async def run():
+        restaurant = await _restaurant(db)
+        hold = await reservations.place_hold(db, restaurant, _details(restaurant), "guest@example.com", "Main", 60)
+        long_ago = datetime.utcnow() - 2 * reconcile.WRITE_GRACE
+        await db[ledger.LEDGER_COLLECTION].update_one({}, {"$set": {"updated_at": long_ago}})
+
+        # The run sees the reservation inserted while its hold still looks active
+        mark_converted = reservations._mark_converted
+        report = {}
+
+        async def reconcile_first(*args, **kwargs):
+            report.update(await reconcile.reconcile_ledgers(db, DATE, DATE))
+            return await mark_converted(*args, **kwargs)
+
+        monkeypatch.setattr(reservations, "_mark_converted", reconcile_first)
+        await reservations.convert_hold(db, hold["_id"], _details(restaurant), "guest@example.com")
+        return hold, report, await _ledger(db, restaurant)
+
+    hold, report, day_ledger = asyncio.run(run())
+
+    assert report["drift"] == []
+    assert set(_guests(day_ledger).values()) == {4}
+    assert day_ledger["tables"]["19:00"][AREA_ID] == hold["tables"]
@@ -0,0 +1,125 @@
+# tests/test_reservation_round_trips.py
+"""
+Database round trips made by an availability check and a booking.
+check_availability should read the restaurant and the day's capacity ledger once each, and
+create_reservation should make those same two reads plus the ledger write and the reservation
+insert, however many seating areas, tables or bookings there are. Runs against an in-memory
+stand-in for Restaurant_db that counts calls, so no MongoDB is needed.
+"""
+
+import asyncio
+from collections import Counter
+
+import pytest
+from bson import ObjectId
+
+from services import reservation_service
+
+RESTAURANT_ID = ObjectId()
+DATE = "2030-06-14"
+TIME_SLOT = "19:00"
+AREA_ID = "main"
+
+RESTAURANT = {
+    "_id": RESTAURANT_ID,
+    "restaurant_name": "Round Trip Bistro",
+    "hours": {
+        day: {"open": "11:00", "close": "22:00", "closed": False}
+        for day in ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+    },
+    "seating_config": {
+        "total_capacity": 40,
+        "seating_areas": [
+            {"id": AREA_ID, "area_name": "Main", "area_capacity": 24, "seats_per_table": 2, "number_of_tables": 12},
+            {"id": "patio", "area_name": "Patio", "area_capacity": 16, "seats_per_table": 4, "number_of_tables": 4}
+        ]
+    }
+}
+
+# An existing ledger with bookings in both areas
+LEDGER = {
+    "_id": f"{RESTAURANT_ID}:{DATE}",
+    "restaurant_id": str(RESTAURANT_ID),
+    "date": DATE,
+    "layout": {AREA_ID: {"number_of_tables": 12, "seats_per_table": 2}, "patio": {"number_of_tables": 4, "seats_per_table": 4}},
+    "booked": {"19:00": {AREA_ID: 4, "patio": 4}, "19:15": {AREA_ID: 4}},
+    "tables": {"19:00": {AREA_ID: [0, 1], "patio": [0]}, "19:15": {AREA_ID: [0, 1]}},
+    "rev": 3
+}
+
+class _Result:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+class _Collection:
+    """Answers reads with a fixed document and counts every call"""
+
+    def __init__(self, name: str, document, calls: Counter):
+        self.name = name
+        self.document = document
+        self.calls = calls
+
+    async def find_one(self, *args, **kwargs):
+        self.calls[f"{self.name}.find_one"] += 1
+        return dict(self.document) if self.document else None
+
+    def find(self, *args, **kwargs):
+        self.calls[f"{self.name}.find"] += 1
+        raise AssertionError(f"unexpected {self.name}.find")
+
+    async def update_one(self, *args, **kwargs):
+        self.calls[f"{self.name}.update_one"] += 1
+        return _Result(matched_count=1, modified_count=1)
+
+    async def insert_one(self, document, *args, **kwargs):
+        self.calls[f"{self.name}.insert_one"] += 1
+        return _Result(inserted_id=ObjectId())
+
+class _Database:
+    def __init__(self):
+        self.calls = Counter()
+        self.collections = {
+            "restaurants": _Collection("restaurants", RESTAURANT, self.calls),
+            "capacity_ledger": _Collection("capacity_ledger", LEDGER, self.calls),
+            "reservations": _Collection("reservations", None, self.calls)
+        }
+
+    def __getitem__(self, name: str) -> _Collection:
+        if name not in self.collections:
+            raise AssertionError(f"unexpected collection {name}")
+        return self.collections[name]
+
+    __getattr__ = __getitem__
+
+@pytest.fixture
+def db(monkeypatch):
+    db = _Database()
+    monkeypatch.setattr(reservation_service, "Restaurant_db", db)
+    return db
+
+def _reads(calls: Counter) -> int:
+    return sum(count for call, count in calls.items() if call.endswith((".find_one", ".find")))
+
+def test_check_availability_reads_restaurant_and_ledger_once(db):
+    result = asyncio.run(reservation_service.check_availability(str(RESTAURANT_ID), DATE, TIME_SLOT, 4))
+
+    assert result["available"]
+    assert db.calls == Counter({"restaurants.find_one": 1, "capacity_ledger.find_one": 1})
+
+def test_create_reservation_reuses_the_availability_reads(db):
+    booking = {
+        "restaurant_id": str(RESTAURANT_ID),
+        "customer_name": "Round Trip",
+        "customer_phone": "5550100",
+        "date": DATE,
+        "time_slot": TIME_SLOT,
+        "number_of_guests": 4,
+        "seating_area_id": AREA_ID
+    }
+    result = asyncio.run(reservation_service.create_reservation(booking, "guest@example.com"))
+
+    assert result is not None
+    assert _reads(db.calls) == 2
+    assert db.calls["capacity_ledger.update_one"] == 1
+    assert db.calls["reservations.insert_one"] == 1
+    assert sum(db.calls.values()) == 4
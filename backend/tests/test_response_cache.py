@@ -0,0 +1,39 @@
+# tests/test_response_cache.py
+"""The discovery response cache stays within its byte budget and keys requests unambiguously"""
+
+from starlette.requests import Request
+
+from utils.response_cache import ResponseCache, cache_key
+
+def _request(query_string: bytes) -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/customers/restaurants", "query_string": query_string, "headers": []})
+
+def test_least_recently_used_entries_go_once_the_bytes_run_out():
+    cache = ResponseCache(max_entries=100, max_bytes=3000)
+    for key in ("a", "b", "c"):
+        cache.set(key, 60, None, 200, {}, b"x" * 900)
+    cache.get("a")
+
+    cache.set("d", 60, None, 200, {}, b"x" * 900)
+
+    assert cache.get("b") is None
+    assert all(cache.get(key) for key in ("a", "c", "d"))
+    assert cache.size <= 3000
+
+def test_replacing_and_dropping_entries_keeps_the_size_in_step():
+    cache = ResponseCache(max_entries=100, max_bytes=10_000)
+    cache.set("a", 60, "r1", 200, {"etag": '"1"'}, b"x" * 500)
+    cache.set("a", 60, "r1", 200, {"etag": '"2"'}, b"x" * 100)
+    cache.set("b", 60, None, 200, {}, b"x" * 100)
+
+    cache.invalidate_restaurant("r1")
+
+    assert len(cache) == 0
+    assert cache.size == 0
+
+def test_values_containing_separators_get_their_own_key():
+    split = cache_key(_request(b"city=a&cuisine=b"))
+    joined = cache_key(_request(b"city=a%26cuisine%3Db"))
+
+    assert split != joined
+    assert cache_key(_request(b"cuisine=b&city=a")) == split
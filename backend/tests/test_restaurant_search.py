@@ -0,0 +1,89 @@
+# tests/test_restaurant_search.py
+"""
+Availability search across restaurants keeps a restaurant only if the party can be given tables
+there, by the same rules as a single restaurant's availability check.
+"""
+
+import asyncio
+
+from services import customer_restaurant_service, reservation_service
+from shared import schedule
+
+DATE = "2030-06-14"
+AREA_ID = "main"
+
+def _restaurant(name: str, opens: str) -> dict:
+    hours = {
+        day: {"open": opens, "close": "22:00", "closed": False}
+        for day in schedule.DAYS
+    }
+    return {
+        "restaurant_name": name,
+        "is_onboarded": True,
+        "hours": hours,
+        "open_intervals": schedule.compile_open_intervals(hours),
+        "seating_config": {
+            "total_capacity": 4,
+            "dining_duration": 60,
+            "seating_areas": [
+                {"id": AREA_ID, "area_name": "Main", "area_capacity": 4, "seats_per_table": 2, "number_of_tables": 2}
+            ]
+        }
+    }
+
+async def _search(db, *restaurants: dict, booked_guests: int = 1):
+    ids = [str((await db.restaurants.insert_one(restaurant)).inserted_id) for restaurant in restaurants]
+    # The last restaurant has one of its two tables taken
+    assert await reservation_service.create_reservation({
+        "restaurant_id": ids[-1],
+        "customer_name": "Guest",
+        "customer_phone": "5550100",
+        "date": DATE,
+        "time_slot": "19:00",
+        "number_of_guests": booked_guests,
+        "seating_area_id": AREA_ID
+    }, "guest@example.com")
+    return await customer_restaurant_service.get_restaurants(date=DATE, time_slot="19:00", party_size=3)
+
+def test_search_needs_free_tables_not_free_seats(restaurant_db):
+    summaries, next_cursor = asyncio.run(_search(
+        restaurant_db,
+        # Hours saved without a leading zero are still open at 19:00
+        _restaurant("Early Bistro", "9:00"),
+        # Three seats are left, but only one 2-top table
+        _restaurant("Booked Bistro", "09:00")
+    ))
+
+    assert [summary["name"] for summary in summaries] == ["Early Bistro"]
+    assert next_cursor is None
+    assert summaries[0]["availableSeatingAreas"][0]["available_tables"] == 2
+    assert summaries[0]["availableSeatingAreas"][0]["remaining_capacity"] == 4
+
+def test_booked_out_restaurants_do_not_shorten_the_page(restaurant_db, monkeypatch):
+    async def run():
+        await restaurant_db.restaurants.insert_one(_restaurant("Booked Bistro", "09:00"))
+        first = await restaurant_db.restaurants.find_one({})
+        await reservation_service.create_reservation({
+            "restaurant_id": str(first["_id"]),
+            "customer_name": "Guest",
+            "customer_phone": "5550100",
+            "date": DATE,
+            "time_slot": "19:00",
+            "number_of_guests": 4,
+            "seating_area_id": AREA_ID
+        }, "guest@example.com")
+        for name in ("Second Bistro", "Third Bistro"):
+            await restaurant_db.restaurants.insert_one(_restaurant(name, "09:00"))
+
+        page, cursor = await customer_restaurant_service.get_restaurants(
+            date=DATE, time_slot="19:00", party_size=3, limit=1
+        )
+        rest, _ = await customer_restaurant_service.get_restaurants(
+            date=DATE, time_slot="19:00", party_size=3, limit=1, after=cursor
+        )
+        return page, rest
+
+    page, rest = asyncio.run(run())
+
+    assert [summary["name"] for summary in page] == ["Second Bistro"]
+    assert [summary["name"] for summary in rest] == ["Third Bistro"]
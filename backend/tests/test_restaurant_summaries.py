@@ -0,0 +1,34 @@
+# tests/test_restaurant_summaries.py
+"""Listing summaries take their active deals from the deal windows stored with the promos"""
+
+from services import customer_restaurant_service
+from shared.deals import compile_deal_windows
+
+def _promo(promo_id: str, start: str, end: str) -> dict:
+    return {
+        "id": promo_id,
+        "title": f"Deal {promo_id}",
+        "discount_type": "percentage",
+        "discount_value": 10,
+        "start_date": start,
+        "end_date": end,
+        "is_active": True
+    }
+
+def test_summary_deals_come_from_the_deal_windows():
+    promos = [_promo("current", "2030-06-01", "2030-06-30"), _promo("expired", "2030-05-01", "2030-05-31")]
+    restaurant = {"_id": "r1", "restaurant_name": "Deal Bistro", "promos": promos, "deal_windows": compile_deal_windows(promos)}
+
+    summary = customer_restaurant_service._format_restaurant_summary(restaurant, "2030-06-14")
+
+    assert [deal["id"] for deal in summary["activeDeals"]] == ["current"]
+    assert summary["activeDeals"][0]["title"] == "Deal current"
+
+def test_promos_without_a_window_are_not_listed():
+    # Windows only exist for promos with valid dates, so a malformed promo has none
+    promos = [{**_promo("broken", "2030-06-01", "2030-06-30"), "end_date": "soon"}]
+    restaurant = {"_id": "r1", "restaurant_name": "Deal Bistro", "promos": promos, "deal_windows": compile_deal_windows(promos)}
+
+    summary = customer_restaurant_service._format_restaurant_summary(restaurant, "2030-06-14")
+
+    assert "activeDeals" not in summary
@@ -0,0 +1,94 @@
+# tests/test_waitlist.py
+"""
+Joining the waitlist races releases: tables given back between the full-slot check and the
+insert must still reach the new entry, and an entry being promoted can't expire mid-promotion.
+"""
+
+import asyncio
+from datetime import datetime
+
+from services import reservation_service
+from shared import reservations, waitlist
+
+DATE = "2030-06-14"
+AREA_ID = "main"
+
+RESTAURANT = {
+    "restaurant_name": "Waitlist Bistro",
+    "hours": {
+        day: {"open": "11:00", "close": "22:00", "closed": False}
+        for day in ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+    },
+    "seating_config": {
+        "total_capacity": 4,
+        "dining_duration": 60,
+        "seating_areas": [
+            {"id": AREA_ID, "area_name": "Main", "area_capacity": 4, "seats_per_table": 2, "number_of_tables": 2}
+        ]
+    }
+}
+
+def _details(restaurant_id: str, name: str) -> dict:
+    return {
+        "restaurant_id": restaurant_id,
+        "customer_name": name,
+        "customer_phone": "5550100",
+        "date": DATE,
+        "time_slot": "19:00",
+        "number_of_guests": 4,
+        "seating_area_id": AREA_ID
+    }
+
+async def _full_slot(db):
+    restaurant_id = str((await db.restaurants.insert_one(dict(RESTAURANT))).inserted_id)
+    booking = await reservation_service.create_reservation(_details(restaurant_id, "First"), "first@example.com")
+    assert booking is not None
+    return restaurant_id, await db.reservations.find_one({})
+
+def test_release_before_the_entry_is_inserted_still_promotes_it(restaurant_db, monkeypatch):
+    async def run():
+        restaurant_id, booking = await _full_slot(restaurant_db)
+        collection = type(restaurant_db.waitlist)
+        insert_one = collection.insert_one
+
+        # The booking is cancelled after the slot was found full, before the entry exists
+        async def cancel_first(self, *args, **kwargs):
+            if self.name == waitlist.WAITLIST_COLLECTION:
+                await reservations.cancel_reservation(restaurant_db, booking)
+            return await insert_one(self, *args, **kwargs)
+
+        monkeypatch.setattr(collection, "insert_one", cancel_first)
+        joined = await reservation_service.join_waitlist(_details(restaurant_id, "Second"), "second@example.com")
+        promoted = await restaurant_db.reservations.find_one({"customer_email": "second@example.com"})
+        return joined, promoted
+
+    joined, promoted = asyncio.run(run())
+
+    assert joined["entry"]["status"] == waitlist.PROMOTED
+    assert promoted is not None
+    assert joined["entry"]["reservation_id"] == str(promoted["_id"])
+
+def test_claimed_entry_outlives_its_ttl_during_promotion(restaurant_db, monkeypatch):
+    async def run():
+        restaurant_id, booking = await _full_slot(restaurant_db)
+        joined = await reservation_service.join_waitlist(_details(restaurant_id, "Second"), "second@example.com")
+        assert joined["entry"]["status"] == waitlist.WAITING
+
+        # An entry whose slot is about to start, so its TTL is about to run out
+        await restaurant_db.waitlist.update_one({}, {"$set": {"expires_at": datetime.utcnow()}})
+
+        book_reservation = reservations.book_reservation
+        during = {}
+
+        async def capture(db, *args, **kwargs):
+            during.update(await db.waitlist.find_one({}))
+            return await book_reservation(db, *args, **kwargs)
+
+        monkeypatch.setattr(reservations, "book_reservation", capture)
+        await reservations.cancel_reservation(restaurant_db, booking)
+        return during
+
+    during = asyncio.run(run())
+
+    assert during["status"] == waitlist.PROMOTING
+    assert during["expires_at"] > datetime.utcnow() + waitlist.PROMOTION_GRACE / 2
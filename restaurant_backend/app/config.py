@@ -1,7 +1,13 @@
 # app/config.py
 import os
+import sys
 from dotenv import load_dotenv
 
+# Make the repo-level shared package (schedule engine used by both backends) importable
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+
 load_dotenv()
 
 # MongoDB Configuration
@@ -13,6 +19,11 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 7 days
 
+# Geocoding (address -> coordinates for nearby search); any Nominatim-compatible search endpoint
+GEOCODER_URL = os.getenv("GEOCODER_URL", "https://nominatim.openstreetmap.org/search")
+GEOCODER_USER_AGENT = os.getenv("GEOCODER_USER_AGENT", "TableTreats/1.0")
+GEOCODER_TIMEOUT_SECONDS = float(os.getenv("GEOCODER_TIMEOUT_SECONDS", "5"))
+
 # File Upload Configuration
 UPLOAD_DIR = "uploads"
 MAX_FILE_SIZE = 20 * 1024 * 1024  # 10MB
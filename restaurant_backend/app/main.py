@@ -11,6 +11,8 @@ from fastapi.staticfiles import StaticFiles
 import os
 
 from app.routers import restaurant_router, reservation_router
+from app.services.schedule_service import backfill_schedule_fields
+from app.services.promo_service import backfill_deal_windows
 #from app.routers.reservation_router import router as reservation_router
 
 app = FastAPI(title="TableTreats Restaurant API")
@@ -22,6 +24,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 # # Create uploads directory if it doesn't exist
@@ -34,6 +37,12 @@ app.add_middleware(
 app.include_router(restaurant_router.router, prefix="/api", tags=["Restaurant"])
 app.include_router(reservation_router.router, prefix="/api", tags=["Reservations"])
 
+@app.on_event("startup")
+async def startup():
+    """Backfill precompiled fields for restaurants saved before they existed"""
+    await backfill_schedule_fields()
+    await backfill_deal_windows()
+
 @app.get("/")
 def root():
     return {"message": "TableTreats Restaurant API is running!"}
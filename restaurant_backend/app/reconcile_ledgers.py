@@ -0,0 +1,49 @@
+# app/reconcile_ledgers.py
+
+"""
+Capacity ledger reconciliation job.
+Recomputes every restaurant's capacity ledgers for a date range from the reservations collection
+and fixes any drift. Run from restaurant_backend/:
+
+    python -m app.reconcile_ledgers 2025-01-01 2025-01-31 [--dry-run]
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+
+from app.database import db
+from shared.deals import DATE_FORMAT
+from shared.reconcile import reconcile_ledgers
+
+def _date(value: str) -> str:
+    try:
+        datetime.strptime(value, DATE_FORMAT)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{value} is not a YYYY-MM-DD date")
+    return value
+
+async def main(start_date: str, end_date: str, dry_run: bool) -> None:
+    report = await reconcile_ledgers(db, start_date, end_date, dry_run)
+
+    for drift in report["drift"]:
+        print(f"{drift['restaurant_id']} {drift['date']}: {len(drift['steps'])} steps drifted ({', '.join(drift['steps'])})")
+
+    if dry_run:
+        print(f"Checked {report['ledgers_checked']} ledgers from {start_date} to {end_date}: {len(report['drift'])} drifted (dry run, nothing written)")
+        return
+
+    print(
+        f"Checked {report['ledgers_checked']} ledgers from {start_date} to {end_date}: "
+        f"{len(report['drift'])} drifted, fixed {report['ledgers_fixed']}, "
+        f"skipped {report['ledgers_skipped']} (booked while reconciling; re-run to pick them up)"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute capacity ledgers from reservations")
+    parser.add_argument("start_date", type=_date)
+    parser.add_argument("end_date", type=_date)
+    parser.add_argument("--dry-run", action="store_true", help="Report drift without writing")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.start_date, args.end_date, args.dry_run))
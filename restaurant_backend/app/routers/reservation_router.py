@@ -13,6 +13,8 @@ import uuid
 
 from app.database import db
 from app.services.auth import get_current_restaurant
+from shared.schedule import local_now, local_today
+from shared.reservations import cancel_reservation
 
 router = APIRouter()
 
@@ -110,7 +112,7 @@ async def get_todays_reservations(current_user: dict = Depends(get_current_resta
         raise HTTPException(status_code=404, detail="Restaurant not found")
     
     restaurant_id = str(restaurant["_id"])
-    today = datetime.now().strftime("%Y-%m-%d")
+    today = local_today(restaurant.get("timezone"))
     
     reservations = await db.reservations.find({
         "restaurant_id": restaurant_id,
@@ -231,10 +233,9 @@ async def cancel_reservation_by_restaurant(
     if reason:
         update_data["cancellation_reason"] = reason
     
-    await db.reservations.update_one(
-        {"_id": ObjectId(reservation_id)},
-        {"$set": update_data}
-    )
+    # Releases the tables and promotes the waitlist, unless a concurrent cancel got there first
+    if not await cancel_reservation(db, reservation, update_data):
+        raise HTTPException(status_code=400, detail="Reservation already cancelled")
     
     return {
         "message": "Reservation cancelled successfully",
@@ -250,7 +251,7 @@ async def get_dashboard_stats(current_user: dict = Depends(get_current_restauran
         raise HTTPException(status_code=404, detail="Restaurant not found")
     
     restaurant_id = str(restaurant["_id"])
-    today = datetime.now().strftime("%Y-%m-%d")
+    today = local_today(restaurant.get("timezone"))
     
     today_count = await db.reservations.count_documents({
         "restaurant_id": restaurant_id,
@@ -258,8 +259,9 @@ async def get_dashboard_stats(current_user: dict = Depends(get_current_restauran
         "status": "confirmed"
     })
     
-    week_start = (datetime.now() - timedelta(days=datetime.now().weekday())).strftime("%Y-%m-%d")
-    week_end = (datetime.now() + timedelta(days=6-datetime.now().weekday())).strftime("%Y-%m-%d")
+    now = local_now(restaurant.get("timezone"))
+    week_start = (now - timedelta(days=now.weekday())).strftime("%Y-%m-%d")
+    week_end = (now + timedelta(days=6-now.weekday())).strftime("%Y-%m-%d")
     
     week_reservations = await db.reservations.find({
         "restaurant_id": restaurant_id,
@@ -394,7 +396,7 @@ async def get_todays_checkin_status(current_user: dict = Depends(get_current_res
         raise HTTPException(status_code=404, detail="Restaurant not found")
     
     restaurant_id = str(restaurant["_id"])
-    today = datetime.now().strftime("%Y-%m-%d")
+    today = local_today(restaurant.get("timezone"))
     
     reservations = await db.reservations.find({
         "restaurant_id": restaurant_id,
@@ -449,7 +451,7 @@ async def get_checked_in_customers_for_billing(
         raise HTTPException(status_code=404, detail="Restaurant not found")
     
     restaurant_id = str(restaurant["_id"])
-    today = datetime.now().strftime("%Y-%m-%d")
+    today = local_today(restaurant.get("timezone"))
     
     # Get checked-in reservations without bills
     reservations = await db.reservations.find({
@@ -1,7 +1,7 @@
 # app/routers/restaurant_router.py
-from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form, Depends
+from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form, Depends, Request, Response
 from fastapi.responses import StreamingResponse
-from typing import List, Optional
+from typing import Any, Callable, List, Optional
 from app.schemas.seating_schema import SeatingConfigUpdate, SeatingConfigResponse, SeatingAreaResponse
 from app.schemas.promo_schema import PromoCreate, PromoUpdate, PromoResponse, PromoListResponse
 import uuid
@@ -26,6 +26,14 @@ from app.services.restaurant_service import (
     get_image_from_gridfs,
     delete_image_from_gridfs
 )
+from app.services.geocoding_service import resolve_location
+from shared.schedule import (
+    DEFAULT_TIMEZONE, OCCUPANCY_STEP, compile_open_intervals, is_valid_timezone, local_today,
+    slot_interval, dining_duration
+)
+from shared.versioning import bump_version, restaurant_etag, etag_matches
+from shared.deals import compile_deal_windows
+from shared.ledger import refresh_layout
 
 router = APIRouter()
 
@@ -49,6 +57,12 @@ async def restaurant_signup(payload: RestaurantSignup):
         "address": payload.address,
         "role": "restaurant",
         "is_onboarded": False,
+        # Rating aggregate, maintained by the customer backend as reviews arrive
+        "rating_sum": 0,
+        "rating_count": 0,
+        "rating_avg": 0,
+        # Incremented by every write; drives ETags for conditional GETs
+        "version": 1,
         "created_at": datetime.utcnow()
     }
     
@@ -103,6 +117,9 @@ async def complete_profile(
     cuisine: str = Form(...),
     features: str = Form(...),
     hours: str = Form(...),
+    timezone: str = Form(DEFAULT_TIMEZONE, description="IANA time zone the hours are in, e.g. America/New_York"),
+    latitude: Optional[float] = Form(None, description="Overrides geocoding the address"),
+    longitude: Optional[float] = Form(None, description="Overrides geocoding the address"),
     total_capacity: int = Form(50, description="Total seating capacity per time slot"),
     thumbnail: Optional[UploadFile] = File(None),
     ambiance_photo_0: Optional[UploadFile] = File(None),
@@ -128,6 +145,9 @@ async def complete_profile(
     if total_capacity < 1 or total_capacity > 500:
         raise HTTPException(status_code=400, detail="Total capacity must be between 1 and 500")
     
+    if not is_valid_timezone(timezone):
+        raise HTTPException(status_code=400, detail="Invalid time zone")
+    
     try:
         cuisines_list = json.loads(cuisine)
         features_list = json.loads(features)
@@ -135,6 +155,11 @@ async def complete_profile(
     except json.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid JSON format in cuisine, features, or hours")
     
+    try:
+        location = await resolve_location(latitude, longitude, address, city, zipcode)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     thumbnail_id = None
     if thumbnail:
         thumbnail_id = await upload_image_to_gridfs(
@@ -179,11 +204,15 @@ async def complete_profile(
         "cuisines": cuisines_list,
         "features": features_list,
         "hours": hours_dict,
+        "open_intervals": compile_open_intervals(hours_dict),
+        "timezone": timezone,
         "seating_config": seating_config,
         "is_onboarded": True,
         "updated_at": datetime.utcnow()
     }
     
+    if location:
+        update_data["location"] = location
     if thumbnail_id:
         update_data["thumbnail_id"] = thumbnail_id
     if ambiance_photo_ids:
@@ -193,7 +222,7 @@ async def complete_profile(
     
     await db.restaurants.update_one(
         {"_id": ObjectId(restaurant_id)},
-        {"$set": update_data}
+        bump_version({"$set": update_data})
     )
     
     return {
@@ -204,8 +233,21 @@ async def complete_profile(
 
 
 @router.get("/restaurant/me")
-async def get_restaurant_profile(current_user: dict = Depends(get_current_restaurant)):
-    """Get current restaurant profile (Protected route)"""
+async def get_restaurant_profile(
+    request: Request,
+    response: Response,
+    current_user: dict = Depends(get_current_restaurant)
+):
+    """Get current restaurant profile (Protected route, supports If-None-Match)"""
+    
+    # Conditional GET: compare the version alone before reading and formatting the whole document
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        current = await db.restaurants.find_one({"email": current_user["email"]}, {"version": 1})
+        if current:
+            etag = restaurant_etag(str(current["_id"]), current.get("version"))
+            if etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
     
     # Get restaurant from database
     restaurant = await db.restaurants.find_one({"email": current_user["email"]})
@@ -215,6 +257,8 @@ async def get_restaurant_profile(current_user: dict = Depends(get_current_restau
     # Convert ObjectId to string
     restaurant["id"] = str(restaurant["_id"])
     restaurant_id = restaurant["id"]
+    response.headers["ETag"] = restaurant_etag(restaurant_id, restaurant.get("version"))
+    response.headers["Cache-Control"] = "private, no-cache"
     del restaurant["_id"]
     del restaurant["password"]  # Don't send password
     
@@ -257,8 +301,9 @@ async def get_restaurant_profile(current_user: dict = Depends(get_current_restau
         "cuisine": restaurant.get("cuisines", []),
         "features": restaurant.get("features", []),
         "hours": restaurant.get("hours", {}),
-        "rating": 4.8,  # Mock data - replace with actual ratings later
-        "totalReviews": 324  # Mock data - replace with actual reviews later
+        "timezone": restaurant.get("timezone", DEFAULT_TIMEZONE),
+        "rating": round(restaurant.get("rating_avg") or 0, 1),
+        "totalReviews": restaurant.get("rating_count", 0)
     }
 
 
@@ -314,22 +359,22 @@ async def delete_restaurant_image(
     
     if success:
         # Remove from restaurant document
-        await db.restaurants.update_one(
-            {"_id": restaurant["_id"]},
-            {
-                "$pull": {
-                    "ambiance_photo_ids": file_id,
-                    "menu_photo_ids": file_id
-                }
-            }
-        )
+        image_update = {
+            "$pull": {
+                "ambiance_photo_ids": file_id,
+                "menu_photo_ids": file_id
+            },
+            "$set": {"updated_at": datetime.utcnow()}
+        }
         
         # If it was the thumbnail, unset it
         if restaurant.get("thumbnail_id") == file_id:
-            await db.restaurants.update_one(
-                {"_id": restaurant["_id"]},
-                {"$unset": {"thumbnail_id": ""}}
-            )
+            image_update["$unset"] = {"thumbnail_id": ""}
+        
+        await db.restaurants.update_one(
+            {"_id": restaurant["_id"]},
+            bump_version(image_update)
+        )
         
         return {"message": "Image deleted successfully"}
     else:
@@ -347,6 +392,9 @@ async def update_restaurant_profile(
     cuisine: Optional[str] = Form(None),
     features: Optional[str] = Form(None),
     hours: Optional[str] = Form(None),
+    timezone: Optional[str] = Form(None),
+    latitude: Optional[float] = Form(None),
+    longitude: Optional[float] = Form(None),
     thumbnail: Optional[UploadFile] = File(None),
     ambiance_photo_0: Optional[UploadFile] = File(None),
     ambiance_photo_1: Optional[UploadFile] = File(None),
@@ -402,6 +450,38 @@ async def update_restaurant_profile(
             update_data["hours"] = json.loads(hours)
         except json.JSONDecodeError:
             raise HTTPException(status_code=400, detail="Invalid JSON format in hours")
+        
+        # Keep the precompiled schedule used by "open now" queries in step with the hours
+        update_data["open_intervals"] = compile_open_intervals(update_data["hours"])
+    
+    if timezone:
+        if not is_valid_timezone(timezone):
+            raise HTTPException(status_code=400, detail="Invalid time zone")
+        update_data["timezone"] = timezone
+    
+    unset_fields = {}
+    
+    # Re-pin the restaurant when coordinates are given or any part of the address changed
+    if latitude is not None or longitude is not None or address or city or zipcode:
+        try:
+            location = await resolve_location(
+                latitude,
+                longitude,
+                address or restaurant.get("address", ""),
+                city or restaurant.get("city", ""),
+                zipcode or restaurant.get("zipcode", "")
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        if location:
+            update_data["location"] = location
+        elif any(
+            value and value != restaurant.get(field)
+            for field, value in (("address", address), ("city", city), ("zipcode", zipcode))
+        ):
+            # The old pin is for the old address; leave nearby results until the new one is geocoded
+            unset_fields["location"] = ""
     
     # Upload new thumbnail if provided (delete old one first)
     if thumbnail:
@@ -449,10 +529,14 @@ async def update_restaurant_profile(
         existing_menu = restaurant.get("menu_photo_ids", [])
         update_data["menu_photo_ids"] = existing_menu + new_menu_ids
     
+    update = {"$set": update_data}
+    if unset_fields:
+        update["$unset"] = unset_fields
+    
     # Update restaurant
     await db.restaurants.update_one(
         {"_id": restaurant["_id"]},
-        {"$set": update_data}
+        bump_version(update)
     )
     
     return {
@@ -501,7 +585,9 @@ async def get_seating_config(current_user: dict = Depends(get_current_restaurant
         "seating_areas": formatted_areas,
         "advance_booking_days": seating_config.get("advance_booking_days", 7),
         "min_party_size": seating_config.get("min_party_size", 1),
-        "max_party_size": seating_config.get("max_party_size", 10)
+        "max_party_size": seating_config.get("max_party_size", 10),
+        "slot_interval": slot_interval(seating_config),
+        "dining_duration": dining_duration(seating_config)
     }
 
 
@@ -544,6 +630,14 @@ async def update_seating_config(
     if total_capacity > 1000:
         raise HTTPException(status_code=400, detail="Total capacity cannot exceed 1000")
     
+    # Occupancy is tracked in fixed steps, so both settings must line up with them
+    for setting in (payload.slot_interval, payload.dining_duration):
+        if setting is not None and setting % OCCUPANCY_STEP != 0:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Slot interval and dining duration must be multiples of {OCCUPANCY_STEP} minutes"
+            )
+    
     # Get existing config to preserve other settings
     existing_config = restaurant.get("seating_config", {})
     
@@ -553,18 +647,23 @@ async def update_seating_config(
         "seating_areas": processed_areas,
         "advance_booking_days": existing_config.get("advance_booking_days", 7),
         "min_party_size": existing_config.get("min_party_size", 1),
-        "max_party_size": existing_config.get("max_party_size", 10)
+        "max_party_size": existing_config.get("max_party_size", 10),
+        "slot_interval": payload.slot_interval or slot_interval(existing_config),
+        "dining_duration": payload.dining_duration or dining_duration(existing_config)
     }
     
     # Update in database
     await db.restaurants.update_one(
         {"_id": restaurant["_id"]},
-        {"$set": {
+        bump_version({"$set": {
             "seating_config": updated_config,
             "updated_at": datetime.utcnow()
-        }}
+        }})
     )
     
+    # Bookable dates from today on are checked against the new areas
+    await refresh_layout(db, str(restaurant["_id"]), local_today(restaurant.get("timezone")), updated_config)
+    
     return {
         "message": "Seating configuration updated successfully",
         "restaurant_id": str(restaurant["_id"]),
@@ -605,12 +704,14 @@ async def delete_seating_area(
     
     await db.restaurants.update_one(
         {"_id": restaurant["_id"]},
-        {"$set": {
+        bump_version({"$set": {
             "seating_config": seating_config,
             "updated_at": datetime.utcnow()
-        }}
+        }})
     )
     
+    await refresh_layout(db, str(restaurant["_id"]), local_today(restaurant.get("timezone")), seating_config)
+    
     return {
         "message": "Seating area deleted successfully",
         "deleted_area_id": area_id,
@@ -618,16 +719,48 @@ async def delete_seating_area(
         "new_total_capacity": total_capacity
     }
 
+# Attempts at a promo write when other writes to the restaurant keep landing first
+PROMO_WRITE_ATTEMPTS = 5
+
+async def _write_promos(email: str, change: Callable[[List[dict]], Any]) -> Any:
+    """
+    Apply change to a restaurant's promos and store them with their compiled deal windows.
+    change edits the list in place (or raises HTTPException) and its result is returned.
+    The write only lands if the restaurant's version is still the one read, so overlapping
+    promo edits can't drop each other or leave deal_windows out of step with promos; on a
+    conflict the restaurant is read again and change re-applied.
+    """
+    for _ in range(PROMO_WRITE_ATTEMPTS):
+        restaurant = await db.restaurants.find_one({"email": email}, {"promos": 1, "version": 1})
+        if not restaurant:
+            raise HTTPException(status_code=404, detail="Restaurant not found")
+        
+        promos = restaurant.get("promos", [])
+        result = change(promos)
+        
+        # Restaurants not written since versioning was added have no version yet
+        read_version = {"version": restaurant["version"]} if "version" in restaurant else {"version": {"$exists": False}}
+        written = await db.restaurants.update_one(
+            {"_id": restaurant["_id"], **read_version},
+            bump_version({
+                "$set": {
+                    "promos": promos,
+                    "deal_windows": compile_deal_windows(promos),
+                    "updated_at": datetime.utcnow()
+                }
+            })
+        )
+        if written.matched_count:
+            return result
+    
+    raise HTTPException(status_code=409, detail="Restaurant was updated at the same time, please try again")
+
 @router.post("/restaurant/promos", status_code=status.HTTP_201_CREATED)
 async def create_promo(
     payload: PromoCreate,
     current_user: dict = Depends(get_current_restaurant)
 ):
     """Create a new promo/offer for the restaurant"""
-    restaurant = await db.restaurants.find_one({"email": current_user["email"]})
-    if not restaurant:
-        raise HTTPException(status_code=404, detail="Restaurant not found")
-    
     # Create promo data
     promo_data = {
         "id": str(uuid.uuid4()),
@@ -646,13 +779,7 @@ async def create_promo(
     }
     
     # Add promo to restaurant's promos array
-    await db.restaurants.update_one(
-        {"_id": restaurant["_id"]},
-        {
-            "$push": {"promos": promo_data},
-            "$set": {"updated_at": datetime.utcnow()}
-        }
-    )
+    await _write_promos(current_user["email"], lambda promos: promos.append(promo_data))
     
     return {
         "message": "Promo created successfully",
@@ -718,55 +845,38 @@ async def update_promo(
     current_user: dict = Depends(get_current_restaurant)
 ):
     """Update an existing promo"""
-    restaurant = await db.restaurants.find_one({"email": current_user["email"]})
-    if not restaurant:
-        raise HTTPException(status_code=404, detail="Restaurant not found")
-    
-    # Find promo in array
-    promos = restaurant.get("promos", [])
-    promo_index = next((i for i, p in enumerate(promos) if p["id"] == promo_id), None)
-    
-    if promo_index is None:
-        raise HTTPException(status_code=404, detail="Promo not found")
-    
-    # Build update data (only include fields that were provided)
-    promo = promos[promo_index]
-    
-    if payload.title is not None:
-        promo["title"] = payload.title
-    if payload.description is not None:
-        promo["description"] = payload.description
-    if payload.discount_type is not None:
-        promo["discount_type"] = payload.discount_type
-    if payload.discount_value is not None:
-        promo["discount_value"] = payload.discount_value
-    if payload.valid_days is not None:
-        promo["valid_days"] = payload.valid_days
-    if payload.time_start is not None:
-        promo["time_start"] = payload.time_start
-    if payload.time_end is not None:
-        promo["time_end"] = payload.time_end
-    if payload.start_date is not None:
-        promo["start_date"] = payload.start_date
-    if payload.end_date is not None:
-        promo["end_date"] = payload.end_date
-    if payload.is_active is not None:
-        promo["is_active"] = payload.is_active
-    
-    promo["updated_at"] = datetime.utcnow()
-    
-    # Update the entire promos array
-    promos[promo_index] = promo
+    def apply(promos: List[dict]) -> None:
+        # Find promo in array
+        promo = next((p for p in promos if p["id"] == promo_id), None)
+        
+        if promo is None:
+            raise HTTPException(status_code=404, detail="Promo not found")
+        
+        # Only change fields that were provided
+        if payload.title is not None:
+            promo["title"] = payload.title
+        if payload.description is not None:
+            promo["description"] = payload.description
+        if payload.discount_type is not None:
+            promo["discount_type"] = payload.discount_type
+        if payload.discount_value is not None:
+            promo["discount_value"] = payload.discount_value
+        if payload.valid_days is not None:
+            promo["valid_days"] = payload.valid_days
+        if payload.time_start is not None:
+            promo["time_start"] = payload.time_start
+        if payload.time_end is not None:
+            promo["time_end"] = payload.time_end
+        if payload.start_date is not None:
+            promo["start_date"] = payload.start_date
+        if payload.end_date is not None:
+            promo["end_date"] = payload.end_date
+        if payload.is_active is not None:
+            promo["is_active"] = payload.is_active
+        
+        promo["updated_at"] = datetime.utcnow()
     
-    await db.restaurants.update_one(
-        {"_id": restaurant["_id"]},
-        {
-            "$set": {
-                "promos": promos,
-                "updated_at": datetime.utcnow()
-            }
-        }
-    )
+    await _write_promos(current_user["email"], apply)
     
     return {
         "message": "Promo updated successfully",
@@ -780,21 +890,13 @@ async def delete_promo(
     current_user: dict = Depends(get_current_restaurant)
 ):
     """Delete a promo"""
-    restaurant = await db.restaurants.find_one({"email": current_user["email"]})
-    if not restaurant:
-        raise HTTPException(status_code=404, detail="Restaurant not found")
+    def remove(promos: List[dict]) -> None:
+        remaining = [p for p in promos if p.get("id") != promo_id]
+        if len(remaining) == len(promos):
+            raise HTTPException(status_code=404, detail="Promo not found")
+        promos[:] = remaining
     
-    # Remove promo from array using $pull
-    result = await db.restaurants.update_one(
-        {"_id": restaurant["_id"]},
-        {
-            "$pull": {"promos": {"id": promo_id}},
-            "$set": {"updated_at": datetime.utcnow()}
-        }
-    )
-    
-    if result.modified_count == 0:
-        raise HTTPException(status_code=404, detail="Promo not found")
+    await _write_promos(current_user["email"], remove)
     
     return {
         "message": "Promo deleted successfully",
@@ -808,32 +910,18 @@ async def toggle_promo_status(
     current_user: dict = Depends(get_current_restaurant)
 ):
     """Toggle promo active/inactive status"""
-    restaurant = await db.restaurants.find_one({"email": current_user["email"]})
-    if not restaurant:
-        raise HTTPException(status_code=404, detail="Restaurant not found")
-    
-    # Find promo in array
-    promos = restaurant.get("promos", [])
-    promo_index = next((i for i, p in enumerate(promos) if p["id"] == promo_id), None)
-    
-    if promo_index is None:
-        raise HTTPException(status_code=404, detail="Promo not found")
-    
-    # Toggle status
-    promos[promo_index]["is_active"] = not promos[promo_index]["is_active"]
-    promos[promo_index]["updated_at"] = datetime.utcnow()
-    new_status = promos[promo_index]["is_active"]
+    def toggle(promos: List[dict]) -> bool:
+        # Find promo in array
+        promo = next((p for p in promos if p["id"] == promo_id), None)
+        
+        if promo is None:
+            raise HTTPException(status_code=404, detail="Promo not found")
+        
+        promo["is_active"] = not promo["is_active"]
+        promo["updated_at"] = datetime.utcnow()
+        return promo["is_active"]
     
-    # Update the entire promos array
-    await db.restaurants.update_one(
-        {"_id": restaurant["_id"]},
-        {
-            "$set": {
-                "promos": promos,
-                "updated_at": datetime.utcnow()
-            }
-        }
-    )
+    new_status = await _write_promos(current_user["email"], toggle)
     
     return {
         "message": f"Promo {'activated' if new_status else 'deactivated'} successfully",
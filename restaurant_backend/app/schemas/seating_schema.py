@@ -29,6 +29,8 @@ class SeatingArea(BaseModel):
 class SeatingConfigUpdate(BaseModel):
     """Schema for updating seating configuration"""
     seating_areas: List[SeatingArea] = Field(..., min_items=1, description="List of seating areas")
+    slot_interval: Optional[int] = Field(None, ge=15, le=120, description="Minutes between bookable time slots")
+    dining_duration: Optional[int] = Field(None, ge=15, le=360, description="Minutes a table stays occupied by one booking")
     
     @validator('seating_areas')
     def validate_seating_areas(cls, v):
@@ -55,4 +57,6 @@ class SeatingConfigResponse(BaseModel):
     seating_areas: List[SeatingAreaResponse]
     advance_booking_days: int
     min_party_size: int
-    max_party_size: int
\ No newline at end of file
+    max_party_size: int
+    slot_interval: int
+    dining_duration: int
\ No newline at end of file
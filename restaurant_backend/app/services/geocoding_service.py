@@ -0,0 +1,86 @@
+# app/services/geocoding_service.py
+
+"""
+Address geocoding.
+Resolves a restaurant's address to a GeoJSON point when the profile is saved, so customer
+"nearby" searches run against a 2dsphere index instead of sorting by city on the client.
+"""
+
+import asyncio
+import json
+import urllib.parse
+import urllib.request
+from typing import Dict, Optional
+
+from app.config import GEOCODER_URL, GEOCODER_USER_AGENT, GEOCODER_TIMEOUT_SECONDS
+
+def make_point(latitude: float, longitude: float) -> Dict:
+    """GeoJSON point (MongoDB expects [longitude, latitude])"""
+    return {"type": "Point", "coordinates": [longitude, latitude]}
+
+def is_valid_coordinate(latitude: Optional[float], longitude: Optional[float]) -> bool:
+    """Whether latitude/longitude are both given and in range"""
+    if latitude is None or longitude is None:
+        return False
+    return -90 <= latitude <= 90 and -180 <= longitude <= 180
+
+async def resolve_location(
+    latitude: Optional[float],
+    longitude: Optional[float],
+    address: str,
+    city: str = "",
+    zipcode: str = ""
+) -> Optional[Dict]:
+    """
+    Location for a restaurant profile: explicit coordinates win, otherwise the address is geocoded.
+    Raises ValueError when coordinates are given but incomplete or out of range.
+    """
+    if latitude is not None or longitude is not None:
+        if not is_valid_coordinate(latitude, longitude):
+            raise ValueError("Invalid latitude/longitude")
+        return make_point(latitude, longitude)
+
+    return await geocode_address(address, city, zipcode)
+
+async def geocode_address(address: str, city: str = "", zipcode: str = "") -> Optional[Dict]:
+    """
+    Look up an address and return a GeoJSON point, or None if it can't be resolved.
+    Geocoding never blocks saving a profile; a restaurant without a location just doesn't
+    show up in nearby searches until it is resolved.
+    """
+    query = ", ".join(part for part in (address, city, zipcode) if part)
+    if not query:
+        return None
+
+    try:
+        # urllib is blocking, so the lookup runs in a worker thread
+        result = await asyncio.to_thread(_search, query)
+    except Exception as e:
+        print(f"Error geocoding address '{query}': {e}")
+        return None
+
+    if not result:
+        return None
+
+    try:
+        latitude, longitude = float(result["lat"]), float(result["lon"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    if not is_valid_coordinate(latitude, longitude):
+        return None
+
+    return make_point(latitude, longitude)
+
+def _search(query: str) -> Optional[Dict]:
+    """Best match for a free-form address from the geocoder"""
+    params = urllib.parse.urlencode({"q": query, "format": "json", "limit": 1})
+    request = urllib.request.Request(
+        f"{GEOCODER_URL}?{params}",
+        headers={"User-Agent": GEOCODER_USER_AGENT}
+    )
+
+    with urllib.request.urlopen(request, timeout=GEOCODER_TIMEOUT_SECONDS) as response:
+        results = json.loads(response.read().decode("utf-8"))
+
+    return results[0] if results else None
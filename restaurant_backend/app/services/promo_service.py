@@ -0,0 +1,30 @@
+# app/services/promo_service.py
+
+"""
+Promo persistence.
+Deal window rules live in shared/deals.py; this module keeps the stored `deal_windows`
+field in step with each restaurant's promos.
+"""
+
+from datetime import datetime
+
+from app.database import db
+from shared.deals import compile_deal_windows
+from shared.versioning import bump_version
+
+async def backfill_deal_windows() -> int:
+    """Compile deal windows for restaurants whose promos were saved before they were stored; returns the count updated"""
+    updated = 0
+    cursor = db.restaurants.find({"deal_windows": {"$exists": False}}, {"promos": 1})
+
+    async for restaurant in cursor:
+        await db.restaurants.update_one(
+            {"_id": restaurant["_id"]},
+            bump_version({"$set": {
+                "deal_windows": compile_deal_windows(restaurant.get("promos")),
+                "updated_at": datetime.utcnow()
+            }})
+        )
+        updated += 1
+
+    return updated
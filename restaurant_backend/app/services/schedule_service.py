@@ -0,0 +1,39 @@
+# app/services/schedule_service.py
+
+"""
+Restaurant schedule persistence.
+Schedule rules (time zones, compiled open intervals, slots) live in shared/schedule.py so both
+backends agree; this module keeps the stored restaurant fields in step with them.
+"""
+
+from datetime import datetime
+
+from app.database import db
+from shared.schedule import DEFAULT_TIMEZONE, compile_open_intervals
+from shared.versioning import bump_version
+
+async def backfill_schedule_fields() -> int:
+    """
+    Fill in the time zone and compiled open intervals for restaurants saved before they were stored;
+    returns the count updated
+    """
+    updated = 0
+    cursor = db.restaurants.find(
+        {"$or": [
+            {"timezone": {"$exists": False}},
+            {"hours": {"$exists": True}, "open_intervals": {"$exists": False}}
+        ]},
+        {"hours": 1, "timezone": 1, "open_intervals": 1}
+    )
+
+    async for restaurant in cursor:
+        fields = {"updated_at": datetime.utcnow()}
+        if "timezone" not in restaurant:
+            fields["timezone"] = DEFAULT_TIMEZONE
+        if "hours" in restaurant and "open_intervals" not in restaurant:
+            fields["open_intervals"] = compile_open_intervals(restaurant.get("hours"))
+
+        await db.restaurants.update_one({"_id": restaurant["_id"]}, bump_version({"$set": fields}))
+        updated += 1
+
+    return updated
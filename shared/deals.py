@@ -0,0 +1,46 @@
+# shared/deals.py
+
+"""
+Precomputed deal windows shared by the customer and restaurant backends.
+Each promo write stores `deal_windows` on the restaurant: one entry per active promo with its
+date range, so "which restaurants have a deal today" is an indexed query instead of a scan over
+every restaurant's promos.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+DATE_FORMAT = "%Y-%m-%d"
+
+def compile_deal_windows(promos: Optional[List[Dict]]) -> List[Dict]:
+    """
+    Deal windows for a restaurant's promos: {"promo_id", "type", "start", "end", "days"} per active
+    promo. Dates stay "YYYY-MM-DD" strings, which compare in date order; promos without both dates
+    (or with malformed ones) are never active, the same rule the customer deal listing applies.
+    """
+    windows = []
+
+    for promo in promos or []:
+        if not promo.get("is_active"):
+            continue
+
+        start, end = promo.get("start_date"), promo.get("end_date")
+        try:
+            datetime.strptime(start, DATE_FORMAT)
+            datetime.strptime(end, DATE_FORMAT)
+        except (TypeError, ValueError):
+            continue
+
+        windows.append({
+            "promo_id": promo.get("id"),
+            "type": promo.get("discount_type"),
+            "start": start,
+            "end": end,
+            "days": promo.get("valid_days") or []
+        })
+
+    return windows
+
+def active_on(date_string: str) -> Dict:
+    """$elemMatch condition for a deal window covering a "YYYY-MM-DD" date"""
+    return {"start": {"$lte": date_string}, "end": {"$gte": date_string}}
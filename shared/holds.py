@@ -0,0 +1,62 @@
+# shared/holds.py
+
+"""
+Short-lived slot holds taken while a customer fills in the booking form.
+A hold claims tables in the capacity ledger like a booking does, for HOLD_MINUTES. Booking
+with the hold inserts a reservation that takes over its tables and marks the hold converted;
+otherwise it is released when it expires, by the customer backend's expiry scheduler. The hold
+lifecycle itself is in shared/reservations.py with the other status changes.
+
+Held documents stay around for PURGE_AFTER once they expire (a TTL index on purge_at removes
+them), so an expiry that was missed while no backend was running can still be released.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from shared.schedule import DEFAULT_TIMEZONE
+
+HOLDS_COLLECTION = "holds"
+
+HOLD_MINUTES = 5
+PURGE_AFTER = timedelta(days=1)
+# Holds a customer may have at once, so one client can't hold a whole evening
+MAX_ACTIVE_HOLDS = 3
+
+ACTIVE = "active"
+CONVERTED = "converted"
+RELEASED = "released"
+EXPIRED = "expired"
+
+# Fields a booking must match to use a hold
+SLOT_FIELDS = ("restaurant_id", "date", "time_slot", "seating_area_id", "number_of_guests")
+
+def new_hold(
+    restaurant: Dict,
+    details: Dict,
+    customer_email: str,
+    seating_area_name: str,
+    duration: int,
+    table_numbers: List[int]
+) -> Dict:
+    """An active hold on tables already claimed in the capacity ledger"""
+    now = datetime.utcnow()
+    expires_at = now + timedelta(minutes=HOLD_MINUTES)
+    return {
+        **{field: details[field] for field in SLOT_FIELDS},
+        "customer_email": customer_email,
+        # Everything the reservation needs from the restaurant, so converting reads nothing else
+        "restaurant_name": restaurant.get("restaurant_name", ""),
+        "timezone": restaurant.get("timezone", DEFAULT_TIMEZONE),
+        "seating_area_name": seating_area_name,
+        "dining_duration": duration,
+        "tables": table_numbers,
+        "status": ACTIVE,
+        "created_at": now,
+        "expires_at": expires_at,
+        "purge_at": expires_at + PURGE_AFTER
+    }
+
+def active_query(now: datetime) -> Dict:
+    """Holds that still hold their tables and haven't run out"""
+    return {"status": ACTIVE, "expires_at": {"$gt": now}}
@@ -0,0 +1,319 @@
+# shared/ledger.py
+
+"""
+Capacity ledger shared by the customer and restaurant backends.
+One document per restaurant per local date records the table layout of each seating area it
+was opened with and the guests seated per occupancy step and area:
+
+    {"_id": "<restaurant_id>:<date>", "restaurant_id", "date", "rev",
+     "layout": {area_id: {"number_of_tables", "seats_per_table"}},
+     "booked": {"HH:MM": {area_id: guests}},
+     "tables": {"HH:MM": {area_id: [table numbers]}}, ...}
+
+Steps are OCCUPANCY_STEP minutes apart, and a booking counts in every step its dining duration
+overlaps, so a table taken at 19:00 also blocks 19:30. Bookings are given concrete tables
+(shared/tables.py) from the ledger's layout, the one place a day's tables are read from
+(ledgers opened before layouts were stored fall back to the current seating config). A
+booking's write only applies while none of its tables is taken at any of its steps, so two
+bookings can never hold the same table while bookings for other tables, areas or times never
+conflict. `rev` counts writes to the ledger. A day's (or a slot's)
+availability is a single document read whose cost depends on the number of slots, not
+reservations. Functions take the database so each backend passes its own client.
+"""
+
+import asyncio
+import random
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import DuplicateKeyError
+
+from shared.schedule import LEGACY_DINING_DURATION, occupied_steps
+from shared import tables as table_allocation
+
+LEDGER_COLLECTION = "capacity_ledger"
+LEGACY_COLLECTION = "timeslots"
+
+# Extra allocation retries beyond one per table of the area: a write only fails when another booking
+# took one of its tables, so losing more often than that means guest counts moved (releases)
+RESERVE_ATTEMPTS = 5
+# Upper bound of the random pause before retrying, so parties that collided don't all re-read at once
+RETRY_JITTER_SECONDS = 0.01
+
+def ledger_id(restaurant_id: str, date: str) -> str:
+    """Ledger document _id for a restaurant and "YYYY-MM-DD" date"""
+    return f"{restaurant_id}:{date}"
+
+def layout_snapshot(seating_config: Optional[Dict]) -> Dict[str, Dict[str, int]]:
+    """Table layout per seating area id from a restaurant's seating config"""
+    layout = {}
+    for area in (seating_config or {}).get("seating_areas", []):
+        if area.get("id"):
+            number_of_tables, seats_per_table = table_allocation.area_tables(area)
+            layout[area["id"]] = {"number_of_tables": number_of_tables, "seats_per_table": seats_per_table}
+    return layout
+
+def ledger_area(ledger: Optional[Dict], area: Dict) -> Dict:
+    """A seating area with the table layout its bookings on this ledger are held to: the ledger's, else its own"""
+    layout = (ledger or {}).get("layout", {}).get(area.get("id"))
+    return {**area, **layout} if layout else area
+
+def slot_total(ledger: Optional[Dict], time_slot: str, duration: int) -> int:
+    """Most guests seated across all areas at any point of a booking at time_slot lasting duration minutes"""
+    if not ledger:
+        return 0
+
+    booked = ledger.get("booked", {})
+    return max(
+        (sum(booked.get(step, {}).values()) for step in occupied_steps(time_slot, duration)),
+        default=0
+    )
+
+async def get_ledger(db, restaurant_id: str, date: str) -> Optional[Dict]:
+    """A restaurant's ledger for one date, None if nothing was ever booked that day"""
+    return await db[LEDGER_COLLECTION].find_one({"_id": ledger_id(restaurant_id, date)})
+
+async def get_ledgers(db, restaurant_id: str, dates: Iterable[str]) -> Dict[str, Dict]:
+    """A restaurant's ledgers for several dates in one query, keyed by date"""
+    ids = [ledger_id(restaurant_id, date) for date in dates]
+    cursor = db[LEDGER_COLLECTION].find({"_id": {"$in": ids}})
+    return {ledger["date"]: ledger async for ledger in cursor}
+
+async def open_ledger(db, restaurant_id: str, date: str, seating_config: Optional[Dict]) -> None:
+    """Create a date's ledger with the current table layout, if it doesn't exist yet"""
+    now = datetime.utcnow()
+    try:
+        await db[LEDGER_COLLECTION].update_one(
+            {"_id": ledger_id(restaurant_id, date)},
+            {"$setOnInsert": {
+                "restaurant_id": restaurant_id,
+                "date": date,
+                "layout": layout_snapshot(seating_config),
+                "booked": {},
+                "tables": {},
+                "rev": 0,
+                "created_at": now,
+                "updated_at": now
+            }},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # Opened concurrently by another booking
+        pass
+
+def find_area(seating_config: Optional[Dict], seating_area_id: str) -> Optional[Dict]:
+    """A seating area from a restaurant's seating config by id"""
+    areas = (seating_config or {}).get("seating_areas", [])
+    return next((area for area in areas if area.get("id") == seating_area_id), None)
+
+def occupied_tables(ledger: Optional[Dict], time_slot: str, duration: int, area: Dict) -> int:
+    """Bitmask of an area's tables taken at any point of a booking at time_slot lasting duration minutes"""
+    if not ledger:
+        return 0
+
+    area = ledger_area(ledger, area)
+    number_of_tables, seats_per_table = table_allocation.area_tables(area)
+    return table_allocation.occupied_mask(
+        ledger.get("tables", {}),
+        ledger.get("booked", {}),
+        occupied_steps(time_slot, duration),
+        area.get("id"),
+        number_of_tables,
+        seats_per_table
+    )
+
+def allocate(ledger: Optional[Dict], time_slot: str, duration: int, area: Dict, guests: int) -> Optional[List[int]]:
+    """Adjacent table numbers a party would get in an area (best fit), None if it can't be seated"""
+    area = ledger_area(ledger, area)
+    number_of_tables, seats_per_table = table_allocation.area_tables(area)
+    return table_allocation.best_fit(
+        occupied_tables(ledger, time_slot, duration, area),
+        number_of_tables,
+        table_allocation.tables_needed(guests, seats_per_table)
+    )
+
+def table_seats(ledger: Optional[Dict], time_slot: str, duration: int, seating_config: Optional[Dict]) -> Tuple[int, int]:
+    """
+    (seats at tables free for a booking's whole window at time_slot, seats at all tables) across
+    a restaurant's areas; a party can be seated somewhere exactly when some table is free
+    """
+    free = total = 0
+    for area in (seating_config or {}).get("seating_areas", []):
+        number_of_tables, seats_per_table = table_allocation.area_tables(ledger_area(ledger, area))
+        occupied = occupied_tables(ledger, time_slot, duration, area)
+        free += table_allocation.free_tables(occupied, number_of_tables) * seats_per_table
+        total += number_of_tables * seats_per_table
+    return free, total
+
+def _untracked_guests(ledger: Dict, steps: Iterable[str], area: Dict) -> Dict[str, int]:
+    """Guests booked per step of an area, for the steps holding guests that have no table numbers"""
+    _, seats_per_table = table_allocation.area_tables(ledger_area(ledger, area))
+    untracked = {}
+    for step in steps:
+        guests = ledger.get("booked", {}).get(step, {}).get(area["id"], 0)
+        numbered = ledger.get("tables", {}).get(step, {}).get(area["id"], [])
+        if table_allocation.tables_needed(guests, seats_per_table) > len(numbered):
+            untracked[step] = guests
+    return untracked
+
+async def reserve(
+    db,
+    restaurant_id: str,
+    date: str,
+    time_slot: str,
+    seating_area_id: str,
+    guests: int,
+    duration: int,
+    seating_config: Optional[Dict],
+    ledger: Optional[Dict] = None
+) -> Optional[List[int]]:
+    """
+    Seat guests at adjacent tables of a seating area from time_slot for duration minutes;
+    returns the table numbers, or None if the party can't be seated. Tables are allocated
+    from the ledger as read, and the write only applies if none of them has been taken at any
+    of the booking's steps since, so concurrent bookings of other tables all go through; if
+    one of ours was taken the ledger is re-read and the allocation retried, until the party
+    fits or the area is full. Pass an already-loaded ledger to save the first read.
+    """
+    area = find_area(seating_config, seating_area_id)
+    steps = occupied_steps(time_slot, duration)
+    if not area or not steps:
+        return None
+
+    number_of_tables, _ = table_allocation.area_tables(ledger_area(ledger, area))
+    for _ in range(number_of_tables + RESERVE_ATTEMPTS):
+        if ledger is None:
+            ledger = await get_ledger(db, restaurant_id, date)
+        if ledger is None:
+            # The first booking of a day opens its ledger
+            await open_ledger(db, restaurant_id, date, seating_config)
+            ledger = await get_ledger(db, restaurant_id, date)
+
+        allocated = allocate(ledger, time_slot, duration, area, guests)
+        if allocated is None:
+            return None
+
+        conditions = {f"tables.{step}.{seating_area_id}": {"$nin": allocated} for step in steps}
+        # Guests booked before tables were allocated are placed on whichever tables are free, so
+        # where there are any, the step's guest count must also be the one allocated against
+        for step, booked in _untracked_guests(ledger, steps, area).items():
+            conditions[f"booked.{step}.{seating_area_id}"] = booked
+
+        result = await db[LEDGER_COLLECTION].update_one(
+            {"_id": ledger_id(restaurant_id, date), **conditions},
+            {
+                "$push": {f"tables.{step}.{seating_area_id}": {"$each": allocated} for step in steps},
+                "$inc": {
+                    **{f"booked.{step}.{seating_area_id}": guests for step in steps},
+                    "rev": 1
+                },
+                "$set": {"updated_at": datetime.utcnow()}
+            }
+        )
+        if result.modified_count:
+            return allocated
+
+        ledger = None
+        await asyncio.sleep(random.uniform(0, RETRY_JITTER_SECONDS))
+
+    return None
+
+async def release(
+    db,
+    restaurant_id: str,
+    date: str,
+    time_slot: str,
+    seating_area_id: Optional[str],
+    guests: int,
+    duration: int,
+    tables: Optional[List[int]] = None
+) -> None:
+    """
+    Give back guests (and their tables) booked with reserve; duration must match the booking's.
+    Like every ledger write this moves rev, so a reconcile that read the ledger before won't
+    write the seats back.
+    """
+    steps = occupied_steps(time_slot, duration)
+    if not steps:
+        return
+
+    update = {
+        "$inc": {
+            **{f"booked.{step}.{seating_area_id}": -guests for step in steps},
+            "rev": 1
+        },
+        "$set": {"updated_at": datetime.utcnow()}
+    }
+    if tables:
+        update["$pullAll"] = {f"tables.{step}.{seating_area_id}": tables for step in steps}
+
+    await db[LEDGER_COLLECTION].update_one({"_id": ledger_id(restaurant_id, date)}, update)
+
+async def refresh_layout(db, restaurant_id: str, from_date: str, seating_config: Optional[Dict]) -> None:
+    """Apply a changed seating config's table layout to a restaurant's ledgers from a date on"""
+    await db[LEDGER_COLLECTION].update_many(
+        {"restaurant_id": restaurant_id, "date": {"$gte": from_date}},
+        {"$set": {"layout": layout_snapshot(seating_config), "updated_at": datetime.utcnow()}}
+    )
+
+async def migrate_timeslots(db) -> int:
+    """
+    Fold per-slot, per-area timeslots documents into ledger documents; returns the number of
+    ledgers created. Dates that already have a ledger are left alone, so this is safe to re-run.
+    Table layouts are snapshotted from each restaurant's current seating config, and each old
+    booking occupies LEGACY_DINING_DURATION, the single slot it used to count against.
+    """
+    pipeline = [
+        {"$group": {
+            "_id": {"restaurant_id": "$restaurantId", "date": "$date"},
+            "slots": {"$push": {"slot": "$timeSlot", "area": "$seatingAreaId", "booked": "$booked"}}
+        }}
+    ]
+
+    seating_configs = {}
+    created = 0
+
+    async for group in db[LEGACY_COLLECTION].aggregate(pipeline):
+        restaurant_id, date = group["_id"]["restaurant_id"], group["_id"]["date"]
+        if not restaurant_id or not date:
+            continue
+
+        if restaurant_id not in seating_configs:
+            seating_configs[restaurant_id] = await _seating_config(db, restaurant_id)
+
+        booked = {}
+        for slot in group["slots"]:
+            if not slot.get("slot") or not slot.get("area") or not slot.get("booked"):
+                continue
+            for step in occupied_steps(slot["slot"], LEGACY_DINING_DURATION):
+                areas = booked.setdefault(step, {})
+                areas[slot["area"]] = areas.get(slot["area"], 0) + slot["booked"]
+
+        try:
+            result = await db[LEDGER_COLLECTION].update_one(
+                {"_id": ledger_id(restaurant_id, date)},
+                {"$setOnInsert": {
+                    "restaurant_id": restaurant_id,
+                    "date": date,
+                    "layout": layout_snapshot(seating_configs[restaurant_id]),
+                    "booked": booked,
+                    "created_at": datetime.utcnow()
+                }},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            continue
+
+        if result.upserted_id is not None:
+            created += 1
+
+    return created
+
+async def _seating_config(db, restaurant_id: str) -> Optional[Dict]:
+    try:
+        restaurant = await db.restaurants.find_one({"_id": ObjectId(restaurant_id)}, {"seating_config": 1})
+    except InvalidId:
+        return None
+    return (restaurant or {}).get("seating_config")
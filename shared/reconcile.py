@@ -0,0 +1,286 @@
+# shared/reconcile.py
+
+"""
+Capacity ledger reconciliation.
+Rebuilds what each ledger in a date range should hold from the reservations (and active holds)
+that hold tables, with one aggregation grouped per restaurant and date and bulk writes of
+the ledgers that drifted, e.g. from cancellations that never released their seats.
+
+Bookings and cancellations are two writes (shared/reservations.py): a booking claims its tables
+in the ledger, then inserts the reservation; a cancellation flips the status (stamping
+released_at), then releases the tables. Between the two the ledger and the reservations
+disagree without anything being wrong, so a day is left alone if its ledger was written
+(every ledger write sets updated_at and moves `rev`) or one of its reservations or holds was
+released within WRITE_GRACE before the run started, or any time since. The rewrite is also
+conditional on the `rev` read, so a write landing after the ledger was read isn't overwritten.
+Such days are reported as skipped and picked up by the next run.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from shared.holds import ACTIVE, HOLDS_COLLECTION
+from shared.ledger import LEDGER_COLLECTION, layout_snapshot, ledger_id
+from shared.reservations import HOLDING_STATUSES, booked_duration
+from shared.schedule import occupied_steps
+
+# Restaurant-days compared and written per bulk_write
+RECONCILE_BATCH = 500
+# Longest expected gap between the two writes of a booking or cancellation
+WRITE_GRACE = timedelta(minutes=1)
+
+def _normalize(booked: Dict, tables: Dict) -> Tuple[Dict, Dict]:
+    """booked/tables maps without zero counts, empty table lists or empty steps, table lists sorted"""
+    clean_booked = {}
+    for step, areas in (booked or {}).items():
+        counts = {area: guests for area, guests in areas.items() if guests}
+        if counts:
+            clean_booked[step] = counts
+
+    clean_tables = {}
+    for step, areas in (tables or {}).items():
+        taken = {area: sorted(numbers) for area, numbers in areas.items() if numbers}
+        if taken:
+            clean_tables[step] = taken
+
+    return clean_booked, clean_tables
+
+def _holds_tables(booking: Dict) -> bool:
+    """Whether a reservation or hold from the reconcile aggregation has tables claimed in the ledger"""
+    if booking.get("hold"):
+        return booking.get("status") == ACTIVE
+    return booking.get("status") in HOLDING_STATUSES
+
+def _releasing(bookings: Iterable[Dict], since: datetime) -> bool:
+    """Whether any reservation or hold of a day was cancelled or released since, its release maybe not yet applied"""
+    return any(booking.get("released_at") and booking["released_at"] >= since for booking in bookings)
+
+def expected_occupancy(bookings: Iterable[Dict]) -> Tuple[Dict, Dict]:
+    """The booked and tables maps a ledger should hold for one day's table-holding reservations and holds"""
+    booked = {}
+    tables = {}
+
+    bookings = list(bookings)
+    # A hold being converted still looks active once its reservation exists; they share one set of tables
+    converted = {booking["hold_id"] for booking in bookings if not booking.get("hold") and booking.get("hold_id")}
+
+    for booking in bookings:
+        if not _holds_tables(booking):
+            continue
+        if booking.get("hold") and str(booking.get("_id")) in converted:
+            continue
+
+        area = booking.get("seating_area_id")
+        if not area or not booking.get("time_slot"):
+            continue
+
+        for step in occupied_steps(booking["time_slot"], booked_duration(booking)):
+            step_booked = booked.setdefault(step, {})
+            step_booked[area] = step_booked.get(area, 0) + booking.get("number_of_guests", 0)
+            if booking.get("tables"):
+                tables.setdefault(step, {}).setdefault(area, []).extend(booking["tables"])
+
+    return _normalize(booked, tables)
+
+def _drifted_steps(recorded: Dict, expected: Tuple[Dict, Dict]) -> List[str]:
+    """Steps whose guests or tables differ between a stored ledger and the expected maps"""
+    recorded_booked, recorded_tables = _normalize(recorded.get("booked"), recorded.get("tables"))
+    expected_booked, expected_tables = expected
+
+    steps = set(recorded_booked) | set(expected_booked) | set(recorded_tables) | set(expected_tables)
+    return sorted(
+        step for step in steps
+        if recorded_booked.get(step) != expected_booked.get(step)
+        or recorded_tables.get(step) != expected_tables.get(step)
+    )
+
+async def reconcile_ledgers(db, start_date: str, end_date: str, dry_run: bool = False) -> Dict:
+    """
+    Recompute the capacity ledgers of every restaurant from start_date to end_date ("YYYY-MM-DD",
+    inclusive) and fix the ones that drifted; with dry_run the drift is only reported. Returns
+    counts and, per drifted ledger, the occupancy steps that were wrong.
+    """
+    report = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "dry_run": dry_run,
+        "ledgers_checked": 0,
+        "ledgers_fixed": 0,
+        "ledgers_skipped": 0,
+        "drift": []
+    }
+    date_range = {"$gte": start_date, "$lte": end_date}
+    # Writes after this may be half done: the ledger or the reservation written, not yet both
+    in_flight_since = datetime.utcnow() - WRITE_GRACE
+
+    pipeline = [
+        {"$match": {
+            "date": date_range,
+            "$or": [
+                {"status": {"$in": list(HOLDING_STATUSES)}},
+                # Cancellations whose release may not have reached the ledger yet
+                {"released_at": {"$gte": in_flight_since}}
+            ]
+        }},
+        # Holds claim tables the same way until they are converted or released
+        {"$unionWith": {
+            "coll": HOLDS_COLLECTION,
+            "pipeline": [
+                {"$match": {
+                    "date": date_range,
+                    "$or": [{"status": ACTIVE}, {"released_at": {"$gte": in_flight_since}}]
+                }},
+                {"$addFields": {"hold": True}}
+            ]
+        }},
+        {"$group": {
+            "_id": {"restaurant_id": "$restaurant_id", "date": "$date"},
+            "bookings": {"$push": {
+                "_id": "$_id",
+                "hold_id": "$hold_id",
+                "status": "$status",
+                "hold": "$hold",
+                "released_at": "$released_at",
+                "time_slot": "$time_slot",
+                "seating_area_id": "$seating_area_id",
+                "number_of_guests": "$number_of_guests",
+                "dining_duration": "$dining_duration",
+                "tables": "$tables"
+            }}
+        }}
+    ]
+
+    seen = set()
+    batch = []
+
+    async for group in db.reservations.aggregate(pipeline, allowDiskUse=True):
+        restaurant_id, date = group["_id"].get("restaurant_id"), group["_id"].get("date")
+        if not restaurant_id or not date:
+            continue
+
+        seen.add(ledger_id(restaurant_id, date))
+        if _releasing(group["bookings"], in_flight_since):
+            report["ledgers_checked"] += 1
+            report["ledgers_skipped"] += 1
+            continue
+
+        batch.append((restaurant_id, date, expected_occupancy(group["bookings"])))
+        if len(batch) >= RECONCILE_BATCH:
+            await _reconcile_batch(db, batch, report, dry_run, in_flight_since)
+            batch = []
+
+    # Ledgers still holding seats for days that no longer have any table-holding reservation or hold
+    cursor = db[LEDGER_COLLECTION].find(
+        {"date": date_range, "booked": {"$nin": [{}, None]}},
+        {"restaurant_id": 1, "date": 1}
+    )
+    async for orphan in cursor:
+        if orphan["_id"] in seen:
+            continue
+
+        batch.append((orphan["restaurant_id"], orphan["date"], ({}, {})))
+        if len(batch) >= RECONCILE_BATCH:
+            await _reconcile_batch(db, batch, report, dry_run, in_flight_since)
+            batch = []
+
+    if batch:
+        await _reconcile_batch(db, batch, report, dry_run, in_flight_since)
+
+    return report
+
+async def _reconcile_batch(
+    db,
+    batch: List[Tuple[str, str, Tuple[Dict, Dict]]],
+    report: Dict,
+    dry_run: bool,
+    in_flight_since: datetime
+) -> None:
+    """
+    Compare one batch of restaurant-days with their stored ledgers and bulk-write the drifted
+    ones, skipping ledgers written since in_flight_since
+    """
+    ids = [ledger_id(restaurant_id, date) for restaurant_id, date, _ in batch]
+    cursor = db[LEDGER_COLLECTION].find(
+        {"_id": {"$in": ids}},
+        {"booked": 1, "tables": 1, "rev": 1, "updated_at": 1}
+    )
+    ledgers = {ledger["_id"]: ledger async for ledger in cursor}
+
+    missing = {restaurant_id for restaurant_id, date, _ in batch if ledger_id(restaurant_id, date) not in ledgers}
+    seating_configs = await _seating_configs(db, missing) if missing and not dry_run else {}
+
+    now = datetime.utcnow()
+    operations = []
+
+    for restaurant_id, date, expected in batch:
+        report["ledgers_checked"] += 1
+        _id = ledger_id(restaurant_id, date)
+        recorded = ledgers.get(_id)
+
+        if recorded and recorded.get("updated_at") and recorded["updated_at"] >= in_flight_since:
+            report["ledgers_skipped"] += 1
+            continue
+
+        steps = _drifted_steps(recorded or {}, expected)
+        if not steps:
+            continue
+
+        report["drift"].append({"restaurant_id": restaurant_id, "date": date, "steps": steps})
+        if dry_run:
+            continue
+
+        booked, tables = expected
+        if recorded is None:
+            operations.append(UpdateOne(
+                {"_id": _id},
+                {"$setOnInsert": {
+                    "restaurant_id": restaurant_id,
+                    "date": date,
+                    "layout": layout_snapshot(seating_configs.get(restaurant_id)),
+                    "booked": booked,
+                    "tables": tables,
+                    "rev": 0,
+                    "created_at": now,
+                    "reconciled_at": now
+                }},
+                upsert=True
+            ))
+        else:
+            # Skip the ledger if a booking or release landed since it was read
+            current_rev = {"rev": recorded["rev"]} if "rev" in recorded else {"rev": {"$exists": False}}
+            operations.append(UpdateOne(
+                {"_id": _id, **current_rev},
+                {
+                    "$set": {"booked": booked, "tables": tables, "updated_at": now, "reconciled_at": now},
+                    "$inc": {"rev": 1}
+                }
+            ))
+
+    if not operations:
+        return
+
+    try:
+        result = await db[LEDGER_COLLECTION].bulk_write(operations, ordered=False)
+        fixed = result.modified_count + result.upserted_count
+    except BulkWriteError as error:
+        # Ledgers opened by a booking between the read and the upsert
+        fixed = error.details.get("nModified", 0) + error.details.get("nUpserted", 0)
+
+    report["ledgers_fixed"] += fixed
+    report["ledgers_skipped"] += len(operations) - fixed
+
+async def _seating_configs(db, restaurant_ids: Iterable[str]) -> Dict[str, Dict]:
+    object_ids = []
+    for restaurant_id in restaurant_ids:
+        try:
+            object_ids.append(ObjectId(restaurant_id))
+        except InvalidId:
+            continue
+
+    cursor = db.restaurants.find({"_id": {"$in": object_ids}}, {"seating_config": 1})
+    return {str(restaurant["_id"]): restaurant.get("seating_config") async for restaurant in cursor}
@@ -0,0 +1,370 @@
+# shared/reservations.py
+
+"""
+Reservation lifecycle shared by the customer and restaurant backends.
+Every status change that takes or gives back tables goes through here, so the capacity ledger
+moves in step with the reservations collection whichever backend makes the change:
+
+    book_reservation()   -> confirmed   claims tables in the ledger, then inserts the reservation
+    cancel_reservation() -> cancelled   flips the status once, releases its tables, promotes the waitlist
+    complete_reservation() -> completed paying the bill; only a confirmed reservation, keeps its tables
+    promote_waitlist()                  books waiting entries that fit into released tables
+    place_hold()         -> hold        claims tables for a few minutes (shared/holds.py)
+    convert_hold()       -> confirmed   inserts the reservation for a live hold, then marks the hold converted
+    release_hold()                      gives back a hold's tables (let go or expired)
+
+Completing a reservation keeps its tables, so it doesn't touch the ledger; it is conditional on
+the reservation still being confirmed, so a cancelled one (tables already released) can't come back.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from bson import ObjectId
+
+from shared import holds, ledger, waitlist
+from shared.schedule import DEFAULT_TIMEZONE, LEGACY_DINING_DURATION, dining_duration
+
+CONFIRMED = "confirmed"
+COMPLETED = "completed"
+CANCELLED = "cancelled"
+
+# Statuses whose tables are held in the capacity ledger
+HOLDING_STATUSES = (CONFIRMED, COMPLETED)
+
+def new_reservation(
+    restaurant: Dict,
+    details: Dict,
+    customer_email: str,
+    seating_area_name: str,
+    duration: int,
+    table_numbers: List[int]
+) -> Dict:
+    """
+    A confirmed reservation for a restaurant document and booking details (restaurant_id,
+    customer_name, customer_phone, date, time_slot, number_of_guests, seating_area_id,
+    special_requests) whose tables were claimed in the capacity ledger
+    """
+    return {
+        "restaurant_id": details["restaurant_id"],
+        "restaurant_name": restaurant.get("restaurant_name", ""),
+        "customer_name": details["customer_name"],
+        "customer_email": customer_email,
+        "customer_phone": details["customer_phone"],
+        "date": details["date"],
+        "time_slot": details["time_slot"],
+        "number_of_guests": details["number_of_guests"],
+        "seating_area_id": details["seating_area_id"],
+        "seating_area_name": seating_area_name,
+        "status": CONFIRMED,
+        "special_requests": details.get("special_requests"),
+        "checked_in": False,
+        "timezone": restaurant.get("timezone", DEFAULT_TIMEZONE),
+        # Kept so a cancellation releases exactly what was claimed, even if the duration setting changes
+        "dining_duration": duration,
+        "tables": table_numbers,
+        "created_at": datetime.utcnow()
+    }
+
+def booked_duration(reservation: Dict) -> int:
+    """Minutes a stored reservation holds its tables (reservations from before durations held one slot)"""
+    return reservation.get("dining_duration", LEGACY_DINING_DURATION)
+
+async def book_reservation(
+    db,
+    restaurant: Dict,
+    details: Dict,
+    customer_email: str,
+    seating_area_name: str,
+    duration: int,
+    day_ledger: Optional[Dict] = None,
+    extra_fields: Optional[Dict] = None
+) -> Optional[Dict]:
+    """
+    Claim tables for booking details and insert the confirmed reservation; returns the stored
+    document, None if the party can't be seated. If the insert fails the tables are given back.
+    """
+    table_numbers = await ledger.reserve(
+        db,
+        details["restaurant_id"],
+        details["date"],
+        details["time_slot"],
+        details["seating_area_id"],
+        details["number_of_guests"],
+        duration,
+        restaurant.get("seating_config"),
+        day_ledger
+    )
+    if table_numbers is None:
+        return None
+
+    reservation = new_reservation(restaurant, details, customer_email, seating_area_name, duration, table_numbers)
+    reservation.update(extra_fields or {})
+
+    try:
+        result = await db.reservations.insert_one(reservation)
+    except Exception:
+        await _release(db, reservation)
+        raise
+
+    reservation["_id"] = result.inserted_id
+    return reservation
+
+async def cancel_reservation(db, reservation: Dict, fields: Optional[Dict] = None) -> bool:
+    """
+    Cancel a loaded reservation, setting any extra fields (who cancelled, why). Only the call that
+    actually flips the status releases the tables, so concurrent cancels can't release twice;
+    returns False if it was already cancelled. released_at tells ledger reconciliation the
+    release that follows the status change may still be on its way.
+    """
+    result = await db.reservations.update_one(
+        {"_id": reservation["_id"], "status": {"$ne": CANCELLED}},
+        {"$set": {**(fields or {}), "status": CANCELLED, "released_at": datetime.utcnow()}}
+    )
+    if not result.modified_count:
+        return False
+
+    if reservation.get("status") in HOLDING_STATUSES:
+        await _release(db, reservation)
+        # The freed tables go to whoever is waiting for them
+        await promote_waitlist(
+            db, reservation["restaurant_id"], reservation["date"], reservation["time_slot"], booked_duration(reservation)
+        )
+
+    return True
+
+async def complete_reservation(
+    db,
+    reservation_id: ObjectId,
+    fields: Optional[Dict] = None,
+    conditions: Optional[Dict] = None
+) -> bool:
+    """
+    Mark a confirmed reservation completed, setting any extra fields, if it also matches any extra
+    conditions; returns False if it wasn't confirmed (cancelled, already completed) or didn't match.
+    """
+    result = await db.reservations.update_one(
+        {**(conditions or {}), "_id": reservation_id, "status": CONFIRMED},
+        {"$set": {**(fields or {}), "status": COMPLETED, "updated_at": datetime.utcnow()}}
+    )
+    return bool(result.modified_count)
+
+async def promote_waitlist(db, restaurant_id: str, date: str, time_slot: str, duration: int) -> List[str]:
+    """
+    Book waiting entries that fit after a booking at time_slot lasting duration minutes was
+    released, largest parties first (then oldest); returns the ids of the reservations created.
+    Only entries whose own dining window overlaps the released one can have gained a table.
+    """
+    restaurant = await db.restaurants.find_one(
+        {"_id": ObjectId(restaurant_id)},
+        {"restaurant_name": 1, "seating_config": 1, "timezone": 1}
+    )
+    if not restaurant:
+        return []
+
+    seating_config = restaurant.get("seating_config")
+    entry_duration = dining_duration(seating_config)
+
+    query = waitlist.overlapping_query(restaurant_id, date, time_slot, duration, entry_duration)
+    if query is None:
+        return []
+
+    cursor = db[waitlist.WAITLIST_COLLECTION].find(query).sort([("number_of_guests", -1), ("created_at", 1)])
+
+    promoted = []
+    day_ledger = await ledger.get_ledger(db, restaurant_id, date)
+
+    async for entry in cursor:
+        area = ledger.find_area(seating_config, entry["seating_area_id"])
+        if not area:
+            continue
+
+        # Cheap in-memory check against the current ledger before touching the entry
+        if ledger.allocate(day_ledger, entry["time_slot"], entry_duration, area, entry["number_of_guests"]) is None:
+            continue
+
+        reservation_id = await _promote_entry(db, restaurant, entry, area, entry_duration, day_ledger)
+        if reservation_id:
+            promoted.append(reservation_id)
+            day_ledger = await ledger.get_ledger(db, restaurant_id, date)
+
+    return promoted
+
+async def _promote_entry(
+    db,
+    restaurant: Dict,
+    entry: Dict,
+    area: Dict,
+    duration: int,
+    day_ledger: Optional[Dict]
+) -> Optional[str]:
+    """Claim an entry and book it; puts it back if it can't be seated"""
+    claimed = await db[waitlist.WAITLIST_COLLECTION].update_one(
+        {"_id": entry["_id"], "status": waitlist.WAITING},
+        {
+            "$set": {"status": waitlist.PROMOTING},
+            "$max": {"expires_at": datetime.utcnow() + waitlist.PROMOTION_GRACE}
+        }
+    )
+    if not claimed.modified_count:
+        # Taken by a concurrent promotion or cancelled by the customer
+        return None
+
+    try:
+        reservation = await book_reservation(
+            db,
+            restaurant,
+            entry,
+            entry["customer_email"],
+            area.get("area_name") or "Unknown Area",
+            duration,
+            day_ledger,
+            {"waitlist_id": str(entry["_id"])}
+        )
+    except Exception:
+        await waitlist.set_status(db, entry["_id"], waitlist.WAITING)
+        raise
+
+    if reservation is None:
+        await waitlist.set_status(db, entry["_id"], waitlist.WAITING)
+        return None
+
+    reservation_id = str(reservation["_id"])
+    await waitlist.set_status(
+        db, entry["_id"], waitlist.PROMOTED, {"reservation_id": reservation_id, "promoted_at": datetime.utcnow()}
+    )
+    return reservation_id
+
+async def place_hold(
+    db,
+    restaurant: Dict,
+    details: Dict,
+    customer_email: str,
+    seating_area_name: str,
+    duration: int,
+    day_ledger: Optional[Dict] = None
+) -> Optional[Dict]:
+    """Claim tables for booking details for holds.HOLD_MINUTES; returns the stored hold, None if the party can't be seated"""
+    table_numbers = await ledger.reserve(
+        db,
+        details["restaurant_id"],
+        details["date"],
+        details["time_slot"],
+        details["seating_area_id"],
+        details["number_of_guests"],
+        duration,
+        restaurant.get("seating_config"),
+        day_ledger
+    )
+    if table_numbers is None:
+        return None
+
+    hold = holds.new_hold(restaurant, details, customer_email, seating_area_name, duration, table_numbers)
+
+    try:
+        result = await db[holds.HOLDS_COLLECTION].insert_one(hold)
+    except Exception:
+        await _release(db, hold)
+        raise
+
+    hold["_id"] = result.inserted_id
+    return hold
+
+async def convert_hold(db, hold_id: ObjectId, details: Dict, customer_email: str) -> Optional[Dict]:
+    """
+    Book a customer's live hold, checked to be theirs, still active, unexpired and for the same
+    slot, area and party; the reservation keeps the hold's tables, so nothing is re-checked.
+    The reservation is inserted before the hold is marked converted, so the tables are always
+    owned by one of them: a hold released in between either finds the reservation and leaves
+    the tables to it (hold_adopted), or gives them back, and then the reservation is removed.
+    Returns the stored reservation, None if the hold can't be used.
+    """
+    hold = await db[holds.HOLDS_COLLECTION].find_one({
+        "_id": hold_id,
+        "customer_email": customer_email,
+        **holds.active_query(datetime.utcnow()),
+        **{field: details[field] for field in holds.SLOT_FIELDS}
+    })
+    if not hold:
+        return None
+
+    # The hold carries the restaurant name and time zone a reservation records
+    reservation = new_reservation(
+        hold, details, customer_email, hold["seating_area_name"], hold["dining_duration"], hold["tables"]
+    )
+    reservation["hold_id"] = str(hold_id)
+
+    result = await db.reservations.insert_one(reservation)
+    reservation["_id"] = result.inserted_id
+
+    if not await _mark_converted(db, hold_id, {"status": holds.ACTIVE}, result.inserted_id):
+        # Released first: one conditional write on the reservation settles whether the release
+        # left it the tables or gave them back
+        removed = await db.reservations.delete_one({"_id": result.inserted_id, "hold_adopted": {"$ne": True}})
+        if removed.deleted_count:
+            return None
+
+    return reservation
+
+async def _mark_converted(db, hold_id: ObjectId, hold_filter: Dict, reservation_id: ObjectId) -> bool:
+    result = await db[holds.HOLDS_COLLECTION].update_one(
+        {**hold_filter, "_id": hold_id},
+        {"$set": {
+            "status": holds.CONVERTED,
+            "converted_at": datetime.utcnow(),
+            "reservation_id": str(reservation_id)
+        }}
+    )
+    return bool(result.modified_count)
+
+async def release_hold(db, hold_filter: Dict, status: str = holds.RELEASED) -> bool:
+    """
+    Give back the tables of the active hold matching hold_filter and promote the waitlist. Like a
+    cancellation, only the call that flips the status releases; returns False if nothing was released.
+    A hold whose conversion already inserted its reservation is marked converted instead, leaving
+    the tables to the reservation.
+    """
+    hold = await db[holds.HOLDS_COLLECTION].find_one_and_update(
+        {**hold_filter, "status": holds.ACTIVE},
+        {"$set": {"status": status, "released_at": datetime.utcnow()}}
+    )
+    if not hold:
+        return False
+
+    converted = await db.reservations.find_one_and_update(
+        {"hold_id": str(hold["_id"])},
+        {"$set": {"hold_adopted": True}},
+        projection={"_id": 1}
+    )
+    if converted:
+        await _mark_converted(db, hold["_id"], {"status": status}, converted["_id"])
+        return False
+
+    await _release(db, hold)
+    await promote_waitlist(db, hold["restaurant_id"], hold["date"], hold["time_slot"], booked_duration(hold))
+    return True
+
+async def expire_holds(db, now: Optional[datetime] = None) -> int:
+    """Release every active hold that has run out; returns the count released"""
+    now = now or datetime.utcnow()
+    cursor = db[holds.HOLDS_COLLECTION].find({"status": holds.ACTIVE, "expires_at": {"$lte": now}}, {"_id": 1})
+
+    expired = 0
+    async for hold in cursor:
+        if await release_hold(db, {"_id": hold["_id"]}, holds.EXPIRED):
+            expired += 1
+
+    return expired
+
+async def _release(db, reservation: Dict) -> None:
+    """Give back the tables of a reservation or hold"""
+    await ledger.release(
+        db,
+        reservation["restaurant_id"],
+        reservation["date"],
+        reservation["time_slot"],
+        reservation.get("seating_area_id"),
+        reservation["number_of_guests"],
+        booked_duration(reservation),
+        reservation.get("tables")
+    )
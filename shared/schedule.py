@@ -0,0 +1,264 @@
+# shared/schedule.py
+
+"""
+Restaurant schedule engine shared by the customer and restaurant backends.
+Every restaurant has an IANA time zone; hours are interpreted in that zone. Parsed weekly
+schedules, zoneinfo objects, and generated time slots are cached, so "is it open" and
+"which slots exist on this local date" are answered without re-parsing hours per request.
+"""
+
+import os
+from datetime import datetime, date, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+DEFAULT_SLOT_INTERVAL = 30
+
+# Occupancy is tracked in fixed steps; slot intervals and dining durations are multiples of it
+OCCUPANCY_STEP = 15
+DEFAULT_DINING_DURATION = 90
+# Bookings made before durations were stored held only their own 30-minute slot
+LEGACY_DINING_DURATION = 30
+
+# Zone assumed for restaurants that haven't set one (UTC matches how hours were read before zones existed)
+DEFAULT_TIMEZONE = os.getenv("DEFAULT_RESTAURANT_TIMEZONE", "UTC")
+
+# (open_minutes, close_minutes) for one weekday, None when closed
+DayHours = Optional[Tuple[int, int]]
+
+def parse_minutes(value: Optional[str]) -> Optional[int]:
+    """Convert "HH:MM" to minutes since midnight, None if malformed"""
+    try:
+        hour, minute = map(int, value.split(":"))
+    except (AttributeError, ValueError):
+        return None
+
+    if not (0 <= hour <= 23 and 0 <= minute <= 59):
+        return None
+
+    return hour * 60 + minute
+
+def format_minutes(minutes: int) -> str:
+    """Convert minutes since midnight to "HH:MM" """
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+# ---------- Time zones ----------
+
+@lru_cache(maxsize=None)
+def _zone(name: str) -> ZoneInfo:
+    return ZoneInfo(name)
+
+def is_valid_timezone(name: Optional[str]) -> bool:
+    """Whether name is a known IANA time zone"""
+    if not name:
+        return False
+    try:
+        _zone(name)
+        return True
+    except (ZoneInfoNotFoundError, ValueError):
+        return False
+
+def get_zone(name: Optional[str]) -> ZoneInfo:
+    """Cached ZoneInfo for a restaurant's zone, falling back to the default zone"""
+    return _zone(name) if is_valid_timezone(name) else _zone(DEFAULT_TIMEZONE)
+
+def local_now(tz_name: Optional[str], moment: Optional[datetime] = None) -> datetime:
+    """Current (or given) instant as an aware datetime in the restaurant's zone"""
+    moment = moment or datetime.now(timezone.utc)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(get_zone(tz_name))
+
+def local_today(tz_name: Optional[str]) -> str:
+    """Today's date ("YYYY-MM-DD") in the restaurant's zone"""
+    return local_now(tz_name).strftime("%Y-%m-%d")
+
+def local_datetime(date_str: str, time_slot: str, tz_name: Optional[str]) -> datetime:
+    """Aware datetime for a local date and "HH:MM" slot in the restaurant's zone"""
+    naive = datetime.strptime(f"{date_str} {time_slot}", "%Y-%m-%d %H:%M")
+    return naive.replace(tzinfo=get_zone(tz_name))
+
+def minute_of_week(moment: datetime) -> int:
+    """Minutes since Monday 00:00 for a (local) datetime"""
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+# ---------- Weekly schedules ----------
+
+def _is_closed(day_hours: Dict) -> bool:
+    # The owner app writes "closed"; older documents may carry "is_closed"
+    return bool(day_hours.get("closed") or day_hours.get("is_closed"))
+
+def _freeze(hours: Optional[Dict]) -> Tuple:
+    """Hashable form of an hours dict, used as the compiled-schedule cache key"""
+    hours = hours or {}
+    frozen = []
+    for day in DAYS:
+        day_hours = hours.get(day) or {}
+        frozen.append((_is_closed(day_hours), day_hours.get("open"), day_hours.get("close")))
+    return tuple(frozen)
+
+@lru_cache(maxsize=4096)
+def _compile(frozen: Tuple) -> Tuple[DayHours, ...]:
+    week = []
+    for closed, open_str, close_str in frozen:
+        open_minutes = parse_minutes(open_str)
+        close_minutes = parse_minutes(close_str)
+        if closed or open_minutes is None or close_minutes is None:
+            week.append(None)
+        else:
+            week.append((open_minutes, close_minutes))
+    return tuple(week)
+
+def compile_week(hours: Optional[Dict]) -> Tuple[DayHours, ...]:
+    """Parsed hours per weekday (Monday first), cached by content"""
+    return _compile(_freeze(hours))
+
+@lru_cache(maxsize=4096)
+def _compile_intervals(frozen: Tuple) -> Tuple[Tuple[int, int], ...]:
+    intervals = []
+
+    for day_index, day_hours in enumerate(_compile(frozen)):
+        if day_hours is None:
+            continue
+
+        open_minutes, close_minutes = day_hours
+        start = day_index * MINUTES_PER_DAY + open_minutes
+        end = day_index * MINUTES_PER_DAY + close_minutes
+        if close_minutes <= open_minutes:
+            end += MINUTES_PER_DAY
+
+        if end > MINUTES_PER_WEEK:
+            intervals.append((start, MINUTES_PER_WEEK))
+            intervals.append((0, end - MINUTES_PER_WEEK))
+        else:
+            intervals.append((start, end))
+
+    return tuple(intervals)
+
+def compile_open_intervals(hours: Optional[Dict]) -> List[Dict]:
+    """
+    Compile hours into half-open [start, end) minute-of-week intervals (local time, Monday 00:00 = 0),
+    the form stored on restaurant documents as open_intervals.
+    Closing at or before opening means the restaurant closes after midnight; an interval that runs
+    past Sunday midnight is split so every interval stays within one week.
+    """
+    return [{"start": start, "end": end} for start, end in _compile_intervals(_freeze(hours))]
+
+def is_open(hours: Optional[Dict], tz_name: Optional[str], moment: Optional[datetime] = None) -> bool:
+    """Whether the restaurant is open at the given instant (now by default)"""
+    local_minute = minute_of_week(local_now(tz_name, moment))
+    return any(start <= local_minute < end for start, end in _compile_intervals(_freeze(hours)))
+
+def open_at_filter(local_minute: int) -> Dict:
+    """
+    Condition on open_intervals matching restaurants open at a local minute of the week.
+    Intervals are never longer than a day, so the lower bound on start keeps the index scan
+    to a one-day window.
+    """
+    return {
+        "$elemMatch": {
+            "start": {"$lte": local_minute, "$gte": local_minute - MINUTES_PER_DAY},
+            "end": {"$gt": local_minute}
+        }
+    }
+
+def open_now_query(timezones: List[str], moment: Optional[datetime] = None) -> Dict:
+    """
+    Query matching restaurants open at an instant across zones: one indexed branch per zone,
+    each comparing against that zone's local minute of the week.
+    """
+    branches = []
+    for tz_name in sorted(set(timezones or [DEFAULT_TIMEZONE])):
+        branches.append({
+            "timezone": tz_name,
+            "open_intervals": open_at_filter(minute_of_week(local_now(tz_name, moment)))
+        })
+    return branches[0] if len(branches) == 1 else {"$or": branches}
+
+# ---------- Dates and slots ----------
+
+@lru_cache(maxsize=1024)
+def _parse_date(date_str: str) -> date:
+    return datetime.strptime(date_str, "%Y-%m-%d").date()
+
+def day_name(date_str: str) -> str:
+    """Weekday name ("monday", ...) of a "YYYY-MM-DD" date"""
+    return DAYS[_parse_date(date_str).weekday()]
+
+def date_range(start_date: str, days: int) -> List[str]:
+    """Consecutive "YYYY-MM-DD" dates starting at start_date"""
+    first = _parse_date(start_date)
+    return [(first + timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(days)]
+
+def hours_for_date(hours: Optional[Dict], date_str: str) -> Dict:
+    """Opening hours for a local date: {"closed", "day", "open", "close"}"""
+    day_index = _parse_date(date_str).weekday()
+    day_hours = compile_week(hours)[day_index]
+
+    if day_hours is None:
+        return {"closed": True, "day": DAYS[day_index]}
+
+    return {
+        "closed": False,
+        "day": DAYS[day_index],
+        "open": format_minutes(day_hours[0]),
+        "close": format_minutes(day_hours[1])
+    }
+
+@lru_cache(maxsize=4096)
+def generate_time_slots(open_time: str, close_time: str, interval_minutes: int = DEFAULT_SLOT_INTERVAL) -> Tuple[str, ...]:
+    """Bookable slot start times from opening until closing (exclusive), cached"""
+    open_minutes = parse_minutes(open_time)
+    close_minutes = parse_minutes(close_time)
+    if open_minutes is None or close_minutes is None or interval_minutes <= 0:
+        return ()
+
+    return tuple(
+        format_minutes(minutes)
+        for minutes in range(open_minutes, close_minutes, interval_minutes)
+    )
+
+def slots_for_date(
+    hours: Optional[Dict],
+    date_str: str,
+    interval_minutes: int = DEFAULT_SLOT_INTERVAL
+) -> Tuple[str, ...]:
+    """Bookable slots on a local date (empty when closed)"""
+    day_hours = hours_for_date(hours, date_str)
+    if day_hours["closed"]:
+        return ()
+    return generate_time_slots(day_hours["open"], day_hours["close"], interval_minutes)
+
+# ---------- Occupancy ----------
+
+def _configured_minutes(seating_config: Optional[Dict], key: str, default: int) -> int:
+    value = (seating_config or {}).get(key)
+    if isinstance(value, int) and value > 0 and value % OCCUPANCY_STEP == 0:
+        return value
+    return default
+
+def slot_interval(seating_config: Optional[Dict]) -> int:
+    """Minutes between bookable slots for a restaurant (its seating config, else the default)"""
+    return _configured_minutes(seating_config, "slot_interval", DEFAULT_SLOT_INTERVAL)
+
+def dining_duration(seating_config: Optional[Dict]) -> int:
+    """Minutes a table stays occupied by one booking (its seating config, else the default)"""
+    return _configured_minutes(seating_config, "dining_duration", DEFAULT_DINING_DURATION)
+
+@lru_cache(maxsize=4096)
+def occupied_steps(time_slot: str, duration: int) -> Tuple[str, ...]:
+    """
+    Occupancy steps ("HH:MM", every OCCUPANCY_STEP minutes) a booking at time_slot lasting
+    duration minutes overlaps, cut off at midnight; empty for a malformed slot
+    """
+    start = parse_minutes(time_slot)
+    if start is None or duration <= 0:
+        return ()
+
+    first = start - start % OCCUPANCY_STEP
+    end = min(start + duration, MINUTES_PER_DAY)
+    return tuple(format_minutes(minutes) for minutes in range(first, end, OCCUPANCY_STEP))
@@ -0,0 +1,94 @@
+# shared/tables.py
+
+"""
+Table allocation for seating areas.
+An area has number_of_tables tables of seats_per_table seats, numbered 0.. in layout order so
+neighbouring numbers are neighbouring tables. Occupancy over a booking's window is a bitmask
+(bit i set = table i taken at some point of the window), and a party gets the smallest run of
+adjacent free tables that seats it (best fit), which keeps large runs free for large parties.
+Everything here is pure; shared/ledger.py stores allocations and applies them atomically.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+def area_tables(area: Dict) -> Tuple[int, int]:
+    """(number_of_tables, seats_per_table) for a seating area"""
+    seats_per_table = area.get("seats_per_table") or 2
+    number_of_tables = area.get("number_of_tables")
+    if number_of_tables is None:
+        # Areas saved without a table count: assume the capacity is made of whole tables
+        number_of_tables = area.get("area_capacity", 0) // seats_per_table
+    return number_of_tables, seats_per_table
+
+def tables_needed(guests: int, seats_per_table: int) -> int:
+    """Adjacent tables a party needs"""
+    return -(-guests // seats_per_table)
+
+def occupied_mask(
+    tables: Dict,
+    booked: Dict,
+    steps: Iterable[str],
+    area_id: str,
+    number_of_tables: int,
+    seats_per_table: int
+) -> int:
+    """
+    Tables taken at any step of a window. tables/booked are a ledger's per-step maps.
+    Guests booked before tables were allocated have no table numbers; they are counted as the
+    fewest whole tables they could fill, taken from the highest-numbered free tables.
+    """
+    full = (1 << number_of_tables) - 1
+    mask = 0
+
+    for step in steps:
+        step_tables = tables.get(step, {}).get(area_id, [])
+        step_mask = 0
+        for table in step_tables:
+            if 0 <= table < number_of_tables:
+                step_mask |= 1 << table
+
+        untracked = tables_needed(booked.get(step, {}).get(area_id, 0), seats_per_table) - len(step_tables)
+        table = number_of_tables - 1
+        while untracked > 0 and table >= 0:
+            if not step_mask & (1 << table):
+                step_mask |= 1 << table
+                untracked -= 1
+            table -= 1
+
+        mask |= step_mask
+
+    return mask & full
+
+def free_runs(mask: int, number_of_tables: int) -> List[Tuple[int, int]]:
+    """(first table, length) of each maximal run of free tables"""
+    runs = []
+    start = None
+
+    for table in range(number_of_tables):
+        if mask & (1 << table):
+            if start is not None:
+                runs.append((start, table - start))
+                start = None
+        elif start is None:
+            start = table
+
+    if start is not None:
+        runs.append((start, number_of_tables - start))
+
+    return runs
+
+def best_fit(mask: int, number_of_tables: int, needed: int) -> Optional[List[int]]:
+    """Table numbers for a party needing `needed` adjacent tables: the start of the shortest run that fits"""
+    if needed <= 0 or needed > number_of_tables:
+        return None
+
+    fitting = [run for run in free_runs(mask, number_of_tables) if run[1] >= needed]
+    if not fitting:
+        return None
+
+    start, _ = min(fitting, key=lambda run: (run[1], run[0]))
+    return list(range(start, start + needed))
+
+def free_tables(mask: int, number_of_tables: int) -> int:
+    """Number of tables free for the whole window"""
+    return number_of_tables - bin(mask).count("1")
@@ -0,0 +1,30 @@
+# shared/versioning.py
+
+"""
+Restaurant document versions and the ETags derived from them.
+Every write to a restaurant document increments its integer `version` field, so
+(restaurant id, version) identifies the exact content and is used as a strong ETag by both
+backends; a conditional GET can be answered from a projection of just the version.
+"""
+
+from typing import Dict, Optional
+
+# Update fragment every restaurant write merges in
+VERSION_BUMP = {"version": 1}
+
+def bump_version(update: Dict) -> Dict:
+    """Add the version increment to a MongoDB update document"""
+    return {**update, "$inc": {**update.get("$inc", {}), **VERSION_BUMP}}
+
+def restaurant_etag(restaurant_id: str, version: Optional[int]) -> str:
+    """Strong ETag for one version of a restaurant document (documents never written have version 0)"""
+    return f'"{restaurant_id}-{version or 0}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value matches the current ETag"""
+    if not if_none_match:
+        return False
+
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # Weak comparison is what If-None-Match calls for, so a W/ prefix doesn't prevent a match
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
@@ -0,0 +1,74 @@
+# shared/waitlist.py
+
+"""
+Waitlist for full slots, shared by the customer and restaurant backends.
+Customers join a restaurant/date/slot waitlist when no tables are free. Whenever a booking
+releases capacity, shared.reservations.promote_waitlist() books the waiting entries for just
+that restaurant, date and window that now fit, so there is no background loop over waitlists.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from bson import ObjectId
+
+from shared.schedule import MINUTES_PER_DAY, format_minutes, local_datetime, parse_minutes
+
+WAITLIST_COLLECTION = "waitlist"
+
+WAITING = "waiting"
+PROMOTING = "promoting"
+PROMOTED = "promoted"
+CANCELLED = "cancelled"
+
+# A claimed entry's expiry is pushed at least this far out, so the TTL index can't delete it mid-promotion
+PROMOTION_GRACE = timedelta(minutes=5)
+
+def new_entry(details: Dict, customer_email: str, restaurant: Dict) -> Dict:
+    """A waitlist entry for booking details (same fields as a reservation request)"""
+    slot_start = local_datetime(details["date"], details["time_slot"], restaurant.get("timezone"))
+    return {
+        "restaurant_id": details["restaurant_id"],
+        "restaurant_name": restaurant.get("restaurant_name", ""),
+        "customer_name": details["customer_name"],
+        "customer_email": customer_email,
+        "customer_phone": details["customer_phone"],
+        "date": details["date"],
+        "time_slot": details["time_slot"],
+        "number_of_guests": details["number_of_guests"],
+        "seating_area_id": details["seating_area_id"],
+        "special_requests": details.get("special_requests"),
+        "status": WAITING,
+        "reservation_id": None,
+        "created_at": datetime.utcnow(),
+        # TTL-indexed: entries disappear once their slot has started
+        "expires_at": slot_start.astimezone(timezone.utc).replace(tzinfo=None)
+    }
+
+def overlapping_query(
+    restaurant_id: str,
+    date: str,
+    time_slot: str,
+    duration: int,
+    entry_duration: int
+) -> Optional[Dict]:
+    """
+    Waiting entries whose window [slot, slot + entry_duration) overlaps a released booking's
+    [time_slot, time_slot + duration); None if time_slot isn't a valid "HH:MM"
+    """
+    released_start = parse_minutes(time_slot)
+    if released_start is None:
+        return None
+
+    earliest = format_minutes(max(released_start - entry_duration + 1, 0))
+    latest = format_minutes(min(released_start + duration, MINUTES_PER_DAY))
+    return {
+        "restaurant_id": restaurant_id,
+        "date": date,
+        "time_slot": {"$gte": earliest, "$lt": latest},
+        "status": WAITING
+    }
+
+async def set_status(db, entry_id: ObjectId, status: str, fields: Optional[Dict] = None) -> None:
+    """Move an entry to a status, setting any extra fields"""
+    await db[WAITLIST_COLLECTION].update_one({"_id": entry_id}, {"$set": {**(fields or {}), "status": status}})